@@ -0,0 +1,89 @@
+from enum import Enum
+from typing import Callable, Dict, Optional, Type, TypeVar
+
+import msgspec
+from fastapi import Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..models import PropertySearchFilters, PROPERTY_TYPES, OPERATION_TYPES, CURRENCIES, enum_from_value
+from ..services import PropertyService, ScrapingService
+
+T = TypeVar("T")
+
+
+def msgspec_body(model: Type[T]) -> Callable:
+    """Build a dependency that decodes the JSON request body into a msgspec Struct."""
+    decoder = msgspec.json.Decoder(model)
+
+    async def decode_body(request: Request) -> T:
+        try:
+            return decoder.decode(await request.body())
+        except msgspec.ValidationError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except msgspec.DecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+
+    return decode_body
+
+
+def get_property_service(db: Session = Depends(get_db)) -> PropertyService:
+    """Request-scoped PropertyService bound to the request's DB session."""
+    return PropertyService(db)
+
+
+def get_scraping_service(db: Session = Depends(get_db)) -> ScrapingService:
+    """Request-scoped ScrapingService bound to the request's DB session."""
+    return ScrapingService(db)
+
+
+E = TypeVar("E", bound=Enum)
+
+
+def _enum_param(name: str, value: Optional[str], members: Dict[str, E]) -> Optional[E]:
+    """Resolve an enum query parameter, rejecting unknown values with a 422."""
+    if value is None:
+        return None
+    member = enum_from_value(members, value)
+    if member is None:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Invalid {name}: {value}. Allowed: {list(members)}"
+        )
+    return member
+
+
+def get_search_filters(
+    property_type: Optional[str] = Query(None, description=f"Type of property ({', '.join(PROPERTY_TYPES)})"),
+    operation_type: Optional[str] = Query(None, description=f"Operation type ({', '.join(OPERATION_TYPES)})"),
+    min_price: Optional[float] = Query(None, description="Minimum price"),
+    max_price: Optional[float] = Query(None, description="Maximum price"),
+    currency: Optional[str] = Query(None, description=f"Currency ({', '.join(CURRENCIES)})"),
+    min_bedrooms: Optional[int] = Query(None, description="Minimum bedrooms"),
+    max_bedrooms: Optional[int] = Query(None, description="Maximum bedrooms"),
+    min_bathrooms: Optional[int] = Query(None, description="Minimum bathrooms"),
+    max_bathrooms: Optional[int] = Query(None, description="Maximum bathrooms"),
+    min_area: Optional[float] = Query(None, description="Minimum area in m²"),
+    max_area: Optional[float] = Query(None, description="Maximum area in m²"),
+    province: Optional[str] = Query(None, description="Province"),
+    city: Optional[str] = Query(None, description="City"),
+    neighborhood: Optional[str] = Query(None, description="Neighborhood")
+) -> PropertySearchFilters:
+    """Property search filters from the query string."""
+    # Every value is already typed here, so skip a second round of model validation
+    return PropertySearchFilters.model_construct(
+        property_type=_enum_param("property_type", property_type, PROPERTY_TYPES),
+        operation_type=_enum_param("operation_type", operation_type, OPERATION_TYPES),
+        min_price=min_price,
+        max_price=max_price,
+        currency=_enum_param("currency", currency, CURRENCIES),
+        min_bedrooms=min_bedrooms,
+        max_bedrooms=max_bedrooms,
+        min_bathrooms=min_bathrooms,
+        max_bathrooms=max_bathrooms,
+        min_area=min_area,
+        max_area=max_area,
+        province=province,
+        city=city,
+        neighborhood=neighborhood
+    )
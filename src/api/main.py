@@ -1,20 +1,40 @@
+import asyncio
+
 from fastapi import FastAPI, Depends, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import RedirectResponse
 from typing import List, Optional
-import os
+from contextlib import asynccontextmanager, suppress
+from pathlib import Path
 
-from ..database import get_db, init_database
+from ..database import init_database
 from ..models import PropertySearchFilters
-from ..services import PropertyService, ScrapingService
-from ..utils import app_logger, settings
+from ..services import PropertyService, ScrapingService, view_recorder
+from ..utils import app_logger, settings, stats_cache
+from .dependencies import get_property_service, get_scraping_service
+from .orjson_response import ORJSONResponse
+from .staticfiles import CachedStaticFiles
 from .routers import properties, scraping, statistics, llm
 
-# Initialize database
-init_database()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup and shutdown handler; runs once per worker process."""
+    app_logger.info("Starting Argentina Real Estate Parser API")
+    init_database()
+    app_logger.info(f"API running on {settings.api_host}:{settings.api_port}")
+    app_logger.info(f"Database URL: {settings.database_url}")
+    view_flusher = asyncio.create_task(view_recorder.run(settings.view_flush_interval))
+    
+    yield
+    
+    app_logger.info("Shutting down Argentina Real Estate Parser API")
+    view_flusher.cancel()
+    with suppress(asyncio.CancelledError):
+        await view_flusher
+    await asyncio.to_thread(view_recorder.flush)
+    await llm.close_http_clients()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -22,56 +42,88 @@ app = FastAPI(
     description="API for parsing and managing real estate data from Argentine websites",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=86400,
 )
 
+# Compress JSON and static responses above 1 KB
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Log unexpected errors from any route and return them as a 500."""
+    app_logger.error(f"Error handling {request.method} {request.url.path}: {exc}")
+    return ORJSONResponse(status_code=500, content={"detail": str(exc)})
+
+
 # Include routers
 app.include_router(properties.router, prefix="/api/v1/properties", tags=["properties"])
 app.include_router(scraping.router, prefix="/api/v1/scraping", tags=["scraping"])
 app.include_router(statistics.router, prefix="/api/v1/statistics", tags=["statistics"])
 app.include_router(llm.router, prefix="/api/v1/llm", tags=["llm"])
 
-# Setup templates
-templates_dir = os.path.join(os.path.dirname(__file__), "templates")
-if not os.path.exists(templates_dir):
-    os.makedirs(templates_dir)
-templates = Jinja2Templates(directory=templates_dir)
-
 # Setup static files
-static_dir = os.path.join(os.path.dirname(__file__), "static")
-if not os.path.exists(static_dir):
-    os.makedirs(static_dir)
-app.mount("/static", StaticFiles(directory=static_dir), name="static")
-
-
-@app.get("/", response_class=HTMLResponse)
-async def root(request: Request, db: Session = Depends(get_db)):
-    """Main dashboard page."""
-    property_service = PropertyService(db)
-    scraping_service = ScrapingService(db)
-    
-    # Get basic statistics
-    property_stats = property_service.get_property_statistics()
-    scraping_stats = scraping_service.get_scraping_statistics()
+# The static directory ships with the package; only create it when asked to
+static_dir = Path(__file__).parent / "static"
+if settings.ensure_dirs:
+    static_dir.mkdir(parents=True, exist_ok=True)
+app.mount("/static", CachedStaticFiles(directory=static_dir), name="static")
+
+
+@app.get("/", include_in_schema=False)
+async def root():
+    """Main dashboard page (static; data is loaded from the summary endpoint)."""
+    return RedirectResponse(url="/static/dashboard.html")
+
+
+def _recent_property_summaries(property_service: PropertyService) -> List[dict]:
+    """Recent properties reduced to the fields shown on the dashboard."""
+    return [
+        {
+            "id": prop.id,
+            "title": prop.title,
+            "price_amount": prop.price_amount,
+            "price_currency": prop.price_currency,
+            "city": prop.city,
+            "neighborhood": prop.neighborhood,
+            "source_website": prop.source_website,
+            "first_seen": prop.first_seen
+        }
+        for prop in property_service.get_recent_properties(hours=24, limit=10)
+    ]
+
+
+@app.get("/api/v1/dashboard/summary")
+def dashboard_summary(
+    property_service: PropertyService = Depends(get_property_service),
+    scraping_service: ScrapingService = Depends(get_scraping_service)
+):
+    """Data for the dashboard page."""
+    # Aggregates are shared by all viewers, so serve them from the TTL cache
+    property_stats = statistics.cached_property_statistics(property_service)
+    scraping_stats = statistics.cached_scraping_statistics(scraping_service)
+    recent_properties = stats_cache.get_or_set(
+        "recent_properties",
+        settings.stats_cache_ttl,
+        lambda: _recent_property_summaries(property_service)
+    )
     
-    # Get recent properties
-    recent_properties = property_service.get_recent_properties(hours=24, limit=10)
-    
-    return templates.TemplateResponse("dashboard.html", {
-        "request": request,
+    return {
         "property_stats": property_stats,
         "scraping_stats": scraping_stats,
         "recent_properties": recent_properties
-    })
+    }
 
 
 @app.get("/health")
@@ -84,20 +136,6 @@ async def health_check():
     }
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Startup event handler."""
-    app_logger.info("Starting Argentina Real Estate Parser API")
-    app_logger.info(f"API running on {settings.api_host}:{settings.api_port}")
-    app_logger.info(f"Database URL: {settings.database_url}")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Shutdown event handler."""
-    app_logger.info("Shutting down Argentina Real Estate Parser API")
-
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -1,32 +1,82 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
+from functools import lru_cache
 from pydantic import BaseModel
+import asyncio
+import msgspec
+import httpx
 
 from ...database.connection import get_db
+from ..dependencies import msgspec_body, get_property_service
+from ..schemas import msgspec_response
 from ...services.property_service import PropertyService
 from ...llm import DeepSeekClient, PropertyAnalyzer, TextEnhancer
 from ...utils import app_logger, settings
 
 router = APIRouter(tags=["LLM"])
 
+# Number of characters of the analyzed text echoed back by /analyze/text
+TEXT_PREVIEW_LENGTH = 100
 
-class AnalyzePropertyRequest(BaseModel):
+# Shared async client so /models neither blocks the event loop nor reconnects per call
+_http: Optional[httpx.AsyncClient] = None
+
+
+def _get_http() -> httpx.AsyncClient:
+    """Return the module-level async HTTP client, creating it on first use."""
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(timeout=5.0)
+    return _http
+
+
+async def close_http_clients():
+    """Close the HTTP clients opened by this router."""
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
+    if get_client.cache_info().currsize:
+        get_client().close()
+        await get_client().aclose()
+
+
+@lru_cache(maxsize=1)
+def get_client() -> DeepSeekClient:
+    """Shared DeepSeek client; it holds no per-request state."""
+    return DeepSeekClient()
+
+
+@lru_cache(maxsize=1)
+def get_analyzer() -> PropertyAnalyzer:
+    """Shared property analyzer backed by the shared client."""
+    return PropertyAnalyzer(get_client())
+
+
+@lru_cache(maxsize=1)
+def get_enhancer() -> TextEnhancer:
+    """Shared text enhancer backed by the shared client."""
+    return TextEnhancer(get_client())
+
+
+class AnalyzePropertyRequest(msgspec.Struct):
     property_id: int
 
 
-class AnalyzeTextRequest(BaseModel):
+class AnalyzeTextRequest(msgspec.Struct):
     text: str
 
 
-class EnhanceDescriptionRequest(BaseModel):
+class EnhanceDescriptionRequest(msgspec.Struct):
     title: str
     description: str
-    features: Optional[Dict[str, Any]] = None
+    features: Optional[dict] = None
 
 
-class GenerateSummaryRequest(BaseModel):
-    property_data: Dict[str, Any]
+class GenerateSummaryRequest(msgspec.Struct):
+    property_data: dict
 
 
 class LLMHealthResponse(BaseModel):
@@ -36,68 +86,55 @@ class LLMHealthResponse(BaseModel):
     enabled: bool
 
 
+def _health_response(status: str, enabled: bool) -> LLMHealthResponse:
+    """Build the health payload without validation; all values come from settings."""
+    return LLMHealthResponse.model_construct(
+        status=status,
+        model=settings.deepseek_model,
+        base_url=settings.deepseek_base_url,
+        enabled=enabled
+    )
+
+
 @router.get("/health", response_model=LLMHealthResponse)
 async def check_llm_health():
     """Check LLM service health"""
     if not settings.llm_enabled:
-        return LLMHealthResponse(
-            status="disabled",
-            model=settings.deepseek_model,
-            base_url=settings.deepseek_base_url,
-            enabled=False
-        )
+        return _health_response("disabled", False)
     
     try:
-        client = DeepSeekClient()
-        is_healthy = client.check_health()
-        
-        return LLMHealthResponse(
-            status="healthy" if is_healthy else "unhealthy",
-            model=settings.deepseek_model,
-            base_url=settings.deepseek_base_url,
-            enabled=settings.llm_enabled
-        )
+        client = get_client()
+        is_healthy = await client.acheck_health()
+        
+        return _health_response("healthy" if is_healthy else "unhealthy", settings.llm_enabled)
     except Exception as e:
         app_logger.error(f"LLM health check failed: {e}")
-        return LLMHealthResponse(
-            status="error",
-            model=settings.deepseek_model,
-            base_url=settings.deepseek_base_url,
-            enabled=settings.llm_enabled
-        )
+        return _health_response("error", settings.llm_enabled)
 
 
 @router.post("/analyze/property")
-async def analyze_property(
-    request: AnalyzePropertyRequest,
-    db: Session = Depends(get_db)
+def analyze_property(
+    request: AnalyzePropertyRequest = Depends(msgspec_body(AnalyzePropertyRequest)),
+    property_service: PropertyService = Depends(get_property_service)
 ):
     """Analyze a property using LLM"""
     if not settings.llm_enabled:
         raise HTTPException(status_code=503, detail="LLM service is disabled")
     
     try:
-        property_service = PropertyService(db)
-        property_obj = property_service.get_property(request.property_id)
+        property_obj = property_service.get_property_by_id(request.property_id)
         
         if not property_obj:
             raise HTTPException(status_code=404, detail="Property not found")
         
-        analyzer = PropertyAnalyzer()
+        analyzer = get_analyzer()
         analysis = analyzer.analyze_property(property_obj)
         
-        return {
+        # PropertyAnalysis is a dataclass, which msgspec encodes field by field
+        return msgspec_response({
             "property_id": request.property_id,
-            "analysis": {
-                "confidence_score": analysis.confidence_score,
-                "extracted_features": analysis.extracted_features,
-                "enhanced_description": analysis.enhanced_description,
-                "classification": analysis.classification,
-                "location_details": analysis.location_details,
-                "summary": analysis.summary,
-                "recommendations": analysis.recommendations
-            }
-        }
+            "analysis": analysis
+        })
         
     except HTTPException:
         raise
@@ -107,17 +144,22 @@ async def analyze_property(
 
 
 @router.post("/analyze/text")
-async def analyze_text(request: AnalyzeTextRequest):
+def analyze_text(request: AnalyzeTextRequest = Depends(msgspec_body(AnalyzeTextRequest))):
     """Analyze property text using LLM"""
     if not settings.llm_enabled:
         raise HTTPException(status_code=503, detail="LLM service is disabled")
     
     try:
-        client = DeepSeekClient()
+        client = get_client()
         result = client.analyze_property_text(request.text)
         
+        # Echo only a short preview; the client already has the full text
+        preview = request.text[:TEXT_PREVIEW_LENGTH]
+        if len(preview) < len(request.text):
+            preview += "..."
+        
         return {
-            "text": request.text[:100] + "..." if len(request.text) > 100 else request.text,
+            "text": preview,
             "analysis": result
         }
         
@@ -127,27 +169,28 @@ async def analyze_text(request: AnalyzeTextRequest):
 
 
 @router.post("/enhance/description")
-async def enhance_description(request: EnhanceDescriptionRequest):
+async def enhance_description(
+    request: EnhanceDescriptionRequest = Depends(msgspec_body(EnhanceDescriptionRequest))
+):
     """Enhance property description using LLM"""
     if not settings.llm_enabled:
         raise HTTPException(status_code=503, detail="LLM service is disabled")
     
     try:
-        enhancer = TextEnhancer()
+        enhancer = get_enhancer()
         
-        # Clean and enhance description
-        enhanced = enhancer.clean_and_enhance_description(request.description)
-        
-        # Extract key features
-        features = enhancer.extract_key_features(f"{request.title} {request.description}")
-        
-        # Generate SEO title
         location = request.features.get('location', '') if request.features else ''
         property_type = request.features.get('property_type', 'propiedad') if request.features else 'propiedad'
-        seo_title = enhancer.generate_seo_title(request.title, location, property_type)
         
-        # Generate meta description
-        meta_description = enhancer.generate_meta_description(enhanced, features)
+        # Enhanced description, key features and SEO title are independent requests
+        (enhanced,), (features,), (seo_title,) = await asyncio.gather(
+            enhancer.aclean_and_enhance_descriptions([request.description]),
+            enhancer.aextract_key_features_batch([f"{request.title} {request.description}"]),
+            enhancer.agenerate_seo_titles([(request.title, location, property_type)], enhance_with_llm=True)
+        )
+        
+        # Generate meta description; the LLM only rewrites a weak template
+        (meta_description,) = await enhancer.agenerate_meta_descriptions([(enhanced, features)], enhance_with_llm=True)
         
         return {
             "original": {
@@ -168,13 +211,15 @@ async def enhance_description(request: EnhanceDescriptionRequest):
 
 
 @router.post("/generate/summary")
-async def generate_summary(request: GenerateSummaryRequest):
+def generate_summary(
+    request: GenerateSummaryRequest = Depends(msgspec_body(GenerateSummaryRequest))
+):
     """Generate property summary using LLM"""
     if not settings.llm_enabled:
         raise HTTPException(status_code=503, detail="LLM service is disabled")
     
     try:
-        client = DeepSeekClient()
+        client = get_client()
         summary = client.generate_property_summary(request.property_data)
         
         return {
@@ -188,13 +233,13 @@ async def generate_summary(request: GenerateSummaryRequest):
 
 
 @router.post("/translate/english")
-async def translate_to_english(request: AnalyzeTextRequest):
+def translate_to_english(request: AnalyzeTextRequest = Depends(msgspec_body(AnalyzeTextRequest))):
     """Translate property description to English"""
     if not settings.llm_enabled:
         raise HTTPException(status_code=503, detail="LLM service is disabled")
     
     try:
-        enhancer = TextEnhancer()
+        enhancer = get_enhancer()
         translation = enhancer.translate_to_english(request.text)
         
         return {
@@ -208,7 +253,7 @@ async def translate_to_english(request: AnalyzeTextRequest):
 
 
 @router.post("/social/post")
-async def generate_social_post(
+def generate_social_post(
     property_data: Dict[str, Any],
     platform: str = "instagram"
 ):
@@ -220,7 +265,7 @@ async def generate_social_post(
         raise HTTPException(status_code=400, detail="Unsupported platform")
     
     try:
-        enhancer = TextEnhancer()
+        enhancer = get_enhancer()
         post = enhancer.generate_social_media_post(property_data, platform)
         
         return {
@@ -235,28 +280,30 @@ async def generate_social_post(
 
 
 @router.get("/market/insights")
-async def get_market_insights(
+def get_market_insights(
     limit: int = 50,
-    db: Session = Depends(get_db)
+    property_service: PropertyService = Depends(get_property_service)
 ):
     """Get market insights using LLM analysis"""
     if not settings.llm_enabled:
         raise HTTPException(status_code=503, detail="LLM service is disabled")
     
     try:
-        property_service = PropertyService(db)
-        properties = property_service.get_properties(limit=limit)
+        analyzer = get_analyzer()
+        # Only the first few properties reach the prompt, so don't load more
+        properties = property_service.get_market_insight_rows(
+            min(limit, analyzer.MARKET_INSIGHTS_SAMPLE_SIZE)
+        )
         
         if not properties:
             raise HTTPException(status_code=404, detail="No properties found")
         
-        analyzer = PropertyAnalyzer()
         insights = analyzer.get_market_insights(properties)
         
-        return {
+        return msgspec_response({
             "total_properties_analyzed": len(properties),
             "insights": insights
-        }
+        })
         
     except HTTPException:
         raise
@@ -265,24 +312,51 @@ async def get_market_insights(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.get("/market/insights/stream")
+def stream_market_insights(
+    limit: int = 50,
+    property_service: PropertyService = Depends(get_property_service)
+):
+    """Stream market insights as NDJSON while the LLM generates them"""
+    if not settings.llm_enabled:
+        raise HTTPException(status_code=503, detail="LLM service is disabled")
+    
+    try:
+        analyzer = get_analyzer()
+        # Only the first few properties reach the prompt, so don't load more
+        properties = property_service.get_market_insight_rows(
+            min(limit, analyzer.MARKET_INSIGHTS_SAMPLE_SIZE)
+        )
+        
+        if not properties:
+            raise HTTPException(status_code=404, detail="No properties found")
+        
+        return StreamingResponse(
+            analyzer.stream_insights(properties),
+            media_type="application/x-ndjson"
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        app_logger.error(f"Error streaming market insights: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.post("/batch/analyze")
-async def batch_analyze_properties(
+def batch_analyze_properties(
     property_ids: List[int],
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    property_service: PropertyService = Depends(get_property_service)
 ):
     """Analyze multiple properties in background"""
     if not settings.llm_enabled:
         raise HTTPException(status_code=503, detail="LLM service is disabled")
     
     try:
-        property_service = PropertyService(db)
-        properties = []
-        
-        for prop_id in property_ids:
-            prop = property_service.get_property(prop_id)
-            if prop:
-                properties.append(prop)
+        found = {p.id: p for p in property_service.get_properties_by_ids(property_ids)}
+        properties = [found[prop_id] for prop_id in property_ids if prop_id in found]
         
         if not properties:
             raise HTTPException(status_code=404, detail="No valid properties found")
@@ -309,8 +383,10 @@ async def batch_analyze_properties(
 async def _batch_analyze_task(properties: List, db: Session):
     """Background task for batch property analysis"""
     try:
-        analyzer = PropertyAnalyzer()
-        results = analyzer.batch_analyze_properties(properties)
+        analyzer = get_analyzer()
+        results = await analyzer.abatch_analyze_properties(
+            properties, max_concurrency=settings.llm_max_concurrency
+        )
         
         app_logger.info(f"Completed batch analysis for {len(properties)} properties")
         
@@ -327,8 +403,7 @@ async def list_available_models():
         raise HTTPException(status_code=503, detail="LLM service is disabled")
     
     try:
-        import requests
-        response = requests.get(f"{settings.deepseek_base_url}/api/tags", timeout=5)
+        response = await _get_http().get(f"{settings.deepseek_base_url}/api/tags")
         
         if response.status_code == 200:
             models = response.json()
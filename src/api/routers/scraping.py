@@ -1,221 +1,161 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import List, Optional
+import hashlib
 
-from ...database import get_db
-from ...database.models import ScrapingSession
-from ...models import PropertySearchFilters, PropertyType, OperationType, Currency
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
+from fastapi.responses import Response
+from typing import FrozenSet, List, Optional, Tuple
+
+from ...models import PropertySearchFilters
 from ...services import ScrapingService
-from ...utils import app_logger
+from ...utils import settings
+from ..orjson_response import ORJSONResponse
+from ..dependencies import get_scraping_service, get_search_filters
 
 router = APIRouter()
 
+WEBSITES = (
+    {
+        "name": "ZonaProp",
+        "url": "zonaprop.com.ar",
+        "description": "Leading real estate portal in Argentina"
+    },
+    {
+        "name": "ArgenProp",
+        "url": "argenprop.com",
+        "description": "Popular real estate search platform"
+    },
+    {
+        "name": "MercadoLibre",
+        "url": "mercadolibre.com.ar",
+        "description": "Argentina's largest e-commerce platform with real estate section"
+    },
+    {
+        "name": "RE/MAX",
+        "url": "remax.com.ar",
+        "description": "International real estate franchise with strong presence in Argentina"
+    },
+    {
+        "name": "Properati",
+        "url": "properati.com.ar",
+        "description": "Modern real estate platform with advanced search features"
+    },
+    {
+        "name": "Inmuebles24",
+        "url": "inmuebles24.com",
+        "description": "Popular real estate portal across Latin America"
+    },
+    {
+        "name": "Navent",
+        "url": "navent.com",
+        "description": "Technology platform powering multiple real estate portals"
+    }
+)
+
+# Built once at import; requests only do membership tests or send the bytes
+SUPPORTED_WEBSITE_URLS: Tuple[str, ...] = tuple(site["url"] for site in WEBSITES)
+SUPPORTED_WEBSITES: FrozenSet[str] = frozenset(SUPPORTED_WEBSITE_URLS)
+SUPPORTED_WEBSITES_PAYLOAD: bytes = orjson.dumps({"websites": WEBSITES})
+SUPPORTED_WEBSITES_ETAG = f'"{hashlib.sha1(SUPPORTED_WEBSITES_PAYLOAD).hexdigest()}"'
+SUPPORTED_WEBSITES_HEADERS = {
+    "Cache-Control": "public, max-age=86400",
+    "ETag": SUPPORTED_WEBSITES_ETAG
+}
+
+
+def _enqueue_scrape(
+    background_tasks: BackgroundTasks,
+    scraping_service: ScrapingService,
+    website: Optional[str],
+    filters: PropertySearchFilters,
+    max_pages: Optional[int]
+):
+    """Hand a scrape to the Celery workers, or run it in-process after the response."""
+    if settings.scraping_task_queue:
+        # Imported lazily so the API does not need Celery unless the queue is enabled
+        from ...worker import scrape_all_websites_task, scrape_website_task
+        
+        if website:
+            scrape_website_task.delay(website, filters.as_dict, max_pages)
+        else:
+            scrape_all_websites_task.delay(filters.as_dict, max_pages)
+    elif website:
+        background_tasks.add_task(scraping_service.scrape_website, website, filters, max_pages)
+    else:
+        background_tasks.add_task(scraping_service.scrape_all_websites, filters, max_pages)
+
 
 @router.post("/start")
-async def start_scraping(
+def start_scraping(
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    scraping_service: ScrapingService = Depends(get_scraping_service),
+    filters: PropertySearchFilters = Depends(get_search_filters),
     website: Optional[str] = None,
-    property_type: Optional[PropertyType] = None,
-    operation_type: Optional[OperationType] = None,
-    min_price: Optional[float] = None,
-    max_price: Optional[float] = None,
-    currency: Optional[Currency] = None,
-    min_bedrooms: Optional[int] = None,
-    max_bedrooms: Optional[int] = None,
-    min_bathrooms: Optional[int] = None,
-    max_bathrooms: Optional[int] = None,
-    min_area: Optional[float] = None,
-    max_area: Optional[float] = None,
-    province: Optional[str] = None,
-    city: Optional[str] = None,
-    neighborhood: Optional[str] = None,
     max_pages: Optional[int] = None
 ):
     """Start scraping process."""
-    try:
-        # Create filters
-        filters = PropertySearchFilters(
-            property_type=property_type,
-            operation_type=operation_type,
-            min_price=min_price,
-            max_price=max_price,
-            currency=currency,
-            min_bedrooms=min_bedrooms,
-            max_bedrooms=max_bedrooms,
-            min_bathrooms=min_bathrooms,
-            max_bathrooms=max_bathrooms,
-            min_area=min_area,
-            max_area=max_area,
-            province=province,
-            city=city,
-            neighborhood=neighborhood
-        )
+    if website:
+        # Scrape specific website
+        if website not in SUPPORTED_WEBSITES:
+            raise HTTPException(status_code=400, detail=f"Unsupported website: {website}")
         
-        scraping_service = ScrapingService(db)
+        _enqueue_scrape(background_tasks, scraping_service, website, filters, max_pages)
         
-        if website:
-            # Scrape specific website
-            if website not in ['zonaprop.com.ar', 'argenprop.com']:
-                raise HTTPException(status_code=400, detail=f"Unsupported website: {website}")
-            
-            # Add background task
-            background_tasks.add_task(
-                scraping_service.scrape_website,
-                website,
-                filters,
-                max_pages
-            )
-            
-            return {
-                "message": f"Scraping started for {website}",
-                "website": website,
-                "filters": filters.dict(),
-                "max_pages": max_pages
-            }
-        else:
-            # Scrape all websites
-            background_tasks.add_task(
-                scraping_service.scrape_all_websites,
-                filters,
-                max_pages
-            )
-            
-            return {
-                "message": "Scraping started for all websites",
-                "websites": ["zonaprop.com.ar", "argenprop.com", "mercadolibre.com.ar", "remax.com.ar", "properati.com.ar", "inmuebles24.com", "navent.com"],
-                "filters": filters.dict(),
-                "max_pages": max_pages
-            }
-            
-    except Exception as e:
-        app_logger.error(f"Error starting scraping: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        return ORJSONResponse({
+            "message": f"Scraping started for {website}",
+            "website": website,
+            "filters": filters.as_dict,
+            "max_pages": max_pages
+        })
+    else:
+        # Scrape all websites
+        _enqueue_scrape(background_tasks, scraping_service, None, filters, max_pages)
+        
+        return ORJSONResponse({
+            "message": "Scraping started for all websites",
+            "websites": SUPPORTED_WEBSITE_URLS,
+            "filters": filters.as_dict,
+            "max_pages": max_pages
+        })
 
 
 @router.post("/start/{website}")
-async def start_website_scraping(
+def start_website_scraping(
     website: str,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
-    property_type: Optional[PropertyType] = None,
-    operation_type: Optional[OperationType] = None,
-    min_price: Optional[float] = None,
-    max_price: Optional[float] = None,
-    currency: Optional[Currency] = None,
-    min_bedrooms: Optional[int] = None,
-    max_bedrooms: Optional[int] = None,
-    min_bathrooms: Optional[int] = None,
-    max_bathrooms: Optional[int] = None,
-    min_area: Optional[float] = None,
-    max_area: Optional[float] = None,
-    province: Optional[str] = None,
-    city: Optional[str] = None,
-    neighborhood: Optional[str] = None,
+    scraping_service: ScrapingService = Depends(get_scraping_service),
+    filters: PropertySearchFilters = Depends(get_search_filters),
     max_pages: Optional[int] = None
 ):
     """Start scraping for a specific website."""
-    try:
-        supported_websites = ['zonaprop.com.ar', 'argenprop.com', 'mercadolibre.com.ar', 'remax.com.ar', 'properati.com.ar', 'inmuebles24.com', 'navent.com']
-        if website not in supported_websites:
-            raise HTTPException(status_code=400, detail=f"Unsupported website: {website}. Supported: {supported_websites}")
-        
-        # Create filters
-        filters = PropertySearchFilters(
-            property_type=property_type,
-            operation_type=operation_type,
-            min_price=min_price,
-            max_price=max_price,
-            currency=currency,
-            min_bedrooms=min_bedrooms,
-            max_bedrooms=max_bedrooms,
-            min_bathrooms=min_bathrooms,
-            max_bathrooms=max_bathrooms,
-            min_area=min_area,
-            max_area=max_area,
-            province=province,
-            city=city,
-            neighborhood=neighborhood
-        )
-        
-        scraping_service = ScrapingService(db)
-        
-        # Add background task
-        background_tasks.add_task(
-            scraping_service.scrape_website,
-            website,
-            filters,
-            max_pages
-        )
-        
-        return {
-            "message": f"Scraping started for {website}",
-            "website": website,
-            "filters": filters.dict(),
-            "max_pages": max_pages
-        }
-        
-    except Exception as e:
-        app_logger.error(f"Error starting scraping for {website}: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    if website not in SUPPORTED_WEBSITES:
+        raise HTTPException(status_code=400, detail=f"Unsupported website: {website}. Supported: {list(SUPPORTED_WEBSITE_URLS)}")
+    
+    _enqueue_scrape(background_tasks, scraping_service, website, filters, max_pages)
+    
+    return ORJSONResponse({
+        "message": f"Scraping started for {website}",
+        "website": website,
+        "filters": filters.as_dict,
+        "max_pages": max_pages
+    })
 
 
 @router.get("/sessions")
-async def get_scraping_sessions(
+def get_scraping_sessions(
     website: Optional[str] = None,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    scraping_service: ScrapingService = Depends(get_scraping_service)
 ):
     """Get scraping sessions."""
-    try:
-        scraping_service = ScrapingService(db)
-        sessions = scraping_service.get_scraping_sessions(website, limit)
-        
-        result = []
-        for session in sessions:
-            result.append({
-                "id": session.id,
-                "website": session.website,
-                "started_at": session.started_at.isoformat() if session.started_at else None,
-                "finished_at": session.finished_at.isoformat() if session.finished_at else None,
-                "status": session.status,
-                "total_pages": session.total_pages,
-                "processed_pages": session.processed_pages,
-                "total_properties": session.total_properties,
-                "new_properties": session.new_properties,
-                "updated_properties": session.updated_properties,
-                "errors": session.errors,
-                "filters": session.filters
-            })
-        
-        return {
-            "sessions": result,
-            "count": len(result),
-            "website_filter": website
-        }
-        
-    except Exception as e:
-        app_logger.error(f"Error getting scraping sessions: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.get("/sessions/{session_id}")
-async def get_scraping_session(session_id: int, db: Session = Depends(get_db)):
-    """Get a specific scraping session."""
-    try:
-        scraping_service = ScrapingService(db)
-        session = scraping_service.db.query(ScrapingSession).filter(
-            ScrapingSession.id == session_id
-        ).first()
-        
-        if not session:
-            raise HTTPException(status_code=404, detail="Scraping session not found")
-        
-        return {
+    sessions = scraping_service.get_scraping_sessions(website, limit)
+    
+    result = []
+    for session in sessions:
+        result.append({
             "id": session.id,
             "website": session.website,
-            "started_at": session.started_at.isoformat() if session.started_at else None,
-            "finished_at": session.finished_at.isoformat() if session.finished_at else None,
+            "started_at": session.started_at,
+            "finished_at": session.finished_at,
             "status": session.status,
             "total_pages": session.total_pages,
             "processed_pages": session.processed_pages,
@@ -223,89 +163,77 @@ async def get_scraping_session(session_id: int, db: Session = Depends(get_db)):
             "new_properties": session.new_properties,
             "updated_properties": session.updated_properties,
             "errors": session.errors,
-            "filters": session.filters,
-            "error_log": session.error_log
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        app_logger.error(f"Error getting scraping session {session_id}: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+            "filters": session.filters
+        })
+    
+    return ORJSONResponse({
+        "sessions": result,
+        "count": len(result),
+        "website_filter": website
+    })
+
+
+@router.get("/sessions/{session_id}")
+def get_scraping_session(session_id: int, scraping_service: ScrapingService = Depends(get_scraping_service)):
+    """Get a specific scraping session."""
+    session = scraping_service.get_scraping_session(session_id)
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Scraping session not found")
+    
+    return ORJSONResponse({
+        "id": session.id,
+        "website": session.website,
+        "started_at": session.started_at,
+        "finished_at": session.finished_at,
+        "status": session.status,
+        "total_pages": session.total_pages,
+        "processed_pages": session.processed_pages,
+        "total_properties": session.total_properties,
+        "new_properties": session.new_properties,
+        "updated_properties": session.updated_properties,
+        "errors": session.errors,
+        "filters": session.filters,
+        "error_log": session.error_log
+    })
 
 
 @router.get("/status")
-async def get_scraping_status(db: Session = Depends(get_db)):
+def get_scraping_status(scraping_service: ScrapingService = Depends(get_scraping_service)):
     """Get current scraping status."""
-    try:
-        scraping_service = ScrapingService(db)
-        stats = scraping_service.get_scraping_statistics()
-        
-        # Get recent sessions
-        recent_sessions = scraping_service.get_scraping_sessions(limit=10)
-        
-        sessions_data = []
-        for session in recent_sessions:
-            sessions_data.append({
-                "id": session.id,
-                "website": session.website,
-                "status": session.status,
-                "started_at": session.started_at.isoformat() if session.started_at else None,
-                "finished_at": session.finished_at.isoformat() if session.finished_at else None,
-                "new_properties": session.new_properties,
-                "updated_properties": session.updated_properties,
-                "errors": session.errors
-            })
-        
-        return {
-            "statistics": stats,
-            "recent_sessions": sessions_data
-        }
-        
-    except Exception as e:
-        app_logger.error(f"Error getting scraping status: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    stats = scraping_service.get_scraping_statistics()
+    
+    # Get recent sessions
+    recent_sessions = scraping_service.get_scraping_sessions(limit=10)
+    
+    sessions_data = []
+    for session in recent_sessions:
+        sessions_data.append({
+            "id": session.id,
+            "website": session.website,
+            "status": session.status,
+            "started_at": session.started_at,
+            "finished_at": session.finished_at,
+            "new_properties": session.new_properties,
+            "updated_properties": session.updated_properties,
+            "errors": session.errors
+        })
+    
+    return ORJSONResponse({
+        "statistics": stats,
+        "recent_sessions": sessions_data
+    })
 
 
 @router.get("/websites")
-async def get_supported_websites():
+async def get_supported_websites(request: Request):
     """Get list of supported websites."""
-    return {
-        "websites": [
-            {
-                "name": "ZonaProp",
-                "url": "zonaprop.com.ar",
-                "description": "Leading real estate portal in Argentina"
-            },
-            {
-                "name": "ArgenProp",
-                "url": "argenprop.com",
-                "description": "Popular real estate search platform"
-            },
-            {
-                "name": "MercadoLibre",
-                "url": "mercadolibre.com.ar",
-                "description": "Argentina's largest e-commerce platform with real estate section"
-            },
-            {
-                "name": "RE/MAX",
-                "url": "remax.com.ar",
-                "description": "International real estate franchise with strong presence in Argentina"
-            },
-            {
-                "name": "Properati",
-                "url": "properati.com.ar",
-                "description": "Modern real estate platform with advanced search features"
-            },
-            {
-                "name": "Inmuebles24",
-                "url": "inmuebles24.com",
-                "description": "Popular real estate portal across Latin America"
-            },
-            {
-                "name": "Navent",
-                "url": "navent.com",
-                "description": "Technology platform powering multiple real estate portals"
-            }
-        ]
-    }
\ No newline at end of file
+    if request.headers.get("if-none-match") == SUPPORTED_WEBSITES_ETAG:
+        return Response(status_code=304, headers=SUPPORTED_WEBSITES_HEADERS)
+    
+    # A fresh Response per request: middleware appends to the header list in place
+    return Response(
+        content=SUPPORTED_WEBSITES_PAYLOAD,
+        media_type="application/json",
+        headers=SUPPORTED_WEBSITES_HEADERS
+    )
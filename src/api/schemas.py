@@ -0,0 +1,175 @@
+from datetime import datetime, timezone
+from operator import attrgetter
+from typing import Any, Optional, Union
+
+import msgspec
+from fastapi.responses import Response
+
+from ..database.models import PropertyDB
+from ..models import PropertyType, OperationType, Currency, PropertyStatus
+
+
+class LocationOut(msgspec.Struct):
+    country: Optional[str]
+    province: Optional[str]
+    city: Optional[str]
+    neighborhood: Optional[str]
+    address: Optional[str]
+    latitude: Optional[float]
+    longitude: Optional[float]
+    postal_code: Optional[str]
+
+
+class FeaturesOut(msgspec.Struct):
+    bedrooms: Optional[int]
+    bathrooms: Optional[int]
+    parking_spaces: Optional[int]
+    total_area: Optional[float]
+    covered_area: Optional[float]
+    floor: Optional[int]
+    total_floors: Optional[int]
+    age: Optional[int]
+    amenities: Optional[list]
+    condition: Optional[str]
+
+
+class PriceOut(msgspec.Struct):
+    amount: Optional[float]
+    currency: Optional[Currency]
+    price_per_sqm: Optional[float]
+    expenses: Optional[float]
+    expenses_currency: Optional[Currency]
+
+
+class ContactOut(msgspec.Struct):
+    agent_name: Optional[str]
+    agency_name: Optional[str]
+    phone: Optional[str]
+    email: Optional[str]
+    website: Optional[str]
+
+
+class ImagesOut(msgspec.Struct):
+    main_image: Optional[str]
+    gallery: Optional[list]
+    floor_plan: Optional[str]
+    virtual_tour: Optional[str]
+
+
+class MetadataOut(msgspec.Struct):
+    first_seen: Optional[datetime]
+    last_updated: Optional[datetime]
+    last_checked: Optional[datetime]
+    is_featured: Optional[bool]
+    is_verified: Optional[bool]
+    # Only included in single-property responses
+    raw_data: Union[dict, None, msgspec.UnsetType] = msgspec.UNSET
+
+
+class PropertyOut(msgspec.Struct):
+    id: int
+    external_id: Optional[str]
+    source_url: Optional[str]
+    source_website: Optional[str]
+    title: Optional[str]
+    description: Optional[str]
+    property_type: Optional[PropertyType]
+    operation_type: Optional[OperationType]
+    status: Optional[PropertyStatus]
+    location: LocationOut
+    features: FeaturesOut
+    price: PriceOut
+    contact: ContactOut
+    images: ImagesOut
+    metadata: MetadataOut
+
+
+class CityLocationOut(msgspec.Struct):
+    city: Optional[str]
+    neighborhood: Optional[str]
+
+
+class PropertySummaryOut(msgspec.Struct, kw_only=True):
+    id: int
+    title: Optional[str]
+    property_type: Optional[PropertyType]
+    operation_type: Optional[OperationType]
+    price_amount: Optional[float]
+    price_currency: Optional[Currency]
+    location: CityLocationOut
+    source_website: Optional[str]
+    # Recent listings report first_seen, updated listings report last_updated
+    first_seen: Union[datetime, None, msgspec.UnsetType] = msgspec.UNSET
+    last_updated: Union[datetime, None, msgspec.UnsetType] = msgspec.UNSET
+    main_image: Optional[str]
+
+
+_encoder = msgspec.json.Encoder()
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Mark a naive UTC timestamp from the database as UTC."""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+# Column readers built once; attrgetter fetches every attribute in a single C call.
+# Struct fields are declared in column order, so the tuples map positionally.
+_get_property_fields = attrgetter(
+    "id", "external_id", "source_url", "source_website", "title", "description",
+    "property_type", "operation_type", "status"
+)
+_get_location_fields = attrgetter(*LocationOut.__struct_fields__)
+_get_features_fields = attrgetter(*FeaturesOut.__struct_fields__)
+_get_price_fields = attrgetter("price_amount", "price_currency", "price_per_sqm", "expenses", "expenses_currency")
+_get_contact_fields = attrgetter(*ContactOut.__struct_fields__)
+_get_images_fields = attrgetter(*ImagesOut.__struct_fields__)
+_get_timestamps = attrgetter("first_seen", "last_updated", "last_checked")
+
+
+def property_to_struct(prop: PropertyDB, include_raw_data: bool = False) -> PropertyOut:
+    """Build the full nested representation of a property."""
+    first_seen, last_updated, last_checked = _get_timestamps(prop)
+    return PropertyOut(
+        *_get_property_fields(prop),
+        location=LocationOut(*_get_location_fields(prop)),
+        features=FeaturesOut(*_get_features_fields(prop)),
+        price=PriceOut(*_get_price_fields(prop)),
+        contact=ContactOut(*_get_contact_fields(prop)),
+        images=ImagesOut(*_get_images_fields(prop)),
+        metadata=MetadataOut(
+            first_seen=_utc(first_seen),
+            last_updated=_utc(last_updated),
+            last_checked=_utc(last_checked),
+            is_featured=prop.is_featured,
+            is_verified=prop.is_verified,
+            raw_data=prop.raw_data if include_raw_data else msgspec.UNSET
+        )
+    )
+
+
+def property_to_summary(prop: PropertyDB, timestamp_field: str = "first_seen") -> PropertySummaryOut:
+    """Build the short listing representation of a property."""
+    return PropertySummaryOut(
+        id=prop.id,
+        title=prop.title,
+        property_type=prop.property_type,
+        operation_type=prop.operation_type,
+        price_amount=prop.price_amount,
+        price_currency=prop.price_currency,
+        location=CityLocationOut(city=prop.city, neighborhood=prop.neighborhood),
+        source_website=prop.source_website,
+        main_image=prop.main_image,
+        **{timestamp_field: _utc(getattr(prop, timestamp_field))}
+    )
+
+
+def msgspec_response(payload: Any, **kwargs) -> Response:
+    """Encode payload (dicts, lists, Structs, dataclasses) with msgspec into a JSON response."""
+    return Response(content=_encoder.encode(payload), media_type="application/json", **kwargs)
+
+
+def ndjson_line(payload: Any) -> bytes:
+    """Encode payload with msgspec as a single newline-terminated NDJSON record."""
+    return _encoder.encode(payload) + b"\n"
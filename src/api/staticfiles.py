@@ -0,0 +1,28 @@
+import os
+import re
+
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+# Files whose name carries a content hash, e.g. app.3f9a1c2b.js
+FINGERPRINTED_NAME = re.compile(r"\.[0-9a-f]{8,}\.[A-Za-z0-9]+$")
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers cache fingerprinted assets forever."""
+    
+    def file_response(
+        self,
+        full_path: os.PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if FINGERPRINTED_NAME.search(os.fspath(full_path)):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            # Unversioned files (the dashboard page) must be revalidated via ETag
+            response.headers["Cache-Control"] = "no-cache"
+        return response
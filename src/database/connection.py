@@ -1,16 +1,25 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, insert, or_, select, update
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool, StaticPool
+from sqlalchemy.dialects import postgresql, sqlite
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, Dict, Generator, Iterator, List, Optional, Tuple
 
-from .models import Base
+from .models import Base, PropertyDB
 from ..utils import settings, app_logger
 
 
 class DatabaseManager:
     """Database connection and session management."""
     
+    # Listing fields compared with the stored row; a stored property is only refreshed when one differs
+    LISTING_COLUMNS = (
+        "title", "description", "status", "price_amount", "price_currency", "price_per_sqm",
+        "expenses", "expenses_currency", "main_image", "gallery"
+    )
+    # Fields written when a stored property is refreshed
+    UPSERT_COLUMNS = LISTING_COLUMNS + ("last_updated", "last_checked", "raw_data")
+    
     def __init__(self):
         self.engine = None
         self.SessionLocal = None
@@ -22,17 +31,37 @@ class DatabaseManager:
             # Create engine
             if settings.database_url.startswith('sqlite'):
                 # SQLite specific configuration
-                self.engine = create_engine(
-                    settings.database_url,
-                    connect_args={"check_same_thread": False},
-                    poolclass=StaticPool,
-                    echo=settings.api_debug
-                )
+                if self._is_sqlite_memory(settings.database_url):
+                    # An in-memory database only exists on its one connection
+                    self.engine = create_engine(
+                        settings.database_url,
+                        connect_args={"check_same_thread": False},
+                        poolclass=StaticPool,
+                        insertmanyvalues_page_size=settings.db_insert_page_size,
+                        echo=settings.api_debug
+                    )
+                else:
+                    self.engine = create_engine(
+                        settings.database_url,
+                        connect_args={"check_same_thread": False},
+                        poolclass=QueuePool,
+                        pool_size=settings.db_pool_size,
+                        max_overflow=settings.db_max_overflow,
+                        pool_timeout=settings.db_pool_timeout,
+                        insertmanyvalues_page_size=settings.db_insert_page_size,
+                        echo=settings.api_debug
+                    )
+                    event.listen(self.engine, "connect", self._set_sqlite_pragmas)
             else:
                 # PostgreSQL or other databases
                 self.engine = create_engine(
                     settings.database_url,
+                    pool_size=settings.db_pool_size,
+                    max_overflow=settings.db_max_overflow,
+                    pool_timeout=settings.db_pool_timeout,
+                    pool_recycle=settings.db_pool_recycle,
                     pool_pre_ping=True,
+                    insertmanyvalues_page_size=settings.db_insert_page_size,
                     echo=settings.api_debug
                 )
                 
@@ -49,6 +78,19 @@ class DatabaseManager:
             app_logger.error(f"Failed to setup database: {e}")
             raise
             
+    @staticmethod
+    def _is_sqlite_memory(url: str) -> bool:
+        """Whether a SQLite URL points at an in-memory database."""
+        return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+        
+    @staticmethod
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Enable WAL so readers don't block the writer and batched inserts commit cheaply."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+        
     def create_tables(self):
         """Create all database tables."""
         try:
@@ -67,6 +109,92 @@ class DatabaseManager:
             app_logger.error(f"Failed to drop tables: {e}")
             raise
             
+    def bulk_upsert_properties(self, rows: List[Dict[str, Any]], session: Optional[Session] = None) -> int:
+        """Insert scraped property rows in batched statements, refreshing listings already stored by source_url."""
+        if not rows:
+            return 0
+            
+        if session is None:
+            # Run in a transaction of its own
+            with self.SessionLocal.begin() as own_session:
+                return self.bulk_upsert_properties(rows, session=own_session)
+                
+        # The caller's session may be bound elsewhere than the default engine
+        dialect = session.get_bind().dialect.name
+        if dialect == "postgresql":
+            stmt = postgresql.insert(PropertyDB)
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(PropertyDB)
+        else:
+            self._insert_or_refresh(rows, session)
+            return len(rows)
+            
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PropertyDB.source_url],
+            set_={column: stmt.excluded[column] for column in self.UPSERT_COLUMNS},
+            # Unchanged listings keep their stored row, last_updated included
+            where=or_(*(
+                getattr(PropertyDB, column).is_distinct_from(stmt.excluded[column])
+                for column in self.LISTING_COLUMNS
+            ))
+        )
+        
+        # executemany form: rows are sent insertmanyvalues_page_size at a time; the caller commits
+        session.execute(stmt, rows)
+        return len(rows)
+        
+    def changed_listings(self, rows_by_id: Dict[int, Dict[str, Any]],
+                         session: Session) -> Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """(stored listing fields, scraped row) for the stored properties whose listing fields differ from the scraped row."""
+        if not rows_by_id:
+            return {}
+            
+        columns = [getattr(PropertyDB, column) for column in self.LISTING_COLUMNS]
+        changed = {}
+        for property_id, *values in session.execute(
+            select(PropertyDB.id, *columns).where(PropertyDB.id.in_(list(rows_by_id)))
+        ):
+            stored = dict(zip(self.LISTING_COLUMNS, values))
+            row = rows_by_id[property_id]
+            if any(stored[column] != row[column] for column in self.LISTING_COLUMNS):
+                changed[property_id] = (stored, row)
+        return changed
+        
+    def bulk_refresh_properties(self, rows_by_id: Dict[int, Dict[str, Any]], session: Session) -> int:
+        """Refresh the listing fields of stored properties, keyed by primary key, in one executemany UPDATE."""
+        if not rows_by_id:
+            return 0
+        session.execute(update(PropertyDB), [
+            {"id": property_id, **{column: row[column] for column in self.UPSERT_COLUMNS}}
+            for property_id, row in rows_by_id.items()
+        ])
+        return len(rows_by_id)
+        
+    def _insert_or_refresh(self, rows: List[Dict[str, Any]], session: Session):
+        """Portable upsert for dialects without ON CONFLICT: look up stored rows by source_url, then insert or update."""
+        stored = dict(session.execute(
+            select(PropertyDB.source_url, PropertyDB.id).where(PropertyDB.source_url.in_([row["source_url"] for row in rows]))
+        ).all())
+        
+        new_rows = [row for row in rows if row["source_url"] not in stored]
+        if new_rows:
+            session.execute(insert(PropertyDB), new_rows)
+        changed = self.changed_listings(
+            {stored[row["source_url"]]: row for row in rows if row["source_url"] in stored}, session
+        )
+        self.bulk_refresh_properties({property_id: row for property_id, (_, row) in changed.items()}, session)
+        
+    def stream(self, stmt, session: Optional[Session] = None, yield_per: int = 1000) -> Iterator[Any]:
+        """Iterate a select's entities in batches of yield_per rows instead of loading them all."""
+        # yield_per also turns on stream_results, i.e. a server-side cursor on PostgreSQL
+        stmt = stmt.execution_options(yield_per=yield_per)
+        if session is not None:
+            yield from session.execute(stmt).scalars()
+            return
+            
+        with self.get_session() as own_session:
+            yield from own_session.execute(stmt).scalars()
+            
     @contextmanager
     def get_session(self) -> Generator[Session, None, None]:
         """Get database session with automatic cleanup."""
@@ -1,4 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, JSON, Enum
+from sqlalchemy import (
+    DDL, Column, Computed, Integer, SmallInteger, String, Float, DateTime, Boolean, Text, JSON, Index,
+    TypeDecorator, case, event, select
+)
+from sqlalchemy.dialects.postgresql import CITEXT, JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -8,6 +12,45 @@ from ..models import PropertyType, OperationType, Currency, PropertyStatus
 
 Base = declarative_base()
 
+# Binary JSON on PostgreSQL (indexable, parsed once on write); plain JSON elsewhere
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+
+def CaseInsensitiveString(length: int):
+    """String that compares case-insensitively on PostgreSQL (CITEXT), so equality needs no LOWER()."""
+    return String(length).with_variant(CITEXT(), "postgresql")
+
+
+class EnumCode(TypeDecorator):
+    """Stores an Enum member as a SMALLINT code: its 1-based position in the Enum."""
+    # Codes are positional, so new members must only ever be appended to the Enum
+    impl = SmallInteger
+    cache_ok = True
+    
+    def __init__(self, enum_class, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.enum_class = enum_class
+        self.members = tuple(enum_class)
+        self.codes = {member: code for code, member in enumerate(self.members, 1)}
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        # Accepts members as well as their values ("apartment")
+        return self.codes[self.enum_class(value)]
+    
+    def process_literal_param(self, value, dialect):
+        return str(self.process_bind_param(value, dialect))
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self.members[value - 1]
+    
+    def value_expression(self, column):
+        """SQL expression turning the stored codes of column back into the Enum values."""
+        return case({code: member.value for member, code in self.codes.items()}, value=column)
+
 
 class PropertyDB(Base):
     __tablename__ = "properties"
@@ -20,49 +63,51 @@ class PropertyDB(Base):
     # Basic information
     title = Column(String(500), index=True)
     description = Column(Text)
-    property_type = Column(Enum(PropertyType), index=True)
-    operation_type = Column(Enum(OperationType), index=True)
-    status = Column(Enum(PropertyStatus), default=PropertyStatus.ACTIVE, index=True)
+    property_type = Column(EnumCode(PropertyType), index=True)
+    operation_type = Column(EnumCode(OperationType))
+    status = Column(EnumCode(PropertyStatus), default=PropertyStatus.ACTIVE)
     
     # Location
     country = Column(String(100), default="Argentina")
     province = Column(String(100), index=True)
-    city = Column(String(100), index=True)
-    neighborhood = Column(String(100), index=True)
+    city = Column(CaseInsensitiveString(100), index=True)
+    neighborhood = Column(CaseInsensitiveString(100), index=True)
     address = Column(String(500))
     latitude = Column(Float)
     longitude = Column(Float)
     postal_code = Column(String(20))
     
     # Features
-    bedrooms = Column(Integer, index=True)
-    bathrooms = Column(Integer, index=True)
+    bedrooms = Column(Integer)
+    bathrooms = Column(Integer)
     parking_spaces = Column(Integer)
     total_area = Column(Float, index=True)
     covered_area = Column(Float)
     floor = Column(Integer)
     total_floors = Column(Integer)
     age = Column(Integer)
-    amenities = Column(JSON)
+    amenities = Column(JSONType)
     condition = Column(String(100))
     
     # Pricing
     price_amount = Column(Float, index=True)
-    price_currency = Column(Enum(Currency), index=True)
+    # 10k-wide price band, computed by the database for price histograms
+    price_bucket = Column(Integer, Computed("CAST(price_amount / 10000 AS INTEGER)", persisted=True))
+    price_currency = Column(EnumCode(Currency), index=True)
     price_per_sqm = Column(Float)
     expenses = Column(Float)
-    expenses_currency = Column(Enum(Currency))
+    expenses_currency = Column(EnumCode(Currency))
     
     # Contact information
     agent_name = Column(String(200))
-    agency_name = Column(String(200), index=True)
+    agency_name = Column(CaseInsensitiveString(200), index=True)
     phone = Column(String(50))
-    email = Column(String(200))
+    email = Column(CaseInsensitiveString(200))
     website = Column(String(500))
     
     # Media
     main_image = Column(String(500))
-    gallery = Column(JSON)
+    gallery = Column(JSONType)
     floor_plan = Column(String(500))
     virtual_tour = Column(String(500))
     
@@ -70,16 +115,60 @@ class PropertyDB(Base):
     first_seen = Column(DateTime, default=func.now(), index=True)
     last_updated = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
     last_checked = Column(DateTime, default=func.now(), index=True)
-    is_featured = Column(Boolean, default=False, index=True)
-    is_verified = Column(Boolean, default=False, index=True)
+    is_featured = Column(Boolean, default=False)
+    is_verified = Column(Boolean, default=False)
     
     # Additional data
-    raw_data = Column(JSON)
+    raw_data = Column(JSONType)
     
+    __table_args__ = (
+        # Equality filters of the search endpoint followed by the price range; on
+        # PostgreSQL the other range columns ride along so the index covers the search
+        Index(
+            "ix_properties_search",
+            "operation_type", "property_type", "city", "price_amount",
+            postgresql_include=["bedrooms", "total_area"]
+        ),
+        Index("ix_properties_geo", "latitude", "longitude"),
+        # Most recently updated active listings, without sold or removed ones in the index
+        Index(
+            "ix_properties_active_recent", "last_updated",
+            postgresql_where=status == PropertyStatus.ACTIVE,
+            sqlite_where=status == PropertyStatus.ACTIVE
+        ),
+        # Substring title search (ILIKE '%...%') via trigrams on PostgreSQL
+        Index(
+            "ix_properties_title_trgm", "title",
+            postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        # Containment lookups on amenities (amenities ? 'pileta', @>) on PostgreSQL
+        Index("ix_properties_amenities_gin", "amenities", postgresql_using="gin").ddl_if(dialect="postgresql"),
+        # Cheap price range filtering on large tables (BRIN is PostgreSQL only)
+        Index("ix_properties_price_brin", "price_amount", postgresql_using="brin").ddl_if(dialect="postgresql"),
+    )
+    
+    @classmethod
+    def select_for_insights(cls, session, limit: int):
+        """Latest properties reduced to the columns the market insights prompt reads."""
+        return session.execute(
+            select(
+                cls.property_type, cls.operation_type, cls.price_amount, cls.price_currency,
+                cls.city, cls.neighborhood, cls.total_area, cls.covered_area, cls.bedrooms, cls.bathrooms
+            ).order_by(cls.last_updated.desc()).limit(limit)
+        ).all()
+        
     def __repr__(self):
         return f"<PropertyDB(id={self.id}, title='{self.title}', source='{self.source_website}')>"
 
 
+# Extensions behind the CITEXT columns and the trigram index
+for extension in ("citext", "pg_trgm"):
+    event.listen(
+        PropertyDB.__table__, "before_create",
+        DDL(f"CREATE EXTENSION IF NOT EXISTS {extension}").execute_if(dialect="postgresql")
+    )
+
+
 class PropertyHistory(Base):
     __tablename__ = "property_history"
     
@@ -94,7 +183,13 @@ class PropertyHistory(Base):
     new_value = Column(Text)
     
     # When it changed
-    changed_at = Column(DateTime, default=func.now(), index=True)
+    changed_at = Column(DateTime, default=func.now())
+    
+    __table_args__ = (
+        # Rows arrive in changed_at order, so a BRIN index stays tiny on PostgreSQL;
+        # other databases ignore postgresql_using and get a regular B-tree
+        Index("ix_property_history_changed_at", "changed_at", postgresql_using="brin"),
+    )
     
     def __repr__(self):
         return f"<PropertyHistory(property_id={self.property_id}, field='{self.field_name}', changed_at='{self.changed_at}')>"
@@ -159,7 +254,11 @@ class PropertyView(Base):
     # View details
     ip_address = Column(String(45))
     user_agent = Column(String(500))
-    viewed_at = Column(DateTime, default=func.now(), index=True)
+    viewed_at = Column(DateTime, default=func.now())
+    
+    __table_args__ = (
+        Index("ix_property_views_viewed_at", "viewed_at", postgresql_using="brin"),
+    )
     
     def __repr__(self):
         return f"<PropertyView(property_id={self.property_id}, viewed_at='{self.viewed_at}')>"
\ No newline at end of file
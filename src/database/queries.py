@@ -0,0 +1,86 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import bindparam, desc, lambda_stmt, select
+from sqlalchemy.orm import Session, load_only
+
+from .models import PropertyDB
+from ..models import PropertyStatus
+
+
+# Columns read by the short listing representations (recent/updated lists, dashboards)
+SUMMARY_COLUMNS = (
+    PropertyDB.id,
+    PropertyDB.title,
+    PropertyDB.property_type,
+    PropertyDB.operation_type,
+    PropertyDB.price_amount,
+    PropertyDB.price_currency,
+    PropertyDB.city,
+    PropertyDB.neighborhood,
+    PropertyDB.source_website,
+    PropertyDB.main_image,
+    PropertyDB.first_seen,
+    PropertyDB.last_updated,
+)
+
+# Hot read statements as lambda_stmt: the construct and its compiled SQL are
+# cached on first use, so later calls only bind the parameters
+_active_properties_stmt = lambda_stmt(
+    lambda: select(PropertyDB)
+    .where(PropertyDB.status == bindparam("status"))
+    .order_by(PropertyDB.last_updated.desc())
+    .limit(bindparam("lim"))
+)
+
+_properties_by_update_stmt = lambda_stmt(
+    lambda: select(PropertyDB)
+    .order_by(desc(PropertyDB.last_updated))
+    .offset(bindparam("skip"))
+    .limit(bindparam("lim"))
+)
+
+_recent_properties_stmt = lambda_stmt(
+    lambda: select(PropertyDB)
+    .options(load_only(*SUMMARY_COLUMNS))
+    .where(PropertyDB.first_seen >= bindparam("since"))
+    .order_by(desc(PropertyDB.first_seen))
+    .limit(bindparam("lim"))
+)
+
+_updated_properties_stmt = lambda_stmt(
+    lambda: select(PropertyDB)
+    .options(load_only(*SUMMARY_COLUMNS))
+    .where(PropertyDB.last_updated >= bindparam("since"))
+    .order_by(desc(PropertyDB.last_updated))
+    .limit(bindparam("lim"))
+)
+
+_property_by_url_stmt = lambda_stmt(
+    lambda: select(PropertyDB).where(PropertyDB.source_url == bindparam("url")).limit(1)
+)
+
+
+def list_active_properties(session: Session, limit: int) -> List[PropertyDB]:
+    """Active properties, most recently updated first."""
+    return session.scalars(_active_properties_stmt, {"status": PropertyStatus.ACTIVE, "lim": limit}).all()
+
+
+def list_properties(session: Session, skip: int, limit: int) -> List[PropertyDB]:
+    """A page of properties, most recently updated first."""
+    return session.scalars(_properties_by_update_stmt, {"skip": skip, "lim": limit}).all()
+
+
+def list_recent_properties(session: Session, since: datetime, limit: int) -> List[PropertyDB]:
+    """Properties first seen since a moment, with only the summary columns loaded."""
+    return session.scalars(_recent_properties_stmt, {"since": since, "lim": limit}).all()
+
+
+def list_updated_properties(session: Session, since: datetime, limit: int) -> List[PropertyDB]:
+    """Properties updated since a moment, with only the summary columns loaded."""
+    return session.scalars(_updated_properties_stmt, {"since": since, "lim": limit}).all()
+
+
+def find_property_by_url(session: Session, source_url: str) -> Optional[PropertyDB]:
+    """The property scraped from a source URL, if stored."""
+    return session.scalars(_property_by_url_stmt, {"url": source_url}).first()
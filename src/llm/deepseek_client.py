@@ -1,10 +1,135 @@
-import json
-import requests
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
+import asyncio
+import hashlib
+import httpx
+import orjson
+import textwrap
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing, closing
+from typing import Dict, Any, Hashable, Optional, List, AsyncIterator, Iterator, Sequence, Tuple, TypeVar
+from dataclasses import asdict, dataclass
 
 from ..utils import app_logger
 from ..utils import settings
+from ..utils import LRUCache, SQLiteCache
+
+H = TypeVar("H", bound=Hashable)
+
+# Successful answers keyed by a hash of the full request; shared by all clients. The
+# SQLite tier keeps them across restarts and re-crawls of unchanged listings
+_response_cache = LRUCache(maxsize=settings.llm_cache_size)
+_persistent_cache = SQLiteCache(
+    settings.llm_cache_path, table="llm_cache",
+    ttl=settings.llm_cache_ttl, max_rows=settings.llm_cache_max_rows
+) if settings.llm_cache_path else None
+
+
+def dedup_inputs(items: Sequence[H]) -> Tuple[List[H], List[int]]:
+    """Distinct items in first-seen order, plus each original item's index among them"""
+    index_of: Dict[H, int] = {}
+    positions = [index_of.setdefault(item, len(index_of)) for item in items]
+    return list(index_of), positions
+
+# System and user prompts are built once at import; templates are filled with format_map
+_SYS_ANALYZE = textwrap.dedent("""
+    Eres un experto en análisis de propiedades inmobiliarias en Argentina.
+    Tu tarea es analizar descripciones de propiedades y extraer información estructurada.
+
+    Extrae la siguiente información del texto:
+    - Tipo de propiedad (departamento, casa, oficina, local, terreno)
+    - Número de dormitorios
+    - Número de baños
+    - Superficie total y cubierta (en m²)
+    - Piso (si aplica)
+    - Amenities y características especiales
+    - Estado de la propiedad (nuevo, usado, a estrenar, etc.)
+    - Ubicación específica (barrio, zona)
+    - Precio estimado si se menciona
+    - Puntos destacados de la propiedad
+
+    Responde en formato JSON válido.
+""").strip()
+
+_SYS_ENHANCE = textwrap.dedent("""
+    Eres un experto en marketing inmobiliario en Argentina.
+    Tu tarea es mejorar descripciones de propiedades para hacerlas más atractivas y completas.
+
+    Reglas:
+    - Mantén la información factual exacta
+    - Usa un tono profesional pero atractivo
+    - Incluye características destacadas
+    - Menciona la ubicación de manera atractiva
+    - Agrega valor percibido sin exagerar
+    - Usa español argentino
+    - Máximo 300 palabras
+""").strip()
+
+_SYS_CLASSIFY = textwrap.dedent("""
+    Clasifica el tipo de propiedad basándote en el título y descripción.
+
+    Tipos válidos:
+    - apartment (departamento)
+    - house (casa, chalet, PH)
+    - commercial (local comercial, negocio)
+    - office (oficina)
+    - land (terreno, lote)
+
+    Responde solo con una palabra: apartment, house, commercial, office, o land
+""").strip()
+
+_SYS_LOCATION = textwrap.dedent("""
+    Extrae información detallada de ubicación de propiedades en Argentina.
+
+    Del texto de ubicación, identifica:
+    - provincia (province)
+    - ciudad (city)
+    - barrio (neighborhood)
+    - zona específica (area)
+
+    Responde en formato JSON con las claves: province, city, neighborhood, area
+    Si algún dato no está disponible, usa null.
+""").strip()
+
+_SYS_SUMMARY = textwrap.dedent("""
+    Genera un resumen conciso y atractivo de una propiedad inmobiliaria.
+    El resumen debe ser de máximo 100 palabras y destacar los puntos más importantes.
+    Usa español argentino y un tono profesional.
+""").strip()
+
+_SYS_COMBINED = textwrap.dedent("""
+    Eres un experto en análisis y marketing de propiedades inmobiliarias en Argentina.
+    Analiza la propiedad y responde con un único objeto JSON con estas claves:
+
+    - extracted_features: objeto con tipo de propiedad, dormitorios, baños, superficie total y
+      cubierta (m²), piso, amenities, estado, ubicación específica, precio si se menciona y
+      puntos destacados
+    - enhanced_description: descripción mejorada y atractiva, factual, en español argentino,
+      máximo 300 palabras
+    - property_type: una palabra entre apartment, house, commercial, office o land
+    - location: objeto con las claves province, city, neighborhood, area (null si no se conoce)
+    - summary: resumen profesional de máximo 100 palabras en español argentino
+""").strip()
+
+_USER_ANALYZE = "Analiza esta descripción de propiedad:\n\n{text}"
+_USER_ENHANCE = textwrap.dedent("""
+    Mejora esta descripción de propiedad:
+
+    Título: {title}
+    Descripción actual: {description}
+    Características: {features}
+
+    Genera una descripción mejorada y atractiva.
+""").strip()
+_USER_CLASSIFY = "Título: {title}\nDescripción: {description}"
+_USER_LOCATION = "Ubicación: {location}"
+_USER_SUMMARY = "Genera un resumen para esta propiedad:\n\n{property}"
+_USER_COMBINED = textwrap.dedent("""
+    Título: {title}
+    Descripción: {description}
+    Características: {features}
+    Ubicación: {location}
+""").strip()
 
 
 @dataclass
@@ -17,14 +142,96 @@ class LLMResponse:
     error: Optional[str] = None
 
 
+class JSONObjectTracker:
+    """Follows streamed text and reports where the first top-level JSON object closes"""
+    
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, chunk: str) -> Optional[int]:
+        """Consume a chunk; return the offset just past the closing brace, or None if still open"""
+        for index, char in enumerate(chunk):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = self.started
+            elif char == '{':
+                self.depth += 1
+                self.started = True
+            elif char == '}' and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return index + 1
+        return None
+
+
+# LLMResponse.error while the circuit breaker short-circuits calls
+CIRCUIT_OPEN = "circuit_open"
+
+
+class CircuitBreaker:
+    """Fails calls fast for reset_timeout seconds after fail_max consecutive failures"""
+    
+    def __init__(self, fail_max: int = 5, reset_timeout: float = 30):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently being short-circuited"""
+        with self._lock:
+            return self.opened_at is not None and time.monotonic() - self.opened_at < self.reset_timeout
+    
+    def allow(self) -> bool:
+        """Whether a call may go out; after reset_timeout one trial call is let through"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            # Half-open: restart the timer so other callers keep failing fast during the trial
+            self.opened_at = time.monotonic()
+            return True
+    
+    def record_success(self):
+        """Close the circuit"""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+    
+    def record_failure(self):
+        """Count a failure, opening the circuit once fail_max is reached"""
+        with self._lock:
+            self.failures += 1
+            if self.failures < self.fail_max:
+                return
+            if self.opened_at is None:
+                app_logger.warning(
+                    f"LLM circuit opened after {self.failures} consecutive failures; "
+                    f"failing fast for {self.reset_timeout}s"
+                )
+            self.opened_at = time.monotonic()
+
+
 class DeepSeekClient:
     """Client for DeepSeek R1 local LLM"""
     
     def __init__(self, base_url: str = None, api_key: str = None):
-        self.base_url = base_url or getattr(settings, 'DEEPSEEK_BASE_URL', 'http://localhost:11434')
-        self.api_key = api_key or getattr(settings, 'DEEPSEEK_API_KEY', None)
-        self.model = getattr(settings, 'DEEPSEEK_MODEL', 'deepseek-r1:latest')
-        self.timeout = getattr(settings, 'DEEPSEEK_TIMEOUT', 30)
+        self.base_url = base_url or settings.deepseek_base_url
+        self.api_key = api_key or settings.deepseek_api_key
+        self.model = settings.deepseek_model
+        self.timeout = settings.deepseek_timeout
         
         # Headers for API requests
         self.headers = {
@@ -32,152 +239,413 @@ class DeepSeekClient:
         }
         if self.api_key:
             self.headers['Authorization'] = f'Bearer {self.api_key}'
+        
+        # Persistent sync client: keep-alive connections are reused across calls
+        # instead of a new TCP (and TLS) handshake per request
+        self.session = httpx.Client(
+            base_url=self.base_url,
+            http2=settings.deepseek_http2,
+            headers=self.headers,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32)
+        )
+        
+        # Async HTTP client and request semaphore, created on first use inside the event loop
+        self._async_session: Optional[httpx.AsyncClient] = None
+        self._async_limit: Optional[asyncio.Semaphore] = None
+        
+        # Shared by sync and async calls: an unreachable server costs one timeout
+        # per fail_max calls instead of one per call
+        self._breaker = CircuitBreaker(settings.llm_breaker_fail_max, settings.llm_breaker_reset_timeout)
+    
+    @property
+    def circuit_open(self) -> bool:
+        """Whether LLM calls are currently failing fast"""
+        return self._breaker.is_open
     
-    def generate(self, prompt: str, system_prompt: str = None, **kwargs) -> LLMResponse:
-        """Generate text using DeepSeek R1 model"""
+    @property
+    def async_session(self) -> httpx.AsyncClient:
+        """Lazily created async HTTP client shared by the async helpers"""
+        if self._async_session is None:
+            # Keep connections warm so concurrent analyses don't reconnect per call
+            self._async_session = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=settings.deepseek_http2,
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+            )
+        return self._async_session
+    
+    @property
+    def async_limit(self) -> asyncio.Semaphore:
+        """Caps concurrent async requests at llm_max_concurrency"""
+        if self._async_limit is None:
+            self._async_limit = asyncio.Semaphore(settings.llm_max_concurrency)
+        return self._async_limit
+    
+    def close(self):
+        """Close the sync HTTP client"""
+        self.session.close()
+    
+    async def aclose(self):
+        """Close the async HTTP client if it was created"""
+        if self._async_session is not None:
+            await self._async_session.aclose()
+            self._async_session = None
+            self._async_limit = None
+    
+    def _build_chat_payload(self, prompt: str, system_prompt: str = None, stream: bool = False,
+                            model: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Build the /api/chat request body; model overrides the client's model for this request"""
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        
+        data = {
+            "model": model or self.model,
+            "messages": messages,
+            "stream": stream,
+            **kwargs
+        }
+        # Keeping the model loaded keeps its KV cache, so the next request that
+        # starts with the same system prompt reuses the already evaluated prefix
+        if settings.deepseek_keep_alive:
+            data.setdefault("keep_alive", settings.deepseek_keep_alive)
+        return data
+    
+    def _success_response(self, result: Dict[str, Any]) -> LLMResponse:
+        """Build an LLMResponse from a /api/chat JSON body"""
+        return LLMResponse(
+            content=result.get('message', {}).get('content', ''),
+            usage=result.get('usage', {}),
+            model=result.get('model', self.model),
+            success=True
+        )
+    
+    def _error_response(self, error: str) -> LLMResponse:
+        """Build a failed LLMResponse"""
+        return LLMResponse(
+            content="",
+            usage={},
+            model=self.model,
+            success=False,
+            error=error
+        )
+    
+    def _cache_key(self, data: Dict[str, Any]) -> str:
+        """Content address of a chat request: model, messages and options"""
+        # keep_alive only affects the server, not the answer
+        data = {name: value for name, value in data.items() if name != "keep_alive"}
+        payload = orjson.dumps(data, option=orjson.OPT_SORT_KEYS, default=str)
+        return hashlib.blake2b(f"{self.base_url}\n".encode() + payload, digest_size=20).hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional[LLMResponse]:
+        """Cached answer from memory, then from the persistent tier (promoted to memory)"""
+        cached = _response_cache.get(key)
+        if cached is not None or _persistent_cache is None:
+            return cached
+        try:
+            stored = _persistent_cache.get(key)
+        except Exception as e:
+            app_logger.warning(f"LLM cache read failed: {e}")
+            return None
+        if stored is None:
+            return None
+        cached = LLMResponse(**orjson.loads(stored))
+        _response_cache.set(key, cached)
+        return cached
+    
+    def _cache_set(self, key: str, result: LLMResponse):
+        """Store a successful answer in both cache tiers"""
+        _response_cache.set(key, result)
+        if _persistent_cache is None:
+            return
         try:
-            # Prepare messages
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": prompt})
+            _persistent_cache.set(key, orjson.dumps(asdict(result)).decode())
+        except Exception as e:
+            app_logger.warning(f"LLM cache write failed: {e}")
+    
+    def cached_answer(self, prompt: str, system_prompt: str = None, **kwargs) -> Optional[str]:
+        """Cached answer to a single request, if any, without calling the API"""
+        cached = self._cache_get(self._cache_key(self._build_chat_payload(prompt, system_prompt, **kwargs)))
+        return cached.content if cached is not None else None
+    
+    def cache_answer(self, prompt: str, system_prompt: str, content: str, **kwargs):
+        """Store an answer obtained elsewhere (e.g. from a batched request) as the answer to a single request"""
+        data = self._build_chat_payload(prompt, system_prompt, **kwargs)
+        self._cache_set(self._cache_key(data), LLMResponse(content=content, usage={}, model=data["model"], success=True))
+    
+    def _streamed_response(self, content: Optional[str]) -> LLMResponse:
+        """Build an LLMResponse from text collected off a stream; None means the JSON object never closed"""
+        if content is None:
+            app_logger.warning("DeepSeek stream ended before the JSON object closed")
+            return self._error_response("Incomplete JSON answer")
+        return LLMResponse(content=content, usage={}, model=self.model, success=True)
+    
+    def generate(self, prompt: str, system_prompt: str = None, cache: bool = True, stream: bool = False,
+                 **kwargs) -> LLMResponse:
+        """Generate text using DeepSeek R1 model; identical requests are answered from the cache"""
+        try:
+            data = self._build_chat_payload(prompt, system_prompt, stream=False, **kwargs)
+            
+            key = self._cache_key(data) if cache else None
+            if key:
+                cached = self._cache_get(key)
+                if cached is not None:
+                    return cached
+            
+            if not self._breaker.allow():
+                return self._error_response(CIRCUIT_OPEN)
             
-            # Prepare request data
-            data = {
-                "model": self.model,
-                "messages": messages,
-                "stream": False,
-                **kwargs
-            }
+            # stream=True is for JSON answers: stop reading as soon as the object closes
+            if stream:
+                content = self._read_json_object(self.generate_stream(prompt, system_prompt, **kwargs))
+                result = self._streamed_response(content)
+                self._breaker.record_success()
+                if key and result.success:
+                    self._cache_set(key, result)
+                return result
             
             # Make API request
-            response = requests.post(
-                f"{self.base_url}/api/chat",
-                headers=self.headers,
-                json=data,
-                timeout=self.timeout
-            )
+            response = self._post_chat(data)
             
             if response.status_code == 200:
-                result = response.json()
-                return LLMResponse(
-                    content=result.get('message', {}).get('content', ''),
-                    usage=result.get('usage', {}),
-                    model=result.get('model', self.model),
-                    success=True
-                )
+                self._breaker.record_success()
+                result = self._success_response(orjson.loads(response.content))
+                if key:
+                    self._cache_set(key, result)
+                return result
             else:
+                self._breaker.record_failure()
                 app_logger.error(f"DeepSeek API error: {response.status_code} - {response.text}")
-                return LLMResponse(
-                    content="",
-                    usage={},
-                    model=self.model,
-                    success=False,
-                    error=f"API error: {response.status_code}"
-                )
+                return self._error_response(f"API error: {response.status_code}")
                 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
+            self._breaker.record_failure()
             app_logger.error(f"DeepSeek connection error: {e}")
-            return LLMResponse(
-                content="",
-                usage={},
-                model=self.model,
-                success=False,
-                error=f"Connection error: {str(e)}"
-            )
+            return self._error_response(f"Connection error: {str(e)}")
         except Exception as e:
             app_logger.error(f"DeepSeek unexpected error: {e}")
-            return LLMResponse(
-                content="",
-                usage={},
-                model=self.model,
-                success=False,
-                error=f"Unexpected error: {str(e)}"
-            )
+            return self._error_response(f"Unexpected error: {str(e)}")
     
-    def analyze_property_text(self, text: str) -> Dict[str, Any]:
-        """Analyze property description and extract structured data"""
-        system_prompt = """
-        Eres un experto en análisis de propiedades inmobiliarias en Argentina. 
-        Tu tarea es analizar descripciones de propiedades y extraer información estructurada.
-        
-        Extrae la siguiente información del texto:
-        - Tipo de propiedad (departamento, casa, oficina, local, terreno)
-        - Número de dormitorios
-        - Número de baños
-        - Superficie total y cubierta (en m²)
-        - Piso (si aplica)
-        - Amenities y características especiales
-        - Estado de la propiedad (nuevo, usado, a estrenar, etc.)
-        - Ubicación específica (barrio, zona)
-        - Precio estimado si se menciona
-        - Puntos destacados de la propiedad
-        
-        Responde en formato JSON válido.
-        """
+    async def agenerate(self, prompt: str, system_prompt: str = None, cache: bool = True, stream: bool = False,
+                        **kwargs) -> LLMResponse:
+        """Generate text using DeepSeek R1 model over the shared async client; shares the generate cache"""
+        try:
+            data = self._build_chat_payload(prompt, system_prompt, stream=False, **kwargs)
+            
+            key = self._cache_key(data) if cache else None
+            if key:
+                cached = self._cache_get(key)
+                if cached is not None:
+                    return cached
+            
+            if not self._breaker.allow():
+                return self._error_response(CIRCUIT_OPEN)
+            
+            async with self.async_limit:
+                # stream=True is for JSON answers: stop reading as soon as the object closes
+                if stream:
+                    content = await self._aread_json_object(self.agenerate_stream(prompt, system_prompt, **kwargs))
+                    result = self._streamed_response(content)
+                    self._breaker.record_success()
+                    if key and result.success:
+                        self._cache_set(key, result)
+                    return result
+                
+                response = await self._apost_chat(data)
+            
+            if response.status_code == 200:
+                self._breaker.record_success()
+                result = self._success_response(orjson.loads(response.content))
+                if key:
+                    self._cache_set(key, result)
+                return result
+            else:
+                self._breaker.record_failure()
+                app_logger.error(f"DeepSeek API error: {response.status_code} - {response.text}")
+                return self._error_response(f"API error: {response.status_code}")
+                
+        except httpx.HTTPError as e:
+            self._breaker.record_failure()
+            app_logger.error(f"DeepSeek connection error: {e}")
+            return self._error_response(f"Connection error: {str(e)}")
+        except Exception as e:
+            app_logger.error(f"DeepSeek unexpected error: {e}")
+            return self._error_response(f"Unexpected error: {str(e)}")
+    
+    @staticmethod
+    def _retry_delay(response: httpx.Response, attempt: int) -> float:
+        """Seconds to wait before retrying a 429: Retry-After if given, else exponential backoff"""
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+        return settings.llm_retry_backoff * 2 ** attempt
+    
+    def _post_chat(self, data: Dict[str, Any]) -> httpx.Response:
+        """POST a chat request, retrying with backoff while the server answers 429"""
+        body = orjson.dumps(data)
+        for attempt in range(settings.llm_max_retries):
+            response = self.session.post("/api/chat", content=body)
+            if response.status_code != 429:
+                return response
+            delay = self._retry_delay(response, attempt)
+            app_logger.warning(f"DeepSeek rate limited, retrying in {delay:.1f}s")
+            time.sleep(delay)
+        return self.session.post("/api/chat", content=body)
+    
+    async def _apost_chat(self, data: Dict[str, Any]) -> httpx.Response:
+        """Async version of _post_chat"""
+        body = orjson.dumps(data)
+        for attempt in range(settings.llm_max_retries):
+            response = await self.async_session.post("/api/chat", content=body)
+            if response.status_code != 429:
+                return response
+            delay = self._retry_delay(response, attempt)
+            app_logger.warning(f"DeepSeek rate limited, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        return await self.async_session.post("/api/chat", content=body)
+    
+    def generate_batch(self, requests: Sequence[Tuple[str, Optional[str]]], **kwargs) -> List[LLMResponse]:
+        """Answer several (prompt, system_prompt) pairs over the pooled client, in request order"""
+        if not requests:
+            return []
         
-        prompt = f"Analiza esta descripción de propiedad:\n\n{text}"
+        # Ollama has no multi-prompt endpoint; keep up to llm_max_concurrency requests
+        # in flight on the shared keep-alive connections so the server can batch them
+        # Identical requests are sent once and the answer fanned back out
+        unique, positions = dedup_inputs(requests)
+        workers = min(len(unique), settings.llm_max_concurrency)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            responses = list(executor.map(lambda request: self.generate(*request, **kwargs), unique))
+        return [responses[position] for position in positions]
+    
+    async def agenerate_batch(self, requests: Sequence[Tuple[str, Optional[str]]], **kwargs) -> List[LLMResponse]:
+        """Async version of generate_batch; concurrency is capped by the client's request semaphore"""
+        unique, positions = dedup_inputs(requests)
+        responses = await asyncio.gather(*(self.agenerate(*request, **kwargs) for request in unique))
+        return [responses[position] for position in positions]
+    
+    def generate_stream(self, prompt: str, system_prompt: str = None, **kwargs) -> Iterator[str]:
+        """Stream generated text from DeepSeek R1 chunk by chunk over the sync client"""
+        data = self._build_chat_payload(prompt, system_prompt, stream=True, **kwargs)
         
-        response = self.generate(prompt, system_prompt)
+        with self.session.stream("POST", "/api/chat", content=orjson.dumps(data)) as response:
+            if response.status_code != 200:
+                response.read()
+                app_logger.error(f"DeepSeek API error: {response.status_code} - {response.text}")
+                response.raise_for_status()
+            
+            # Ollama-style APIs send one JSON object per line
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = orjson.loads(line)
+                content = chunk.get('message', {}).get('content', '')
+                if content:
+                    yield content
+                if chunk.get('done'):
+                    break
+    
+    @staticmethod
+    def _read_json_object(chunks: Iterator[str]) -> Optional[str]:
+        """Join streamed chunks up to the end of the first JSON object, then drop the connection; None if it never closes"""
+        tracker = JSONObjectTracker()
+        parts = []
+        with closing(chunks):
+            for content in chunks:
+                end = tracker.feed(content)
+                if end is not None:
+                    parts.append(content[:end])
+                    return "".join(parts)
+                parts.append(content)
+        return None
+    
+    @staticmethod
+    async def _aread_json_object(chunks: AsyncIterator[str]) -> Optional[str]:
+        """Async version of _read_json_object"""
+        tracker = JSONObjectTracker()
+        parts = []
+        async with aclosing(chunks):
+            async for content in chunks:
+                end = tracker.feed(content)
+                if end is not None:
+                    parts.append(content[:end])
+                    return "".join(parts)
+                parts.append(content)
+        return None
+    
+    async def agenerate_stream(self, prompt: str, system_prompt: str = None, **kwargs) -> AsyncIterator[str]:
+        """Stream generated text from DeepSeek R1 chunk by chunk as it is produced"""
+        data = self._build_chat_payload(prompt, system_prompt, stream=True, **kwargs)
         
+        async with self.async_session.stream("POST", "/api/chat", content=orjson.dumps(data)) as response:
+            if response.status_code != 200:
+                await response.aread()
+                app_logger.error(f"DeepSeek API error: {response.status_code} - {response.text}")
+                response.raise_for_status()
+            
+            # Ollama-style APIs send one JSON object per line
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = orjson.loads(line)
+                content = chunk.get('message', {}).get('content', '')
+                if content:
+                    yield content
+                if chunk.get('done'):
+                    break
+    
+    def _property_text_prompt(self, text: str) -> Tuple[str, str]:
+        """Build the (prompt, system_prompt) pair for analyze_property_text"""
+        return _USER_ANALYZE.format_map({"text": text}), _SYS_ANALYZE
+    
+    def _parse_property_text(self, response: LLMResponse) -> Dict[str, Any]:
+        """Parse the analyze_property_text answer"""
         if response.success:
             try:
-                return json.loads(response.content)
-            except json.JSONDecodeError:
+                return orjson.loads(response.content)
+            except orjson.JSONDecodeError:
                 app_logger.warning("Failed to parse LLM response as JSON")
                 return {"raw_response": response.content}
         else:
             return {"error": response.error}
     
+    def analyze_property_text(self, text: str) -> Dict[str, Any]:
+        """Analyze property description and extract structured data"""
+        return self._parse_property_text(self.generate(*self._property_text_prompt(text)))
+    
+    async def aanalyze_property_text(self, text: str) -> Dict[str, Any]:
+        """Async version of analyze_property_text"""
+        return self._parse_property_text(await self.agenerate(*self._property_text_prompt(text)))
+    
+    def _enhance_description_prompt(self, title: str, description: str, features: Dict[str, Any]) -> Tuple[str, str]:
+        """Build the (prompt, system_prompt) pair for enhance_property_description"""
+        prompt = _USER_ENHANCE.format_map({
+            "title": title,
+            "description": description,
+            "features": orjson.dumps(features).decode()
+        })
+        return prompt, _SYS_ENHANCE
+    
     def enhance_property_description(self, title: str, description: str, features: Dict[str, Any]) -> str:
-        """Enhance property description using LLM"""
-        system_prompt = """
-        Eres un experto en marketing inmobiliario en Argentina. 
-        Tu tarea es mejorar descripciones de propiedades para hacerlas más atractivas y completas.
-        
-        Reglas:
-        - Mantén la información factual exacta
-        - Usa un tono profesional pero atractivo
-        - Incluye características destacadas
-        - Menciona la ubicación de manera atractiva
-        - Agrega valor percibido sin exagerar
-        - Usa español argentino
-        - Máximo 300 palabras
-        """
-        
-        features_text = json.dumps(features, ensure_ascii=False, indent=2)
-        prompt = f"""
-        Mejora esta descripción de propiedad:
-        
-        Título: {title}
-        Descripción actual: {description}
-        Características: {features_text}
-        
-        Genera una descripción mejorada y atractiva.
-        """
-        
-        response = self.generate(prompt, system_prompt)
+        """Enhance property description using LLM (not cached, so reruns can give new wording)"""
+        response = self.generate(*self._enhance_description_prompt(title, description, features), cache=False)
         return response.content if response.success else description
     
-    def classify_property_type(self, title: str, description: str) -> str:
-        """Classify property type using LLM"""
-        system_prompt = """
-        Clasifica el tipo de propiedad basándote en el título y descripción.
-        
-        Tipos válidos:
-        - apartment (departamento)
-        - house (casa, chalet, PH)
-        - commercial (local comercial, negocio)
-        - office (oficina)
-        - land (terreno, lote)
-        
-        Responde solo con una palabra: apartment, house, commercial, office, o land
-        """
-        
-        prompt = f"Título: {title}\nDescripción: {description}"
-        
-        response = self.generate(prompt, system_prompt)
-        
+    async def aenhance_property_description(self, title: str, description: str, features: Dict[str, Any]) -> str:
+        """Async version of enhance_property_description"""
+        response = await self.agenerate(*self._enhance_description_prompt(title, description, features), cache=False)
+        return response.content if response.success else description
+    
+    def _classify_type_prompt(self, title: str, description: str) -> Tuple[str, str]:
+        """Build the (prompt, system_prompt) pair for classify_property_type"""
+        return _USER_CLASSIFY.format_map({"title": title, "description": description}), _SYS_CLASSIFY
+    
+    def _parse_property_type(self, response: LLMResponse) -> str:
+        """Parse the classify_property_type answer"""
         if response.success:
             classification = response.content.strip().lower()
             valid_types = ['apartment', 'house', 'commercial', 'office', 'land']
@@ -185,51 +653,149 @@ class DeepSeekClient:
         else:
             return 'apartment'  # Default fallback
     
-    def extract_location_details(self, location_text: str) -> Dict[str, str]:
-        """Extract detailed location information using LLM"""
-        system_prompt = """
-        Extrae información detallada de ubicación de propiedades en Argentina.
-        
-        Del texto de ubicación, identifica:
-        - provincia (province)
-        - ciudad (city) 
-        - barrio (neighborhood)
-        - zona específica (area)
-        
-        Responde en formato JSON con las claves: province, city, neighborhood, area
-        Si algún dato no está disponible, usa null.
-        """
-        
-        prompt = f"Ubicación: {location_text}"
-        
-        response = self.generate(prompt, system_prompt)
-        
+    def classify_property_type(self, title: str, description: str) -> str:
+        """Classify property type using LLM"""
+        return self._parse_property_type(self.generate(*self._classify_type_prompt(title, description)))
+    
+    async def aclassify_property_type(self, title: str, description: str) -> str:
+        """Async version of classify_property_type"""
+        return self._parse_property_type(await self.agenerate(*self._classify_type_prompt(title, description)))
+    
+    def _location_prompt(self, location_text: str) -> Tuple[str, str]:
+        """Build the (prompt, system_prompt) pair for extract_location_details"""
+        return _USER_LOCATION.format_map({"location": location_text}), _SYS_LOCATION
+    
+    def _parse_location(self, response: LLMResponse, location_text: str) -> Dict[str, str]:
+        """Parse the extract_location_details answer"""
         if response.success:
             try:
-                return json.loads(response.content)
-            except json.JSONDecodeError:
+                return orjson.loads(response.content)
+            except orjson.JSONDecodeError:
                 return {"raw_location": location_text}
         else:
             return {"raw_location": location_text}
     
+    def extract_location_details(self, location_text: str) -> Dict[str, str]:
+        """Extract detailed location information using LLM"""
+        response = self.generate(*self._location_prompt(location_text))
+        return self._parse_location(response, location_text)
+    
+    async def aextract_location_details(self, location_text: str) -> Dict[str, str]:
+        """Async version of extract_location_details"""
+        response = await self.agenerate(*self._location_prompt(location_text))
+        return self._parse_location(response, location_text)
+    
+    def _summary_prompt(self, property_data: Dict[str, Any]) -> Tuple[str, str]:
+        """Build the (prompt, system_prompt) pair for generate_property_summary"""
+        prompt = _USER_SUMMARY.format_map({
+            "property": orjson.dumps(property_data, option=orjson.OPT_NON_STR_KEYS).decode()
+        })
+        return prompt, _SYS_SUMMARY
+    
     def generate_property_summary(self, property_data: Dict[str, Any]) -> str:
         """Generate a concise property summary"""
-        system_prompt = """
-        Genera un resumen conciso y atractivo de una propiedad inmobiliaria.
-        El resumen debe ser de máximo 100 palabras y destacar los puntos más importantes.
-        Usa español argentino y un tono profesional.
-        """
+        response = self.generate(*self._summary_prompt(property_data))
+        return response.content if response.success else "Propiedad disponible para consulta."
+    
+    async def agenerate_property_summary(self, property_data: Dict[str, Any]) -> str:
+        """Async version of generate_property_summary"""
+        response = await self.agenerate(*self._summary_prompt(property_data))
+        return response.content if response.success else "Propiedad disponible para consulta."
+    
+    def _combined_analysis_prompt(self, title: str, description: str, features: Dict[str, Any],
+                                  location_text: str) -> Tuple[str, str]:
+        """Build the (prompt, system_prompt) pair for analyze_property_combined"""
+        prompt = _USER_COMBINED.format_map({
+            "title": title,
+            "description": description,
+            "features": orjson.dumps(features).decode(),
+            "location": location_text
+        })
+        return prompt, _SYS_COMBINED
+    
+    def _parse_combined_analysis(self, response: LLMResponse) -> Optional[Dict[str, Any]]:
+        """Parse the combined analysis answer; None if it is missing or malformed"""
+        if not response.success:
+            return None
+        try:
+            result = orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            app_logger.warning("Failed to parse combined LLM analysis as JSON")
+            return None
         
-        property_text = json.dumps(property_data, ensure_ascii=False, indent=2)
-        prompt = f"Genera un resumen para esta propiedad:\n\n{property_text}"
+        if not (
+            isinstance(result, dict)
+            and isinstance(result.get('extracted_features'), dict)
+            and isinstance(result.get('enhanced_description'), str)
+            and isinstance(result.get('location'), dict)
+            and isinstance(result.get('summary'), str)
+        ):
+            app_logger.warning("Combined LLM analysis is missing fields")
+            return None
         
-        response = self.generate(prompt, system_prompt)
-        return response.content if response.success else "Propiedad disponible para consulta."
+        property_type = str(result.get('property_type', '')).strip().lower()
+        valid_types = ['apartment', 'house', 'commercial', 'office', 'land']
+        result['property_type'] = property_type if property_type in valid_types else 'apartment'
+        return result
+    
+    def analyze_property_combined(self, title: str, description: str, features: Dict[str, Any],
+                                  location_text: str) -> Optional[Dict[str, Any]]:
+        """Features, enhanced description, type, location and summary in a single JSON-mode request"""
+        prompt, system_prompt = self._combined_analysis_prompt(title, description, features, location_text)
+        return self._parse_combined_analysis(self.generate(prompt, system_prompt, stream=True, format="json"))
+    
+    async def aanalyze_property_combined(self, title: str, description: str, features: Dict[str, Any],
+                                         location_text: str) -> Optional[Dict[str, Any]]:
+        """Async version of analyze_property_combined"""
+        prompt, system_prompt = self._combined_analysis_prompt(title, description, features, location_text)
+        return self._parse_combined_analysis(await self.agenerate(prompt, system_prompt, stream=True, format="json"))
+    
+    def analyze_properties_combined(self, items: Sequence[Tuple[str, str, Dict[str, Any], str]]) -> List[Optional[Dict[str, Any]]]:
+        """analyze_property_combined for (title, description, features, location_text) items in one batch"""
+        requests = [self._combined_analysis_prompt(*item) for item in items]
+        return [self._parse_combined_analysis(r) for r in self.generate_batch(requests, stream=True, format="json")]
+    
+    def analyze_property_texts(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """analyze_property_text for several texts in one batch"""
+        responses = self.generate_batch([self._property_text_prompt(text) for text in texts])
+        return [self._parse_property_text(r) for r in responses]
+    
+    def enhance_property_descriptions(self, items: Sequence[Tuple[str, str, Dict[str, Any]]]) -> List[str]:
+        """enhance_property_description for (title, description, features) items in one batch"""
+        responses = self.generate_batch([self._enhance_description_prompt(*item) for item in items], cache=False)
+        return [r.content if r.success else item[1] for r, item in zip(responses, items)]
+    
+    def classify_property_types(self, items: Sequence[Tuple[str, str]]) -> List[str]:
+        """classify_property_type for (title, description) items in one batch"""
+        responses = self.generate_batch([self._classify_type_prompt(*item) for item in items])
+        return [self._parse_property_type(r) for r in responses]
+    
+    def extract_locations_details(self, location_texts: Sequence[str]) -> List[Dict[str, str]]:
+        """extract_location_details for several location texts in one batch"""
+        responses = self.generate_batch([self._location_prompt(text) for text in location_texts])
+        return [self._parse_location(r, text) for r, text in zip(responses, location_texts)]
+    
+    def generate_property_summaries(self, items: Sequence[Dict[str, Any]]) -> List[str]:
+        """generate_property_summary for several property data dicts in one batch"""
+        responses = self.generate_batch([self._summary_prompt(data) for data in items])
+        return [r.content if r.success else "Propiedad disponible para consulta." for r in responses]
     
     def check_health(self) -> bool:
-        """Check if DeepSeek service is available"""
+        """Check if DeepSeek service is available; False without a request while the circuit is open"""
+        if self.circuit_open:
+            return False
+        try:
+            response = self.session.get("/api/tags", timeout=5)
+            return response.status_code == 200
+        except Exception:
+            return False
+    
+    async def acheck_health(self) -> bool:
+        """Check if DeepSeek service is available without blocking the event loop"""
+        if self.circuit_open:
+            return False
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = await self.async_session.get("/api/tags", timeout=5)
             return response.status_code == 200
-        except:
+        except Exception:
             return False
\ No newline at end of file
@@ -1,12 +1,51 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence, Tuple, AsyncIterator
 from dataclasses import dataclass
+import asyncio
 import re
+from itertools import compress
+from operator import attrgetter
+
+import orjson
 
 from .deepseek_client import DeepSeekClient
 from ..models import Property, PropertyType, OperationType
 from ..utils import app_logger
 
 
+# Operation keywords as one compiled alternation, so the text is scanned in a single pass.
+# The URL comes first in the scanned text, so its /venta/ or /alquiler/ segment decides.
+# Whole words only: "ventanas" or "Salen gastos" must not read as a sale
+OPERATION_KEYWORDS_RE = re.compile(
+    r"\b(?P<rent>alquiler|alquila|rental|rent|temporary)\b|\b(?P<sale>venta|vende|sale)\b",
+    re.IGNORECASE
+)
+
+
+# Confidence score weights for fields that count when present; the grouped
+# checks in _calculate_confidence_score bring the total to CONFIDENCE_MAX_SCORE
+CONFIDENCE_FIELDS = (
+    ("title", 0.5),
+    ("price_amount", 1.0),
+    ("source_url", 0.5),
+    ("city", 0.5),
+    ("neighborhood", 0.5),
+    ("address", 0.5),
+    ("bedrooms", 0.5),
+    ("bathrooms", 0.5),
+    ("amenities", 0.5),
+    ("parking_spaces", 0.5),
+    ("main_image", 0.5),
+)
+CONFIDENCE_WEIGHTS = tuple(weight for _, weight in CONFIDENCE_FIELDS)
+CONFIDENCE_MAX_SCORE = 10.0
+
+_get_confidence_fields = attrgetter(*(name for name, _ in CONFIDENCE_FIELDS))
+_get_confidence_group_fields = attrgetter(
+    "latitude", "longitude", "total_area", "covered_area", "agent_name", "agency_name",
+    "phone", "email", "description", "gallery"
+)
+
+
 @dataclass
 class PropertyAnalysis:
     """Result of property analysis"""
@@ -22,33 +61,113 @@ class PropertyAnalysis:
 class PropertyAnalyzer:
     """Advanced property analysis using LLM"""
     
+    # Number of properties summarized in the market insights prompt
+    MARKET_INSIGHTS_SAMPLE_SIZE = 10
+    # Properties sent per batched LLM call in batch_analyze_properties
+    BATCH_CHUNK_SIZE = 32
+    
     def __init__(self, llm_client: DeepSeekClient = None):
         self.llm = llm_client or DeepSeekClient()
     
+    def _analysis_inputs(self, property_obj: Property) -> Dict[str, Any]:
+        """Collect the texts and feature dicts the per-property LLM calls need"""
+        # Combine all text for analysis
+        full_text = f"{property_obj.title}\n{property_obj.description}"
+        
+        features_dict = {
+            'bedrooms': property_obj.bedrooms,
+            'bathrooms': property_obj.bathrooms,
+            'total_area': property_obj.total_area,
+            'covered_area': property_obj.covered_area,
+            'parking_spaces': property_obj.parking_spaces,
+            'floor': property_obj.floor,
+            'amenities': property_obj.amenities
+        }
+        
+        location_text = f"{property_obj.city} {property_obj.neighborhood} {property_obj.address}".strip()
+        
+        property_data = {
+            'title': property_obj.title,
+            'description': property_obj.description,
+            'price': property_obj.price_amount,
+            'currency': property_obj.price_currency.value if property_obj.price_currency else None,
+            'location': location_text,
+            'features': features_dict
+        }
+        
+        return {
+            'full_text': full_text,
+            'features': features_dict,
+            'location_text': location_text,
+            'property_data': property_data
+        }
+    
+    def _build_analysis(self, property_obj: Property, full_text: str, extracted_features: Dict[str, Any],
+                        enhanced_description: str, property_type: str,
+                        location_details: Dict[str, str], summary: str) -> PropertyAnalysis:
+        """Combine the LLM answers with the rule-based checks into a PropertyAnalysis"""
+        operation_type = self._determine_operation_type(property_obj.source_url, full_text)
+        
+        classification = {
+            'property_type': property_type,
+            'operation_type': operation_type
+        }
+        
+        # Generate recommendations
+        recommendations = self._generate_recommendations(property_obj, extracted_features)
+        
+        # Calculate confidence score
+        confidence_score = self._calculate_confidence_score(
+            property_obj, extracted_features, classification
+        )
+        
+        return PropertyAnalysis(
+            confidence_score=confidence_score,
+            extracted_features=extracted_features,
+            enhanced_description=enhanced_description,
+            classification=classification,
+            location_details=location_details,
+            summary=summary,
+            recommendations=recommendations
+        )
+    
+    def _build_combined_analysis(self, property_obj: Property, inputs: Dict[str, Any],
+                                 combined: Dict[str, Any]) -> PropertyAnalysis:
+        """Build the analysis from a parsed combined LLM answer"""
+        return self._build_analysis(
+            property_obj, inputs['full_text'], combined['extracted_features'],
+            combined['enhanced_description'], combined['property_type'],
+            combined['location'], combined['summary']
+        )
+    
     def analyze_property(self, property_obj: Property) -> PropertyAnalysis:
         """Perform comprehensive property analysis"""
         try:
-            # Combine all text for analysis
-            full_text = f"{property_obj.title}\n{property_obj.description}"
+            inputs = self._analysis_inputs(property_obj)
+            
+            # One JSON-mode request covers all five answers
+            combined = self.llm.analyze_property_combined(
+                property_obj.title,
+                property_obj.description,
+                inputs['features'],
+                inputs['location_text']
+            )
+            if combined:
+                return self._build_combined_analysis(property_obj, inputs, combined)
             
+            # The LLM is down; the per-answer requests would only fail fast too
+            if self.llm.circuit_open:
+                return self._create_fallback_analysis(property_obj)
+            
+            # Fall back to one request per answer
             # Extract features using LLM
-            extracted_features = self.llm.analyze_property_text(full_text)
+            extracted_features = self.llm.analyze_property_text(inputs['full_text'])
             
             # Enhance description
-            features_dict = {
-                'bedrooms': property_obj.bedrooms,
-                'bathrooms': property_obj.bathrooms,
-                'total_area': property_obj.total_area,
-                'covered_area': property_obj.covered_area,
-                'parking_spaces': property_obj.parking_spaces,
-                'floor': property_obj.floor,
-                'amenities': property_obj.amenities
-            }
-            
             enhanced_description = self.llm.enhance_property_description(
                 property_obj.title,
                 property_obj.description,
-                features_dict
+                inputs['features']
             )
             
             # Classify property
@@ -57,45 +176,15 @@ class PropertyAnalyzer:
                 property_obj.description
             )
             
-            operation_type = self._determine_operation_type(property_obj.source_url, full_text)
-            
-            classification = {
-                'property_type': property_type,
-                'operation_type': operation_type
-            }
-            
             # Extract location details
-            location_text = f"{property_obj.city} {property_obj.neighborhood} {property_obj.address}"
-            location_details = self.llm.extract_location_details(location_text.strip())
+            location_details = self.llm.extract_location_details(inputs['location_text'])
             
             # Generate summary
-            property_data = {
-                'title': property_obj.title,
-                'description': property_obj.description,
-                'price': property_obj.price_amount,
-                'currency': property_obj.price_currency.value if property_obj.price_currency else None,
-                'location': location_text.strip(),
-                'features': features_dict
-            }
-            
-            summary = self.llm.generate_property_summary(property_data)
-            
-            # Generate recommendations
-            recommendations = self._generate_recommendations(property_obj, extracted_features)
+            summary = self.llm.generate_property_summary(inputs['property_data'])
             
-            # Calculate confidence score
-            confidence_score = self._calculate_confidence_score(
-                property_obj, extracted_features, classification
-            )
-            
-            return PropertyAnalysis(
-                confidence_score=confidence_score,
-                extracted_features=extracted_features,
-                enhanced_description=enhanced_description,
-                classification=classification,
-                location_details=location_details,
-                summary=summary,
-                recommendations=recommendations
+            return self._build_analysis(
+                property_obj, inputs['full_text'], extracted_features,
+                enhanced_description, property_type, location_details, summary
             )
             
         except Exception as e:
@@ -103,13 +192,11 @@ class PropertyAnalyzer:
             return self._create_fallback_analysis(property_obj)
     
     def _determine_operation_type(self, url: str, text: str) -> str:
-        """Determine operation type from URL and text"""
-        combined_text = f"{url} {text}".lower()
-        
-        if any(word in combined_text for word in ['alquiler', 'rent', 'rental']):
-            return 'rent'
-        else:
-            return 'sale'
+        """Determine operation type from URL and text; the first keyword found wins"""
+        match = OPERATION_KEYWORDS_RE.search(f"{url} {text}")
+        if match:
+            return match.lastgroup
+        return 'sale'
     
     def _generate_recommendations(self, property_obj: Property, features: Dict[str, Any]) -> List[str]:
         """Generate recommendations for property improvement"""
@@ -146,54 +233,21 @@ class PropertyAnalyzer:
     
     def _calculate_confidence_score(self, property_obj: Property, features: Dict[str, Any], classification: Dict[str, str]) -> float:
         """Calculate confidence score for property data quality"""
-        score = 0.0
-        max_score = 10.0
-        
-        # Basic information (3 points)
-        if property_obj.title:
-            score += 0.5
-        if property_obj.description and len(property_obj.description) > 50:
-            score += 1.0
-        if property_obj.price_amount:
-            score += 1.0
-        if property_obj.source_url:
-            score += 0.5
-        
-        # Location information (2 points)
-        if property_obj.city:
-            score += 0.5
-        if property_obj.neighborhood:
-            score += 0.5
-        if property_obj.address:
-            score += 0.5
-        if property_obj.latitude and property_obj.longitude:
-            score += 0.5
-        
-        # Property features (3 points)
-        if property_obj.bedrooms:
-            score += 0.5
-        if property_obj.bathrooms:
-            score += 0.5
-        if property_obj.total_area or property_obj.covered_area:
-            score += 1.0
-        if property_obj.amenities:
-            score += 0.5
-        if property_obj.parking_spaces:
-            score += 0.5
-        
-        # Contact information (1 point)
-        if property_obj.agent_name or property_obj.agency_name:
-            score += 0.5
-        if property_obj.phone or property_obj.email:
-            score += 0.5
-        
-        # Images (1 point)
-        if property_obj.main_image:
-            score += 0.5
-        if property_obj.gallery and len(property_obj.gallery) > 1:
-            score += 0.5
-        
-        return min(score / max_score, 1.0)
+        # Single-field checks: one C-level attrgetter call, summed without a branch ladder
+        score = sum(compress(CONFIDENCE_WEIGHTS, map(bool, _get_confidence_fields(property_obj))))
+        
+        (latitude, longitude, total_area, covered_area, agent_name, agency_name,
+         phone, email, description, gallery) = _get_confidence_group_fields(property_obj)
+        
+        # Fields that only count together, or alone past a minimum length
+        score += 0.5 if latitude and longitude else 0.0
+        score += 1.0 if total_area or covered_area else 0.0
+        score += 0.5 if agent_name or agency_name else 0.0
+        score += 0.5 if phone or email else 0.0
+        score += 1.0 if description and len(description) > 50 else 0.0
+        score += 0.5 if gallery and len(gallery) > 1 else 0.0
+        
+        return min(score / CONFIDENCE_MAX_SCORE, 1.0)
     
     def _create_fallback_analysis(self, property_obj: Property) -> PropertyAnalysis:
         """Create fallback analysis when LLM fails"""
@@ -214,41 +268,141 @@ class PropertyAnalyzer:
         )
     
     def batch_analyze_properties(self, properties: List[Property]) -> List[PropertyAnalysis]:
-        """Analyze multiple properties in batch"""
+        """Analyze multiple properties in batch, one batched LLM call per chunk and task"""
         results = []
         
-        for property_obj in properties:
+        for start in range(0, len(properties), self.BATCH_CHUNK_SIZE):
+            chunk = properties[start:start + self.BATCH_CHUNK_SIZE]
             try:
-                analysis = self.analyze_property(property_obj)
-                results.append(analysis)
-                app_logger.info(f"Analyzed property {property_obj.external_id}")
+                results.extend(self._analyze_chunk(chunk))
+                app_logger.info(f"Analyzed {len(chunk)} properties")
             except Exception as e:
-                app_logger.error(f"Failed to analyze property {property_obj.external_id}: {e}")
-                results.append(self._create_fallback_analysis(property_obj))
+                app_logger.error(f"Failed to analyze {len(chunk)} properties: {e}")
+                results.extend(self._create_fallback_analysis(property_obj) for property_obj in chunk)
         
         return results
     
-    def get_market_insights(self, properties: List[Property]) -> Dict[str, Any]:
-        """Generate market insights from property data"""
-        if not properties:
-            return {}
+    def _analyze_chunk(self, chunk: List[Property]) -> List[PropertyAnalysis]:
+        """Analyze a chunk with the combined request, batching the per-answer fallback by task"""
+        inputs = [self._analysis_inputs(property_obj) for property_obj in chunk]
         
-        # Prepare data for LLM analysis
-        property_summaries = []
-        for prop in properties[:10]:  # Limit to 10 properties for analysis
-            summary = {
-                'type': prop.property_type.value if prop.property_type else 'unknown',
-                'operation': prop.operation_type.value if prop.operation_type else 'unknown',
+        combined = self.llm.analyze_properties_combined([
+            (property_obj.title, property_obj.description, item['features'], item['location_text'])
+            for property_obj, item in zip(chunk, inputs)
+        ])
+        results = [
+            self._build_combined_analysis(property_obj, item, answer) if answer else None
+            for property_obj, item, answer in zip(chunk, inputs, combined)
+        ]
+        
+        # Properties whose combined answer failed get one batched request per answer
+        pending = [index for index, analysis in enumerate(results) if analysis is None]
+        if pending and self.llm.circuit_open:
+            for index in pending:
+                results[index] = self._create_fallback_analysis(chunk[index])
+        elif pending:
+            extracted_features = self.llm.analyze_property_texts([inputs[i]['full_text'] for i in pending])
+            enhanced_descriptions = self.llm.enhance_property_descriptions([
+                (chunk[i].title, chunk[i].description, inputs[i]['features']) for i in pending
+            ])
+            property_types = self.llm.classify_property_types([(chunk[i].title, chunk[i].description) for i in pending])
+            location_details = self.llm.extract_locations_details([inputs[i]['location_text'] for i in pending])
+            summaries = self.llm.generate_property_summaries([inputs[i]['property_data'] for i in pending])
+            
+            for position, index in enumerate(pending):
+                results[index] = self._build_analysis(
+                    chunk[index], inputs[index]['full_text'], extracted_features[position],
+                    enhanced_descriptions[position], property_types[position],
+                    location_details[position], summaries[position]
+                )
+        
+        return results
+    
+    async def analyze_property_async(self, property_obj: Property) -> PropertyAnalysis:
+        """Perform comprehensive property analysis; the per-answer fallback calls run concurrently"""
+        try:
+            inputs = self._analysis_inputs(property_obj)
+            
+            # One JSON-mode request covers all five answers
+            combined = await self.llm.aanalyze_property_combined(
+                property_obj.title,
+                property_obj.description,
+                inputs['features'],
+                inputs['location_text']
+            )
+            if combined:
+                return self._build_combined_analysis(property_obj, inputs, combined)
+            
+            # The LLM is down; the per-answer requests would only fail fast too
+            if self.llm.circuit_open:
+                return self._create_fallback_analysis(property_obj)
+            
+            # Fall back to one request per answer
+            extracted_features, enhanced_description, property_type, location_details, summary = await asyncio.gather(
+                self.llm.aanalyze_property_text(inputs['full_text']),
+                self.llm.aenhance_property_description(
+                    property_obj.title,
+                    property_obj.description,
+                    inputs['features']
+                ),
+                self.llm.aclassify_property_type(property_obj.title, property_obj.description),
+                self.llm.aextract_location_details(inputs['location_text']),
+                self.llm.agenerate_property_summary(inputs['property_data'])
+            )
+            
+            return self._build_analysis(
+                property_obj, inputs['full_text'], extracted_features,
+                enhanced_description, property_type, location_details, summary
+            )
+            
+        except Exception as e:
+            app_logger.error(f"Error analyzing property: {e}")
+            return self._create_fallback_analysis(property_obj)
+    
+    async def abatch_analyze_properties(self, properties: List[Property], max_concurrency: int = 8) -> List[PropertyAnalysis]:
+        """Analyze multiple properties concurrently, at most max_concurrency at a time"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def analyze_one(property_obj: Property) -> PropertyAnalysis:
+            async with semaphore:
+                return await self.analyze_property_async(property_obj)
+        
+        outcomes = await asyncio.gather(
+            *(analyze_one(property_obj) for property_obj in properties),
+            return_exceptions=True
+        )
+        
+        results = []
+        failures = 0
+        for property_obj, outcome in zip(properties, outcomes):
+            if isinstance(outcome, Exception):
+                failures += 1
+                results.append(self._create_fallback_analysis(property_obj))
+            else:
+                results.append(outcome)
+        
+        if failures:
+            app_logger.warning(f"Batch analysis: {failures} of {len(properties)} properties failed")
+        
+        return results
+    
+    def _build_market_insights_prompt(self, properties: Sequence[Any]) -> Tuple[str, str]:
+        """Build the (prompt, system_prompt) pair for market insights from property rows or objects"""
+        # Prepare data for LLM analysis; enum members serialize to their values
+        property_summaries = [
+            {
+                'type': prop.property_type or 'unknown',
+                'operation': prop.operation_type or 'unknown',
                 'price': prop.price_amount,
-                'currency': prop.price_currency.value if prop.price_currency else 'unknown',
+                'currency': prop.price_currency or 'unknown',
                 'location': f"{prop.city} {prop.neighborhood}".strip(),
                 'area': prop.total_area or prop.covered_area,
                 'bedrooms': prop.bedrooms,
                 'bathrooms': prop.bathrooms
             }
-            property_summaries.append(summary)
+            for prop in properties[:self.MARKET_INSIGHTS_SAMPLE_SIZE]
+        ]
         
-        # Generate insights using LLM
         system_prompt = """
         Eres un analista de mercado inmobiliario en Argentina.
         Analiza los datos de propiedades y genera insights de mercado.
@@ -262,16 +416,49 @@ class PropertyAnalyzer:
         Responde en formato JSON con las claves: price_trends, popular_areas, valued_features, recommendations
         """
         
-        import json
-        data_text = json.dumps(property_summaries, ensure_ascii=False, indent=2)
+        data_text = orjson.dumps(property_summaries).decode()
         prompt = f"Analiza estos datos de propiedades:\n\n{data_text}"
         
+        return prompt, system_prompt
+    
+    def _parse_market_insights(self, content: str) -> Dict[str, Any]:
+        """Parse the LLM market insights answer, keeping the raw text if it is not JSON"""
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return {"raw_insights": content}
+    
+    def get_market_insights(self, properties: Sequence[Any]) -> Dict[str, Any]:
+        """Generate market insights from property data"""
+        if not properties:
+            return {}
+        
+        # Generate insights using LLM
+        prompt, system_prompt = self._build_market_insights_prompt(properties)
         response = self.llm.generate(prompt, system_prompt)
         
         if response.success:
-            try:
-                return json.loads(response.content)
-            except json.JSONDecodeError:
-                return {"raw_insights": response.content}
+            return self._parse_market_insights(response.content)
         else:
-            return {"error": "No se pudieron generar insights de mercado"}
\ No newline at end of file
+            return {"error": "No se pudieron generar insights de mercado"}
+    
+    def stream_insights(self, properties: Sequence[Any]) -> AsyncIterator[bytes]:
+        """Stream market insights as NDJSON: text deltas followed by the parsed insights"""
+        # Build the prompt now, while the caller's DB session is still open
+        prompt, system_prompt = self._build_market_insights_prompt(properties)
+        return self._stream_insights(prompt, system_prompt)
+    
+    async def _stream_insights(self, prompt: str, system_prompt: str) -> AsyncIterator[bytes]:
+        """Relay LLM output chunks, then emit the full answer parsed as insights"""
+        parts = []
+        try:
+            async for content in self.llm.agenerate_stream(prompt, system_prompt):
+                parts.append(content)
+                yield orjson.dumps({"type": "delta", "content": content}) + b"\n"
+        except Exception as e:
+            app_logger.error(f"Error streaming market insights: {e}")
+            yield orjson.dumps({"type": "error", "error": "No se pudieron generar insights de mercado"}) + b"\n"
+            return
+        
+        insights = self._parse_market_insights("".join(parts))
+        yield orjson.dumps({"type": "insights", "insights": insights}) + b"\n"
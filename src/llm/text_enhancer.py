@@ -1,163 +1,540 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Awaitable, Optional, List, Sequence, Tuple, TypeVar
+import asyncio
 import re
+import textwrap
 
-from .deepseek_client import DeepSeekClient
-from ..utils import app_logger
+import orjson
+
+from .deepseek_client import DeepSeekClient, LLMResponse, dedup_inputs
+from ..models import Property
+from ..utils import app_logger, settings
+
+T = TypeVar("T")
+
+
+_SYS_CLEAN = textwrap.dedent("""
+    Mejora y limpia esta descripción de propiedad inmobiliaria.
+
+    Tareas:
+    - Corregir errores ortográficos y gramaticales
+    - Mejorar la estructura y fluidez
+    - Mantener toda la información factual
+    - Usar español argentino profesional
+    - Eliminar texto repetitivo o irrelevante
+    - Máximo 400 palabras
+""").strip()
+
+_SYS_FEATURES = textwrap.dedent("""
+    Extrae las características más importantes de esta descripción de propiedad.
+
+    Busca:
+    - Características estructurales (dormitorios, baños, superficie)
+    - Amenities (piscina, gimnasio, seguridad, etc.)
+    - Ubicación destacada
+    - Estado de la propiedad
+    - Características únicas
+
+    Responde con una lista de características separadas por comas.
+    Máximo 10 características.
+""").strip()
+
+_SYS_SEO_TITLE = textwrap.dedent("""
+    Genera un título optimizado para SEO de una propiedad inmobiliaria.
+
+    Requisitos:
+    - Incluir tipo de propiedad y ubicación
+    - Máximo 60 caracteres
+    - Atractivo para búsquedas
+    - Español argentino
+    - Incluir palabras clave relevantes
+""").strip()
+
+_SYS_META = textwrap.dedent("""
+    Genera una meta descripción para SEO de una propiedad inmobiliaria.
+
+    Requisitos:
+    - Máximo 160 caracteres
+    - Incluir características principales
+    - Call to action atractivo
+    - Español argentino
+""").strip()
+
+_SYS_TRANSLATE = textwrap.dedent("""
+    Traduce esta descripción de propiedad inmobiliaria al inglés.
+
+    Requisitos:
+    - Traducción natural y profesional
+    - Mantener términos inmobiliarios apropiados
+    - Adaptar medidas y monedas si es necesario
+    - Conservar toda la información factual
+""").strip()
+
+# The platform goes in the user message so the system prompt stays the same for every post
+_SYS_SOCIAL = textwrap.dedent("""
+    Genera un post para la red social indicada promocionando esta propiedad inmobiliaria.
+
+    Requisitos:
+    - Tono atractivo y moderno
+    - Incluir hashtags relevantes
+    - Call to action claro
+    - Español argentino
+    - Máximo 280 caracteres para Twitter, 500 para Instagram
+""").strip()
+
+_SYS_PRICE = textwrap.dedent("""
+    Extrae información de precio de este texto inmobiliario.
+
+    Busca:
+    - Precio principal
+    - Moneda (USD, ARS, EUR)
+    - Expensas si se mencionan
+    - Precio por m² si está disponible
+
+    Responde en formato JSON con las claves: price, currency, expenses, price_per_sqm
+""").strip()
+
+# JSON schema for Ollama's structured output: the server constrains decoding to it,
+# so even a small local model returns exactly the keys of _extract_price_fallback
+_PRICE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "price": {"type": ["number", "null"]},
+        "currency": {"type": ["string", "null"], "enum": ["USD", "ARS", "EUR", None]},
+        "expenses": {"type": ["number", "null"]},
+        "price_per_sqm": {"type": ["number", "null"]},
+    },
+    "required": ["price", "currency", "expenses", "price_per_sqm"],
+}
+
+# Appended to the system prompt when several inputs share one request
+_SYS_BATCH = textwrap.dedent("""
+    Vas a recibir varios textos numerados. Aplica las instrucciones anteriores a cada
+    texto por separado y responde en el mismo orden, empezando cada respuesta con su
+    número en el formato "1) respuesta". No agregues nada más.
+""").strip()
+
+# HTML tags, or any character besides word characters, whitespace, basic punctuation
+# and Spanish accents; removed by _basic_text_cleaning in one pass
+_STRIP_RE = re.compile(r'<[^>]+>|[^\w\s.,;:!?\-()ñáéíóúüÑÁÉÍÓÚÜ]')
+
+# Price forms of _extract_price_fallback; the named group holding the amount tells
+# which form matched, and _PRICE_PRIORITY says which form wins when several do
+_PRICE_RE = re.compile(
+    r'USD?\s*(?P<usd>\d{1,3}(?:\.\d{3})*)'
+    r'|\$\s*(?P<dollar>\d{1,3}(?:\.\d{3})*)'
+    r'|(?P<dolares>\d{1,3}(?:\.\d{3})*)\s*dólares'
+    r'|(?P<pesos>\d{1,3}(?:\.\d{3})*)\s*pesos',
+    re.IGNORECASE
+)
+_PRICE_PRIORITY = {'usd': 0, 'dollar': 1, 'dolares': 2, 'pesos': 3}
+_PRICE_TOKENS = ('us', '$', 'dólares', 'pesos')
+
+# Features of _extract_features_fallback, in output order; each alternative is a
+# named group, and the counted ones capture the number in front of the keyword (the
+# plural "s" is left unmatched so it can't swallow the start of the next keyword)
+_FEATURE_RE = re.compile(
+    r'(?P<dormitorios>\d+)\s*dormitorio'
+    r'|(?P<baños>\d+)\s*baño'
+    r'|(?P<cocheras>\d+)\s*cochera'
+    r'|(?P<piscina>piscina)'
+    r'|(?P<gimnasio>gimnasio)'
+    r'|(?P<seguridad>seguridad)'
+    r'|(?P<balcón>balcón)'
+    r'|(?P<terraza>terraza)'
+)
+_FEATURE_ORDER = ('dormitorios', 'baños', 'cocheras', 'piscina', 'gimnasio', 'seguridad', 'balcón', 'terraza')
+_COUNTED_FEATURES = frozenset(('dormitorios', 'baños', 'cocheras'))
+# Every alternative of _FEATURE_RE contains one of these literals
+_FEATURE_TOKENS = ('dormitorio', 'baño', 'cochera', 'piscina', 'gimnasio', 'seguridad', 'balcón', 'terraza')
+
+# "N) " at the start of a line opens the answer for input N
+_NUMBERED_ANSWER_RE = re.compile(r'^[ \t]*(\d+)\)[ \t]*', re.M)
 
 
 class TextEnhancer:
     """Text enhancement and processing using LLM"""
     
-    def __init__(self, llm_client: DeepSeekClient = None):
+    # Most inputs packed under one system prompt by the batch methods
+    BATCH_SIZE = 16
+    
+    # Template SEO texts scoring below this are polished by the LLM when asked to
+    TEMPLATE_QUALITY_MIN = 1.0
+    
+    def __init__(self, llm_client: DeepSeekClient = None, fast_model: Optional[str] = None):
         self.llm = llm_client or DeepSeekClient()
+        # Structural tasks (features, SEO texts, prices) go to the cheaper model when one is set
+        self.fast_model = fast_model or settings.deepseek_fast_model or None
     
-    def clean_and_enhance_description(self, description: str) -> str:
-        """Clean and enhance property description"""
-        if not description:
-            return ""
-        
-        # Basic cleaning
-        cleaned = self._basic_text_cleaning(description)
-        
-        # Enhance with LLM
-        system_prompt = """
-        Mejora y limpia esta descripción de propiedad inmobiliaria.
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Rough token count (about four characters per token)"""
+        return len(text) // 4 + 1
+    
+    def _plan_batches(self, inputs: Sequence[str], indexes: Sequence[int], system_prompt: str,
+                      batch_size: int, output_tokens: Optional[int]) -> List[List[int]]:
+        """Group input indexes into batches whose prompts and answers fit the context window"""
+        budget = settings.deepseek_context_tokens - self._estimate_tokens(f"{system_prompt}\n\n{_SYS_BATCH}")
+        batches, current, used = [], [], 0
+        for index in indexes:
+            tokens = self._estimate_tokens(inputs[index])
+            # Answers roughly as long as the input unless the task caps them
+            cost = tokens + (output_tokens or tokens)
+            if current and (len(current) >= batch_size or used + cost > budget):
+                batches.append(current)
+                current, used = [], 0
+            current.append(index)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+    
+    @staticmethod
+    def _batch_request(inputs: Sequence[str], batch: Sequence[int], system_prompt: str) -> Tuple[str, str]:
+        """The (prompt, system_prompt) pair for one batch; a single input is sent as is"""
+        if len(batch) == 1:
+            return inputs[batch[0]], system_prompt
+        # One line per input, so line breaks inside an input can't be mistaken for answers
+        prompt = "\n".join(
+            f"{number}) {' '.join(inputs[index].split())}" for number, index in enumerate(batch, 1)
+        )
+        return prompt, f"{system_prompt}\n\n{_SYS_BATCH}"
+    
+    @staticmethod
+    def _parse_numbered_answers(content: str) -> Dict[int, str]:
+        """Answers of a numbered response by number; an answer runs until the next number"""
+        parts = _NUMBERED_ANSWER_RE.split(content)
+        answers = {}
+        for number, answer in zip(parts[1::2], parts[2::2]):
+            answers.setdefault(int(number), answer.strip())
+        return answers
+    
+    def _collect_answers(self, batches: List[List[int]], responses: Sequence[LLMResponse],
+                         answers: List[Optional[str]]) -> List[int]:
+        """Store one round of batch answers; return the indexes a multi-input batch left unanswered"""
+        missing = []
+        for batch, response in zip(batches, responses):
+            if len(batch) == 1:
+                if response.success:
+                    answers[batch[0]] = response.content.strip()
+                continue
+            numbered = self._parse_numbered_answers(response.content) if response.success else {}
+            for number, index in enumerate(batch, 1):
+                if numbered.get(number):
+                    answers[index] = numbered[number]
+                else:
+                    missing.append(index)
+        return missing
+    
+    def _cached_answers(self, inputs: Sequence[str], system_prompt: str,
+                        model: Optional[str]) -> Tuple[List[Optional[str]], List[int]]:
+        """Answers already cached for inputs sent on their own, and the indexes still to request"""
+        answers = [self.llm.cached_answer(text, system_prompt, model=model) for text in inputs]
+        return answers, [index for index, answer in enumerate(answers) if answer is None]
+    
+    def _cache_answers(self, inputs: Sequence[str], indexes: Sequence[int], answers: List[Optional[str]],
+                       system_prompt: str, model: Optional[str]):
+        """Cache batched answers per input, so a later batch of different composition reuses them"""
+        for index in indexes:
+            if answers[index] is not None:
+                self.llm.cache_answer(inputs[index], system_prompt, answers[index], model=model)
+    
+    def _retry_batch_size(self, batches: List[List[int]], missing: List[int]) -> Optional[int]:
+        """Batch size to retry unanswered inputs with, or None to give up on them"""
+        # Inputs left unanswered usually mean the prompt or the answer overflowed the
+        # context; retry them in batches 10% smaller
+        if not missing or self.llm.circuit_open:
+            return None
+        largest = max(len(batch) for batch in batches)
+        batch_size = max(1, min(largest - 1, int(largest * 0.9)))
+        app_logger.warning(f"{len(missing)} batched LLM answers missing, retrying in batches of {batch_size}")
+        return batch_size
+    
+    def _batched_generate(self, inputs: Sequence[str], system_prompt: str, batch_size: Optional[int] = None,
+                          output_tokens: Optional[int] = None,
+                          model: Optional[str] = None) -> List[Optional[str]]:
+        """Answer each input under one shared system prompt, several inputs per request; None if unanswered"""
+        # Duplicate inputs (the same ad on several portals) take one slot
+        inputs, positions = dedup_inputs(inputs)
+        answers, pending = self._cached_answers(inputs, system_prompt, model)
+        requested = list(pending)
+        batch_size = batch_size or self.BATCH_SIZE
+        
+        while pending:
+            batches = self._plan_batches(inputs, pending, system_prompt, batch_size, output_tokens)
+            responses = self.llm.generate_batch(
+                [self._batch_request(inputs, batch, system_prompt) for batch in batches], model=model
+            )
+            pending = self._collect_answers(batches, responses, answers)
+            batch_size = self._retry_batch_size(batches, pending)
+            if batch_size is None:
+                break
         
-        Tareas:
-        - Corregir errores ortográficos y gramaticales
-        - Mejorar la estructura y fluidez
-        - Mantener toda la información factual
-        - Usar español argentino profesional
-        - Eliminar texto repetitivo o irrelevante
-        - Máximo 400 palabras
-        """
+        self._cache_answers(inputs, requested, answers, system_prompt, model)
+        return [answers[position] for position in positions]
+    
+    async def _abatched_generate(self, inputs: Sequence[str], system_prompt: str, batch_size: Optional[int] = None,
+                                 output_tokens: Optional[int] = None,
+                                 model: Optional[str] = None) -> List[Optional[str]]:
+        """Async version of _batched_generate; the batches of a round are sent concurrently"""
+        # Duplicate inputs (the same ad on several portals) take one slot
+        inputs, positions = dedup_inputs(inputs)
+        answers, pending = self._cached_answers(inputs, system_prompt, model)
+        requested = list(pending)
+        batch_size = batch_size or self.BATCH_SIZE
+        
+        while pending:
+            batches = self._plan_batches(inputs, pending, system_prompt, batch_size, output_tokens)
+            responses = await self.llm.agenerate_batch(
+                [self._batch_request(inputs, batch, system_prompt) for batch in batches], model=model
+            )
+            pending = self._collect_answers(batches, responses, answers)
+            batch_size = self._retry_batch_size(batches, pending)
+            if batch_size is None:
+                break
         
-        response = self.llm.generate(cleaned, system_prompt)
-        return response.content if response.success else cleaned
+        self._cache_answers(inputs, requested, answers, system_prompt, model)
+        return [answers[position] for position in positions]
+    
+    def clean_and_enhance_description(self, description: str) -> str:
+        """Clean and enhance property description"""
+        return self.clean_and_enhance_descriptions([description])[0]
+    
+    def clean_and_enhance_descriptions(self, descriptions: Sequence[str]) -> List[str]:
+        """clean_and_enhance_description for several descriptions, batched"""
+        cleaned = [self._basic_text_cleaning(description) for description in descriptions]
+        indexes = [index for index, text in enumerate(cleaned) if text]
+        answers = self._batched_generate([cleaned[index] for index in indexes], _SYS_CLEAN)
+        return self._merge_answers(cleaned, indexes, answers)
+    
+    async def aclean_and_enhance_descriptions(self, descriptions: Sequence[str]) -> List[str]:
+        """Async version of clean_and_enhance_descriptions"""
+        cleaned = [self._basic_text_cleaning(description) for description in descriptions]
+        indexes = [index for index, text in enumerate(cleaned) if text]
+        answers = await self._abatched_generate([cleaned[index] for index in indexes], _SYS_CLEAN)
+        return self._merge_answers(cleaned, indexes, answers)
+    
+    @staticmethod
+    def _merge_answers(cleaned: List[str], indexes: List[int], answers: List[Optional[str]],
+                       max_length: Optional[int] = None) -> List[str]:
+        """Cleaned texts with the ones the LLM answered (within max_length) replaced by their answer"""
+        results = list(cleaned)
+        for index, answer in zip(indexes, answers):
+            if answer and (max_length is None or len(answer) <= max_length):
+                results[index] = answer
+        return results
     
     def extract_key_features(self, text: str) -> List[str]:
         """Extract key features from property text"""
-        system_prompt = """
-        Extrae las características más importantes de esta descripción de propiedad.
-        
-        Busca:
-        - Características estructurales (dormitorios, baños, superficie)
-        - Amenities (piscina, gimnasio, seguridad, etc.)
-        - Ubicación destacada
-        - Estado de la propiedad
-        - Características únicas
-        
-        Responde con una lista de características separadas por comas.
-        Máximo 10 características.
-        """
-        
-        response = self.llm.generate(text, system_prompt)
-        
-        if response.success:
-            features = [f.strip() for f in response.content.split(',')]
-            return [f for f in features if f and len(f) > 3][:10]
-        else:
-            return self._extract_features_fallback(text)
+        return self.extract_key_features_batch([text])[0]
     
-    def generate_seo_title(self, title: str, location: str, property_type: str) -> str:
+    def extract_key_features_batch(self, texts: Sequence[str]) -> List[List[str]]:
+        """extract_key_features for several texts, batched"""
+        answers = self._batched_generate(texts, _SYS_FEATURES, output_tokens=64, model=self.fast_model)
+        return self._key_features(texts, answers)
+    
+    async def aextract_key_features_batch(self, texts: Sequence[str]) -> List[List[str]]:
+        """Async version of extract_key_features_batch"""
+        answers = await self._abatched_generate(texts, _SYS_FEATURES, output_tokens=64, model=self.fast_model)
+        return self._key_features(texts, answers)
+    
+    def _key_features(self, texts: Sequence[str], answers: List[Optional[str]]) -> List[List[str]]:
+        """Comma separated features from each answer, or the regex fallback when unanswered"""
+        results = []
+        for text, answer in zip(texts, answers):
+            if answer:
+                features = [f.strip() for f in answer.split(',')]
+                results.append([f for f in features if f and len(f) > 3][:10])
+            else:
+                results.append(self._extract_features_fallback(text))
+        return results
+    
+    def generate_seo_title(self, title: str, location: str, property_type: str, enhance_with_llm: bool = False) -> str:
         """Generate SEO-optimized title"""
-        system_prompt = """
-        Genera un título optimizado para SEO de una propiedad inmobiliaria.
-        
-        Requisitos:
-        - Incluir tipo de propiedad y ubicación
-        - Máximo 60 caracteres
-        - Atractivo para búsquedas
-        - Español argentino
-        - Incluir palabras clave relevantes
-        """
-        
-        prompt = f"Título original: {title}\nUbicación: {location}\nTipo: {property_type}"
-        
-        response = self.llm.generate(prompt, system_prompt)
-        
-        if response.success and len(response.content) <= 60:
-            return response.content
-        else:
-            return self._generate_seo_title_fallback(title, location, property_type)
+        return self.generate_seo_titles([(title, location, property_type)], enhance_with_llm)[0]
+    
+    def generate_seo_titles(self, items: Sequence[Tuple[str, str, str]], enhance_with_llm: bool = False) -> List[str]:
+        """generate_seo_title for (title, location, property_type) items; only weak template titles reach the LLM"""
+        titles, indexes = self._seo_title_templates(items, enhance_with_llm)
+        if not indexes:
+            return titles
+        answers = self._batched_generate(
+            self._seo_title_prompts([items[index] for index in indexes]), _SYS_SEO_TITLE,
+            output_tokens=24, model=self.fast_model
+        )
+        return self._merge_answers(titles, indexes, answers, max_length=60)
+    
+    async def agenerate_seo_titles(self, items: Sequence[Tuple[str, str, str]],
+                                   enhance_with_llm: bool = False) -> List[str]:
+        """Async version of generate_seo_titles"""
+        titles, indexes = self._seo_title_templates(items, enhance_with_llm)
+        if not indexes:
+            return titles
+        answers = await self._abatched_generate(
+            self._seo_title_prompts([items[index] for index in indexes]), _SYS_SEO_TITLE,
+            output_tokens=24, model=self.fast_model
+        )
+        return self._merge_answers(titles, indexes, answers, max_length=60)
+    
+    def _seo_title_templates(self, items: Sequence[Tuple[str, str, str]],
+                             enhance_with_llm: bool) -> Tuple[List[str], List[int]]:
+        """Template title of each item, and the indexes of those worth an LLM rewrite"""
+        titles = [self._generate_seo_title_fallback(*item) for item in items]
+        if not enhance_with_llm:
+            return titles, []
+        return titles, [
+            index for index, (title, item) in enumerate(zip(titles, items))
+            if self._seo_title_quality(title, item[1], item[2]) < self.TEMPLATE_QUALITY_MIN
+        ]
+    
+    @staticmethod
+    def _seo_title_quality(title: str, location: str, property_type: str) -> float:
+        """Share of the SEO checks a title passes: mentions type and location, 30-60 characters"""
+        lowered = title.lower()
+        checks = (
+            bool(property_type) and str(property_type).lower() in lowered,
+            bool(location) and location.lower() in lowered,
+            30 <= len(title) <= 60,
+        )
+        return sum(checks) / len(checks)
+    
+    @staticmethod
+    def _seo_title_prompts(items: Sequence[Tuple[str, str, str]]) -> List[str]:
+        """SEO title prompts for (title, location, property_type) items"""
+        return [
+            f"Título original: {title}\nUbicación: {location}\nTipo: {property_type}"
+            for title, location, property_type in items
+        ]
     
-    def generate_meta_description(self, description: str, features: List[str]) -> str:
+    def generate_meta_description(self, description: str, features: List[str], enhance_with_llm: bool = False) -> str:
         """Generate meta description for SEO"""
-        system_prompt = """
-        Genera una meta descripción para SEO de una propiedad inmobiliaria.
-        
-        Requisitos:
-        - Máximo 160 caracteres
-        - Incluir características principales
-        - Call to action atractivo
-        - Español argentino
-        """
-        
-        features_text = ", ".join(features[:5])
-        prompt = f"Descripción: {description[:200]}\nCaracterísticas: {features_text}"
-        
-        response = self.llm.generate(prompt, system_prompt)
-        
-        if response.success and len(response.content) <= 160:
-            return response.content
-        else:
-            return self._generate_meta_description_fallback(description, features)
+        return self.generate_meta_descriptions([(description, features)], enhance_with_llm)[0]
+    
+    def generate_meta_descriptions(self, items: Sequence[Tuple[str, List[str]]],
+                                   enhance_with_llm: bool = False) -> List[str]:
+        """generate_meta_description for (description, features) items; only weak templates reach the LLM"""
+        metas, indexes = self._meta_description_templates(items, enhance_with_llm)
+        if not indexes:
+            return metas
+        answers = self._batched_generate(
+            self._meta_description_prompts([items[index] for index in indexes]), _SYS_META,
+            output_tokens=48, model=self.fast_model
+        )
+        return self._merge_answers(metas, indexes, answers, max_length=160)
+    
+    async def agenerate_meta_descriptions(self, items: Sequence[Tuple[str, List[str]]],
+                                          enhance_with_llm: bool = False) -> List[str]:
+        """Async version of generate_meta_descriptions"""
+        metas, indexes = self._meta_description_templates(items, enhance_with_llm)
+        if not indexes:
+            return metas
+        answers = await self._abatched_generate(
+            self._meta_description_prompts([items[index] for index in indexes]), _SYS_META,
+            output_tokens=48, model=self.fast_model
+        )
+        return self._merge_answers(metas, indexes, answers, max_length=160)
+    
+    def _meta_description_templates(self, items: Sequence[Tuple[str, List[str]]],
+                                    enhance_with_llm: bool) -> Tuple[List[str], List[int]]:
+        """Template meta description of each item, and the indexes of those worth an LLM rewrite"""
+        metas = [self._generate_meta_description_fallback(*item) for item in items]
+        if not enhance_with_llm:
+            return metas, []
+        return metas, [
+            index for index, (meta, (description, features)) in enumerate(zip(metas, items))
+            if self._meta_description_quality(meta, description, features) < self.TEMPLATE_QUALITY_MIN
+        ]
+    
+    @staticmethod
+    def _meta_description_quality(meta: str, description: str, features: List[str]) -> float:
+        """Share of the SEO checks a meta description passes: has a description and features, 120-160 characters"""
+        checks = (
+            bool(description),
+            bool(features) and features[0] in meta,
+            120 <= len(meta) <= 160,
+        )
+        return sum(checks) / len(checks)
+    
+    @staticmethod
+    def _meta_description_prompts(items: Sequence[Tuple[str, List[str]]]) -> List[str]:
+        """Meta description prompts for (description, features) items"""
+        return [
+            f"Descripción: {description[:200]}\nCaracterísticas: {', '.join(features[:5])}"
+            for description, features in items
+        ]
     
     def translate_to_english(self, text: str) -> str:
         """Translate property description to English"""
-        system_prompt = """
-        Traduce esta descripción de propiedad inmobiliaria al inglés.
-        
-        Requisitos:
-        - Traducción natural y profesional
-        - Mantener términos inmobiliarios apropiados
-        - Adaptar medidas y monedas si es necesario
-        - Conservar toda la información factual
-        """
+        return self.translate_texts_to_english([text])[0]
+    
+    def translate_texts_to_english(self, texts: Sequence[str]) -> List[str]:
+        """translate_to_english for several texts, batched"""
+        answers = self._batched_generate(texts, _SYS_TRANSLATE)
+        return [answer or text for text, answer in zip(texts, answers)]
+    
+    async def atranslate_texts_to_english(self, texts: Sequence[str]) -> List[str]:
+        """Async version of translate_texts_to_english"""
+        answers = await self._abatched_generate(texts, _SYS_TRANSLATE)
+        return [answer or text for text, answer in zip(texts, answers)]
+    
+    async def aenhance_properties(self, properties: Sequence[Property], enhance_with_llm: bool = False) -> List[Dict[str, Any]]:
+        """Enhanced description, key features, SEO title and meta description of each property"""
+        descriptions = [property_obj.description or "" for property_obj in properties]
+        
+        # The three independent tasks run concurrently; meta descriptions need their results
+        enhanced, features, seo_titles = await asyncio.gather(
+            self.aclean_and_enhance_descriptions(descriptions),
+            self.aextract_key_features_batch([
+                f"{property_obj.title} {description}" for property_obj, description in zip(properties, descriptions)
+            ]),
+            self.agenerate_seo_titles([
+                (
+                    property_obj.title,
+                    property_obj.location.neighborhood or property_obj.location.city or "",
+                    property_obj.property_type
+                )
+                for property_obj in properties
+            ], enhance_with_llm)
+        )
+        meta_descriptions = await self.agenerate_meta_descriptions(list(zip(enhanced, features)), enhance_with_llm)
+        
+        return [
+            {
+                "description": description,
+                "seo_title": seo_title,
+                "meta_description": meta_description,
+                "key_features": key_features
+            }
+            for description, key_features, seo_title, meta_description
+            in zip(enhanced, features, seo_titles, meta_descriptions)
+        ]
+    
+    def run_batch_sync(self, coroutine: Awaitable[T]) -> T:
+        """Run one of the async batch methods from synchronous code (not from inside an event loop)"""
+        async def run() -> T:
+            try:
+                return await coroutine
+            finally:
+                # The async HTTP client belongs to this temporary loop
+                await self.llm.aclose()
         
-        response = self.llm.generate(text, system_prompt)
-        return response.content if response.success else text
+        return asyncio.run(run())
     
     def generate_social_media_post(self, property_data: Dict[str, Any], platform: str = "instagram") -> str:
         """Generate social media post for property"""
-        system_prompt = f"""
-        Genera un post para {platform} promocionando esta propiedad inmobiliaria.
-        
-        Requisitos para {platform}:
-        - Tono atractivo y moderno
-        - Incluir hashtags relevantes
-        - Call to action claro
-        - Español argentino
-        - Máximo 280 caracteres para Twitter, 500 para Instagram
-        """
-        
-        import json
-        property_text = json.dumps(property_data, ensure_ascii=False, indent=2)
-        
-        response = self.llm.generate(property_text, system_prompt)
+        # Compact JSON: indentation would only add prompt tokens
+        property_text = orjson.dumps(property_data, option=orjson.OPT_NON_STR_KEYS).decode()
+        prompt = f"Red social: {platform}\nPropiedad: {property_text}"
+        response = self.llm.generate(prompt, _SYS_SOCIAL)
         return response.content if response.success else self._generate_social_post_fallback(property_data)
     
     def extract_price_from_text(self, text: str) -> Dict[str, Any]:
         """Extract price information from text"""
-        system_prompt = """
-        Extrae información de precio de este texto inmobiliario.
-        
-        Busca:
-        - Precio principal
-        - Moneda (USD, ARS, EUR)
-        - Expensas si se mencionan
-        - Precio por m² si está disponible
-        
-        Responde en formato JSON con las claves: price, currency, expenses, price_per_sqm
-        """
-        
-        response = self.llm.generate(text, system_prompt)
+        response = self.llm.generate(text, _SYS_PRICE, model=self.fast_model, format=_PRICE_SCHEMA)
         
         if response.success:
             try:
-                import json
-                return json.loads(response.content)
-            except json.JSONDecodeError:
+                return orjson.loads(response.content)
+            except orjson.JSONDecodeError:
                 return self._extract_price_fallback(text)
         else:
             return self._extract_price_fallback(text)
@@ -167,47 +544,28 @@ class TextEnhancer:
         if not text:
             return ""
         
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove HTML tags
-        text = re.sub(r'<[^>]+>', '', text)
-        
-        # Remove special characters but keep Spanish accents
-        text = re.sub(r'[^\w\s\.\,\;\:\!\?\-\(\)ñáéíóúüÑÁÉÍÓÚÜ]', '', text)
-        
-        # Fix common issues
-        text = text.replace('  ', ' ')
-        text = text.strip()
-        
-        return text
+        # Drop tags and disallowed characters first, so the gaps they leave are
+        # collapsed together with the rest of the whitespace; str.split() splits on
+        # the same characters as \s and trims the ends, without a second regex pass
+        return ' '.join(_STRIP_RE.sub('', text).split())
     
     def _extract_features_fallback(self, text: str) -> List[str]:
         """Fallback feature extraction using regex"""
-        features = []
-        
-        # Common patterns
-        patterns = {
-            'dormitorios': r'(\d+)\s*dormitorios?',
-            'baños': r'(\d+)\s*baños?',
-            'cocheras': r'(\d+)\s*cocheras?',
-            'piscina': r'piscina',
-            'gimnasio': r'gimnasio',
-            'seguridad': r'seguridad',
-            'balcón': r'balcón',
-            'terraza': r'terraza'
-        }
-        
-        text_lower = text.lower()
-        
-        for feature, pattern in patterns.items():
-            if re.search(pattern, text_lower):
-                match = re.search(pattern, text_lower)
-                if match and match.groups():
-                    features.append(f"{match.group(1)} {feature}")
-                else:
-                    features.append(feature)
-        
+        # Substring checks are far cheaper than the alternation scan, so texts that
+        # mention no feature keyword skip the regex
+        lowered = text.lower()
+        if not any(token in lowered for token in _FEATURE_TOKENS):
+            return []
+        
+        # One scan finds every feature; the first mention of each one counts
+        found = {}
+        for match in _FEATURE_RE.finditer(lowered):
+            found.setdefault(match.lastgroup, match.group(match.lastgroup))
+        
+        features = [
+            f"{found[feature]} {feature}" if feature in _COUNTED_FEATURES else feature
+            for feature in _FEATURE_ORDER if feature in found
+        ]
         return features[:10]
     
     def _generate_seo_title_fallback(self, title: str, location: str, property_type: str) -> str:
@@ -257,22 +615,21 @@ class TextEnhancer:
             'price_per_sqm': None
         }
         
-        # Price patterns
-        price_patterns = [
-            r'USD?\s*(\d{1,3}(?:\.\d{3})*)',
-            r'\$\s*(\d{1,3}(?:\.\d{3})*)',
-            r'(\d{1,3}(?:\.\d{3})*)\s*dólares',
-            r'(\d{1,3}(?:\.\d{3})*)\s*pesos'
-        ]
-        
-        for pattern in price_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                result['price'] = match.group(1).replace('.', '')
-                if 'USD' in pattern or '$' in pattern or 'dólares' in pattern:
-                    result['currency'] = 'USD'
-                else:
-                    result['currency'] = 'ARS'
-                break
+        # Every pattern needs one of these literals; most descriptions have none
+        lowered = text.lower()
+        if not any(token in lowered for token in _PRICE_TOKENS):
+            return result
+        
+        # One scan over the text; a higher priority form wins over an earlier match
+        best = None
+        for match in _PRICE_RE.finditer(text):
+            if best is None or _PRICE_PRIORITY[match.lastgroup] < _PRICE_PRIORITY[best.lastgroup]:
+                best = match
+                if _PRICE_PRIORITY[match.lastgroup] == 0:
+                    break
+        
+        if best is not None:
+            result['price'] = best.group(best.lastgroup).replace('.', '')
+            result['currency'] = 'ARS' if best.lastgroup == 'pesos' else 'USD'
         
         return result
\ No newline at end of file
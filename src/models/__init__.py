@@ -4,11 +4,18 @@ from .property import (
     OperationType,
     Currency,
     PropertyStatus,
+    PROPERTY_TYPES,
+    OPERATION_TYPES,
+    CURRENCIES,
+    PROPERTY_STATUSES,
+    enum_from_value,
+    batch_clock,
     Location,
     PropertyFeatures,
     PropertyPrice,
     PropertyContact,
     PropertyImages,
+    ListingStub,
     PropertySearchFilters,
     PropertyUpdate
 )
@@ -19,11 +26,18 @@ __all__ = [
     "OperationType",
     "Currency",
     "PropertyStatus",
+    "PROPERTY_TYPES",
+    "OPERATION_TYPES",
+    "CURRENCIES",
+    "PROPERTY_STATUSES",
+    "enum_from_value",
+    "batch_clock",
     "Location",
     "PropertyFeatures",
     "PropertyPrice",
     "PropertyContact",
     "PropertyImages",
+    "ListingStub",
     "PropertySearchFilters",
     "PropertyUpdate"
 ]
\ No newline at end of file
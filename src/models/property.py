@@ -1,6 +1,10 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from functools import cached_property
+from typing import Optional, List, Dict, Any, Iterator, TypeVar
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 
 
@@ -31,7 +35,43 @@ class PropertyStatus(str, Enum):
     RENTED = "rented"
 
 
-class Location(BaseModel):
+E = TypeVar("E", bound=Enum)
+
+# Enum members by value; a dict lookup skips the EnumMeta.__call__ dispatch
+PROPERTY_TYPES: Dict[str, PropertyType] = {member.value: member for member in PropertyType}
+OPERATION_TYPES: Dict[str, OperationType] = {member.value: member for member in OperationType}
+CURRENCIES: Dict[str, Currency] = {member.value: member for member in Currency}
+PROPERTY_STATUSES: Dict[str, PropertyStatus] = {member.value: member for member in PropertyStatus}
+
+
+def enum_from_value(members: Dict[str, E], value: Optional[str], default: Optional[E] = None) -> Optional[E]:
+    """Enum member for a raw string value, or default when the value is unknown."""
+    return members.get(value, default)
+
+
+# Timestamp shared by every model built inside a batch_clock() block
+_BATCH_NOW: ContextVar[Optional[datetime]] = ContextVar("batch_now", default=None)
+
+
+def _now() -> datetime:
+    """The pinned batch timestamp, or the current UTC time outside a batch."""
+    return _BATCH_NOW.get() or datetime.utcnow()
+
+
+@contextmanager
+def batch_clock() -> Iterator[datetime]:
+    """Pin one UTC timestamp for every model created inside the block."""
+    token = _BATCH_NOW.set(datetime.utcnow())
+    try:
+        yield _BATCH_NOW.get()
+    finally:
+        _BATCH_NOW.reset(token)
+
+
+# Listing parts are filled in field by field while parsing and never leave the
+# pipeline, so they are slotted dataclasses; Property passes instances through as-is
+@dataclass(slots=True)
+class Location:
     country: str = "Argentina"
     province: Optional[str] = None
     city: Optional[str] = None
@@ -42,7 +82,8 @@ class Location(BaseModel):
     postal_code: Optional[str] = None
 
 
-class PropertyFeatures(BaseModel):
+@dataclass(slots=True)
+class PropertyFeatures:
     bedrooms: Optional[int] = None
     bathrooms: Optional[int] = None
     parking_spaces: Optional[int] = None
@@ -51,11 +92,12 @@ class PropertyFeatures(BaseModel):
     floor: Optional[int] = None
     total_floors: Optional[int] = None
     age: Optional[int] = None  # in years
-    amenities: List[str] = Field(default_factory=list)
+    amenities: List[str] = field(default_factory=list)
     condition: Optional[str] = None
 
 
-class PropertyPrice(BaseModel):
+@dataclass(slots=True)
+class PropertyPrice:
     amount: Optional[float] = None
     currency: Currency = Currency.ARS
     price_per_sqm: Optional[float] = None
@@ -63,7 +105,8 @@ class PropertyPrice(BaseModel):
     expenses_currency: Currency = Currency.ARS
 
 
-class PropertyContact(BaseModel):
+@dataclass(slots=True)
+class PropertyContact:
     agent_name: Optional[str] = None
     agency_name: Optional[str] = None
     phone: Optional[str] = None
@@ -71,14 +114,26 @@ class PropertyContact(BaseModel):
     website: Optional[str] = None
 
 
-class PropertyImages(BaseModel):
+@dataclass(slots=True)
+class PropertyImages:
     main_image: Optional[str] = None
-    gallery: List[str] = Field(default_factory=list)
+    gallery: List[str] = field(default_factory=list)
     floor_plan: Optional[str] = None
     virtual_tour: Optional[str] = None
 
 
+@dataclass(slots=True)
+class ListingStub:
+    """A property card on a listing page, before its detail page is fetched."""
+    url: str
+    title: str = ""
+    price_text: str = ""
+    location_text: str = ""
+
+
 class Property(BaseModel):
+    model_config = ConfigDict(use_enum_values=True)
+    
     # Unique identifiers
     id: Optional[str] = None
     external_id: Optional[str] = None  # ID from source website
@@ -108,20 +163,14 @@ class Property(BaseModel):
     images: PropertyImages
     
     # Metadata
-    first_seen: datetime = Field(default_factory=datetime.utcnow)
-    last_updated: datetime = Field(default_factory=datetime.utcnow)
-    last_checked: datetime = Field(default_factory=datetime.utcnow)
+    first_seen: datetime = Field(default_factory=_now)
+    last_updated: datetime = Field(default_factory=_now)
+    last_checked: datetime = Field(default_factory=_now)
     is_featured: bool = False
     is_verified: bool = False
     
     # Additional data
     raw_data: Dict[str, Any] = Field(default_factory=dict)
-    
-    class Config:
-        use_enum_values = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 
 class PropertySearchFilters(BaseModel):
@@ -141,6 +190,11 @@ class PropertySearchFilters(BaseModel):
     neighborhood: Optional[str] = None
     amenities: List[str] = Field(default_factory=list)
     
+    @cached_property
+    def as_dict(self) -> Dict[str, Any]:
+        """JSON-ready export of the filters that were set, computed once per instance."""
+        return self.model_dump(mode="json", exclude_none=True)
+    
     
 class PropertyUpdate(BaseModel):
     price: Optional[PropertyPrice] = None
@@ -149,4 +203,4 @@ class PropertyUpdate(BaseModel):
     images: Optional[PropertyImages] = None
     features: Optional[PropertyFeatures] = None
     contact: Optional[PropertyContact] = None
-    last_updated: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    last_updated: datetime = Field(default_factory=_now)
\ No newline at end of file
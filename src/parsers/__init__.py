@@ -1,19 +1,30 @@
-from .base_parser import BaseParser
-from .zonaprop_parser import ZonaPropParser
-from .argenprop_parser import ArgenPropParser
-from .mercadolibre_parser import MercadoLibreParser
-from .remax_parser import RemaxParser
-from .properati_parser import ProperatiParser
-from .inmuebles24_parser import Inmuebles24Parser
-from .navent_parser import NaventParser
+import importlib
 
-__all__ = [
-    "BaseParser",
-    "ZonaPropParser", 
-    "ArgenPropParser",
-    "MercadoLibreParser",
-    "RemaxParser",
-    "ProperatiParser",
-    "Inmuebles24Parser",
-    "NaventParser"
-]
\ No newline at end of file
+# Parser class -> module; modules (and their scraping dependencies) are imported on first access
+_PARSER_MODULES = {
+    "BaseParser": "base_parser",
+    "ZonaPropParser": "zonaprop_parser",
+    "ArgenPropParser": "argenprop_parser",
+    "MercadoLibreParser": "mercadolibre_parser",
+    "RemaxParser": "remax_parser",
+    "ProperatiParser": "properati_parser",
+    "Inmuebles24Parser": "inmuebles24_parser",
+    "NaventParser": "navent_parser",
+}
+
+__all__ = list(_PARSER_MODULES)
+
+
+def __getattr__(name: str):
+    """Import a parser module the first time one of its classes is requested."""
+    module_name = _PARSER_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    parser_class = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = parser_class
+    return parser_class
+
+
+def __dir__():
+    """List the lazily loaded parser classes alongside the module globals."""
+    return sorted(list(globals()) + __all__)
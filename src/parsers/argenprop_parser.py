@@ -1,19 +1,123 @@
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Optional, Union
 from urllib.parse import urlencode, urlparse, parse_qs
 from datetime import datetime
 
+from lxml import etree
+
 from .base_parser import BaseParser
 from ..models import (
     Property, PropertyType, OperationType, Currency, PropertyStatus,
     Location, PropertyFeatures, PropertyPrice, PropertyContact, 
-    PropertyImages, PropertySearchFilters
+    PropertyImages, PropertySearchFilters, ListingStub
 )
 from ..utils import app_logger
 
 
+def _by_class(tag: str, class_name: str) -> etree.XPath:
+    """Compiled XPath for descendant tags carrying a CSS class (bs4's class_ match)."""
+    # The plain substring test rejects most tags before the costlier whole-token test
+    return etree.XPath(
+        f".//{tag}[contains(@class, '{class_name}')]"
+        f"[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+    )
+
+
+def _first(node, *queries: etree.XPath):
+    """First match of the first query that matches anything, like a chain of bs4 find() fallbacks."""
+    for query in queries:
+        found = query(node)
+        if found:
+            return found[0]
+    return None
+
+
+def _keyword_match(text: str, keywords: tuple):
+    """Value of the first keyword found in text, or None."""
+    for keyword, value in keywords:
+        if keyword in text:
+            return value
+    return None
+
+
+def _all(node, *queries: etree.XPath) -> list:
+    """All matches of the first query that matches anything, like a chain of bs4 find_all() fallbacks."""
+    for query in queries:
+        found = query(node)
+        if found:
+            return found
+    return []
+
+
+# Search URL slug per property type
+_PROPERTY_TYPE_SLUGS = {
+    PropertyType.APARTMENT: 'departamento',
+    PropertyType.HOUSE: 'casa',
+    PropertyType.COMMERCIAL: 'local',
+    PropertyType.LAND: 'terreno',
+    PropertyType.OFFICE: 'oficina'
+}
+
+# Keywords in a listing URL or breadcrumb, in priority order: the first one present wins
+_OPERATION_KEYWORDS = (('alquiler', OperationType.RENT), ('venta', OperationType.SALE))
+_PROPERTY_TYPE_KEYWORDS = tuple((slug, property_type) for property_type, slug in _PROPERTY_TYPE_SLUGS.items())
+
+# Whitespace runs in a location name, turned into dashes for the localidad slug
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Page number in the "last page" link, the listing ID in a detail URL, and any digit
+# run (for IDs shown as text)
+_PAGE_NUMBER_RE = re.compile(r'pagina-(\d+)')
+_URL_ID_RE = re.compile(r'/(\d+)(?:/|$)')
+_DIGITS_RE = re.compile(r'\d+')
+
+# Queries are compiled once at import; each list is a fallback chain in priority order
+_LISTING_CARDS = (_by_class('div', 'listing__item'), _by_class('article', 'card-container'))
+_CARD_LINK = (_by_class('a', 'card__title-link'), etree.XPath('.//a'))
+_CARD_TITLE = (_by_class('h2', 'card__title'),)
+_CARD_PRICE = (_by_class('p', 'card__price'), _by_class('span', 'price'))
+_CARD_LOCATION = (_by_class('p', 'card__location'), _by_class('span', 'location'))
+_TITLE = (_by_class('h1', 'property-title'), etree.XPath('.//h1'))
+_DESCRIPTION = (_by_class('div', 'property-description'), _by_class('section', 'description'))
+_PAGINATION = (_by_class('nav', 'pagination'), _by_class('div', 'pagination'))
+_LINKS = etree.XPath('.//a')
+_LAST_PAGE_LINK = (_by_class('a', 'last'),)
+_BREADCRUMB = (_by_class('nav', 'breadcrumb'),)
+_LOCATION = (_by_class('div', 'property-location'), _by_class('p', 'location'), _by_class('span', 'location'))
+_ADDRESS = (_by_class('span', 'address'), _by_class('div', 'address'))
+_FEATURES_SECTION = (
+    _by_class('div', 'property-features'), _by_class('section', 'features'), _by_class('ul', 'features-list')
+)
+_FEATURE_ITEMS = etree.XPath('.//*[self::li or self::div or self::span]')
+
+# Tags a feature item with the one field it fills, in one anchored match; the branches
+# are tried in priority order, so "2 baños, 3 ambientes" still counts as bedrooms
+_FEATURE_KIND_RE = re.compile(
+    r'^(?:(?=.*?(?:dormitorio|habitación|ambiente))(?P<bedrooms>)'
+    r'|(?=.*?baño)(?P<bathrooms>)'
+    r'|(?=.*?(?:cochera|garage|estacionamiento))(?P<parking_spaces>)'
+    r'|(?=.*?(?:m²|metros))(?=.*?(?:total|superficie))(?P<total_area>)'
+    r'|(?=.*?(?:m²|metros))(?=.*?cubierto)(?P<covered_area>))',
+    re.DOTALL
+)
+_DATA_BEDROOMS = (etree.XPath('.//*[@data-bedrooms]'),)
+_DATA_BATHROOMS = (etree.XPath('.//*[@data-bathrooms]'),)
+_DATA_AREA = (etree.XPath('.//*[@data-area]'),)
+_PRICE = (_by_class('div', 'property-price'), _by_class('span', 'price'), _by_class('p', 'price'))
+_EXPENSES = (_by_class('span', 'expenses'), _by_class('div', 'expenses'))
+_CONTACT_SECTION = (_by_class('div', 'contact-info'), _by_class('section', 'contact'))
+_AGENCY = (etree.XPath('.//h3'), _by_class('span', 'agency'))
+_AGENT = (_by_class('p', 'agent'), _by_class('span', 'agent'))
+_PHONE = (etree.XPath(".//a[contains(@href, 'tel:')]"), _by_class('span', 'phone'))
+_GALLERY = (_by_class('div', 'property-gallery'), _by_class('section', 'gallery'), _by_class('div', 'images'))
+_IMAGES = etree.XPath('.//img')
+_PROPERTY_ID = (_by_class('span', 'property-id'), etree.XPath('.//*[@data-property-id]'))
+
+
 class ArgenPropParser(BaseParser):
-    """Parser for ArgenProp.com"""
+    """Parser for ArgenProp.com; pages are queried as lxml trees with precompiled XPath."""
+    
+    supports_async = True
     
     def __init__(self):
         super().__init__("https://www.argenprop.com", "ArgenProp")
@@ -31,18 +135,11 @@ class ArgenPropParser(BaseParser):
                 
         # Property type mapping
         if filters.property_type:
-            type_mapping = {
-                PropertyType.APARTMENT: 'departamento',
-                PropertyType.HOUSE: 'casa',
-                PropertyType.COMMERCIAL: 'local',
-                PropertyType.LAND: 'terreno',
-                PropertyType.OFFICE: 'oficina'
-            }
-            if filters.property_type in type_mapping:
+            if filters.property_type in _PROPERTY_TYPE_SLUGS:
                 if 'q' in params:
-                    params['q'] += f"-{type_mapping[filters.property_type]}"
+                    params['q'] += f"-{_PROPERTY_TYPE_SLUGS[filters.property_type]}"
                 else:
-                    params['q'] = type_mapping[filters.property_type]
+                    params['q'] = _PROPERTY_TYPE_SLUGS[filters.property_type]
                     
         # Price range
         if filters.min_price:
@@ -82,65 +179,59 @@ class ArgenPropParser(BaseParser):
             location_parts.append(filters.province)
             
         if location_parts:
-            params['localidad'] = '-'.join(location_parts).lower().replace(' ', '-')
+            params['localidad'] = _WHITESPACE_RE.sub('-', '-'.join(location_parts).lower())
             
         base_url = f"{self.base_url}/propiedades"
         if params:
             return f"{base_url}?{urlencode(params)}"
         return base_url
         
-    def parse_listing_page(self, url: str) -> List[Dict[str, Any]]:
+    def parse_listing_page(self, url: str) -> List[ListingStub]:
         """Parse ArgenProp listing page and extract property links."""
         response = self.get_page(url)
         if not response:
             return []
             
-        soup = self.parse_html(response.text)
+        return self.parse_listing_html(url, response.content, self.declared_encoding(response))
+        
+    def parse_listing_html(self, url: str, html: Union[str, bytes], encoding: Optional[str] = None) -> List[ListingStub]:
+        """Extract property links from a fetched ArgenProp listing page."""
+        tree = self.parse_tree(html, encoding)
         properties = []
         
         # Find property cards - ArgenProp uses different class names
-        property_cards = soup.find_all('div', class_='listing__item')
-        
-        if not property_cards:
-            # Try alternative selectors
-            property_cards = soup.find_all('article', class_='card-container')
+        property_cards = _all(tree, *_LISTING_CARDS)
             
         for card in property_cards:
             try:
                 # Extract property URL
-                link_elem = card.find('a', class_='card__title-link')
-                if not link_elem:
-                    link_elem = card.find('a')
+                link_elem = _first(card, *_CARD_LINK)
                     
-                if not link_elem:
+                if link_elem is None:
                     continue
                     
                 property_url = self.build_absolute_url(link_elem.get('href'))
                 
                 # Extract basic info
-                title_elem = card.find('h2', class_='card__title')
-                if not title_elem:
+                title_elem = _first(card, *_CARD_TITLE)
+                if title_elem is None:
                     title_elem = link_elem
-                title = self.clean_text(title_elem.get_text()) if title_elem else ""
+                title = self.clean_text(title_elem.text_content())
                 
                 # Extract price
-                price_elem = card.find('p', class_='card__price')
-                if not price_elem:
-                    price_elem = card.find('span', class_='price')
-                price_text = price_elem.get_text() if price_elem else ""
+                price_elem = _first(card, *_CARD_PRICE)
+                price_text = price_elem.text_content() if price_elem is not None else ""
                 
                 # Extract location
-                location_elem = card.find('p', class_='card__location')
-                if not location_elem:
-                    location_elem = card.find('span', class_='location')
-                location_text = location_elem.get_text() if location_elem else ""
+                location_elem = _first(card, *_CARD_LOCATION)
+                location_text = location_elem.text_content() if location_elem is not None else ""
                 
-                properties.append({
-                    'url': property_url,
-                    'title': title,
-                    'price_text': price_text,
-                    'location_text': location_text
-                })
+                properties.append(ListingStub(
+                    url=property_url,
+                    title=title,
+                    price_text=price_text,
+                    location_text=location_text
+                ))
                 
             except Exception as e:
                 app_logger.warning(f"Error parsing property card: {e}")
@@ -155,41 +246,41 @@ class ArgenPropParser(BaseParser):
         if not response:
             return None
             
-        soup = self.parse_html(response.text)
+        return self.parse_property_html(url, response.content, self.declared_encoding(response))
+        
+    def parse_property_html(self, url: str, html: Union[str, bytes], encoding: Optional[str] = None) -> Optional[Property]:
+        """Parse a fetched ArgenProp property detail page."""
+        tree = self.parse_tree(html, encoding)
         
         try:
             # Extract basic information
-            title_elem = soup.find('h1', class_='property-title')
-            if not title_elem:
-                title_elem = soup.find('h1')
-            title = self.clean_text(title_elem.get_text()) if title_elem else "No title"
+            title_elem = _first(tree, *_TITLE)
+            title = self.clean_text(title_elem.text_content()) if title_elem is not None else "No title"
             
             # Extract description
-            description_elem = soup.find('div', class_='property-description')
-            if not description_elem:
-                description_elem = soup.find('section', class_='description')
-            description = self.clean_text(description_elem.get_text()) if description_elem else None
+            description_elem = _first(tree, *_DESCRIPTION)
+            description = self.clean_text(description_elem.text_content()) if description_elem is not None else None
             
             # Extract property type and operation type
-            property_type, operation_type = self._extract_types_from_url_and_content(url, soup)
+            property_type, operation_type = self._extract_types_from_url_and_content(url, tree)
             
             # Extract location
-            location = self._extract_location(soup)
+            location = self._extract_location(tree)
             
             # Extract features
-            features = self._extract_features(soup)
+            features = self._extract_features(tree)
             
             # Extract price
-            price = self._extract_price(soup)
+            price = self._extract_price(tree)
             
             # Extract contact information
-            contact = self._extract_contact(soup)
+            contact = self._extract_contact(tree)
             
             # Extract images
-            images = self._extract_images(soup)
+            images = self._extract_images(tree)
             
             # Extract external ID
-            external_id = self._extract_external_id(url, soup)
+            external_id = self._extract_external_id(url, tree)
             
             property_obj = Property(
                 external_id=external_id,
@@ -223,100 +314,63 @@ class ArgenPropParser(BaseParser):
         if not response:
             return 1
             
-        soup = self.parse_html(response.text)
+        tree = self.parse_tree(response.content, self.declared_encoding(response))
         
         # Look for pagination
-        pagination = soup.find('nav', class_='pagination')
-        if not pagination:
-            pagination = soup.find('div', class_='pagination')
+        pagination = _first(tree, *_PAGINATION)
             
-        if not pagination:
+        if pagination is None:
             return 1
             
-        page_links = pagination.find_all('a')
+        page_links = _LINKS(pagination)
         max_page = 1
         
         for link in page_links:
             try:
-                page_text = link.get_text().strip()
+                page_text = link.text_content().strip()
                 if page_text.isdigit():
                     max_page = max(max_page, int(page_text))
             except:
                 continue
                 
         # Also check for "last page" indicator
-        last_page_elem = pagination.find('a', class_='last')
-        if last_page_elem:
+        last_page_elem = _first(pagination, *_LAST_PAGE_LINK)
+        if last_page_elem is not None:
             href = last_page_elem.get('href', '')
-            page_match = re.search(r'pagina-(\d+)', href)
+            page_match = _PAGE_NUMBER_RE.search(href)
             if page_match:
                 max_page = max(max_page, int(page_match.group(1)))
                 
         return max_page
         
-    def _extract_types_from_url_and_content(self, url: str, soup) -> tuple:
+    def _extract_types_from_url_and_content(self, url: str, tree) -> tuple:
         """Extract property and operation types from URL and content."""
         property_type = PropertyType.APARTMENT  # default
         operation_type = OperationType.SALE  # default
         
-        url_lower = url.lower()
-        
-        # Operation type from URL
-        if 'alquiler' in url_lower:
-            operation_type = OperationType.RENT
-        elif 'venta' in url_lower:
-            operation_type = OperationType.SALE
-            
-        # Property type from URL
-        if 'departamento' in url_lower:
-            property_type = PropertyType.APARTMENT
-        elif 'casa' in url_lower:
-            property_type = PropertyType.HOUSE
-        elif 'local' in url_lower:
-            property_type = PropertyType.COMMERCIAL
-        elif 'terreno' in url_lower:
-            property_type = PropertyType.LAND
-        elif 'oficina' in url_lower:
-            property_type = PropertyType.OFFICE
-            
-        # Also check breadcrumb or page content
-        breadcrumb = soup.find('nav', class_='breadcrumb')
-        if breadcrumb:
-            breadcrumb_text = breadcrumb.get_text().lower()
-            
-            if 'alquiler' in breadcrumb_text:
-                operation_type = OperationType.RENT
-            elif 'venta' in breadcrumb_text:
-                operation_type = OperationType.SALE
-                
-            if 'departamento' in breadcrumb_text:
-                property_type = PropertyType.APARTMENT
-            elif 'casa' in breadcrumb_text:
-                property_type = PropertyType.HOUSE
-            elif 'local' in breadcrumb_text:
-                property_type = PropertyType.COMMERCIAL
-            elif 'terreno' in breadcrumb_text:
-                property_type = PropertyType.LAND
-            elif 'oficina' in breadcrumb_text:
-                property_type = PropertyType.OFFICE
-                
+        # The URL first, then the breadcrumb, which overrides it where it names a type
+        texts = [url.lower()]
+        breadcrumb = _first(tree, *_BREADCRUMB)
+        if breadcrumb is not None:
+            texts.append(breadcrumb.text_content().lower())
+            
+        for text in texts:
+            operation_type = _keyword_match(text, _OPERATION_KEYWORDS) or operation_type
+            property_type = _keyword_match(text, _PROPERTY_TYPE_KEYWORDS) or property_type
+            
         return property_type, operation_type
         
-    def _extract_location(self, soup) -> Location:
+    def _extract_location(self, tree) -> Location:
         """Extract location information."""
         location = Location()
         
         # Try different location selectors
-        location_elem = soup.find('div', class_='property-location')
-        if not location_elem:
-            location_elem = soup.find('p', class_='location')
-        if not location_elem:
-            location_elem = soup.find('span', class_='location')
-            
-        if location_elem:
-            location_text = self.clean_text(location_elem.get_text())
+        location_elem = _first(tree, *_LOCATION)
+            
+        if location_elem is not None:
+            location_text = self.clean_text(location_elem.text_content())
             # ArgenProp format: "Neighborhood, City, Province"
-            location_parts = [part.strip() for part in location_text.split(',')]
+            location_parts = [self.intern_text(part.strip()) for part in location_text.split(',')]
             
             if len(location_parts) >= 1:
                 location.neighborhood = location_parts[0]
@@ -326,105 +380,79 @@ class ArgenPropParser(BaseParser):
                 location.province = location_parts[2]
                 
         # Try to extract address
-        address_elem = soup.find('span', class_='address')
-        if not address_elem:
-            address_elem = soup.find('div', class_='address')
-        if address_elem:
-            location.address = self.clean_text(address_elem.get_text())
+        address_elem = _first(tree, *_ADDRESS)
+        if address_elem is not None:
+            location.address = self.clean_text(address_elem.text_content())
             
         return location
         
-    def _extract_features(self, soup) -> PropertyFeatures:
+    def _extract_features(self, tree) -> PropertyFeatures:
         """Extract property features."""
         features = PropertyFeatures()
         
         # Find features section
-        features_section = soup.find('div', class_='property-features')
-        if not features_section:
-            features_section = soup.find('section', class_='features')
-        if not features_section:
-            features_section = soup.find('ul', class_='features-list')
+        features_section = _first(tree, *_FEATURES_SECTION)
             
-        if features_section:
+        if features_section is not None:
             # Look for specific feature elements
-            feature_items = features_section.find_all(['li', 'div', 'span'])
+            feature_items = _FEATURE_ITEMS(features_section)
             
             for item in feature_items:
-                text = self.clean_text(item.get_text()).lower()
-                
-                # Extract bedrooms
-                if any(word in text for word in ['dormitorio', 'habitación', 'ambiente']):
-                    number = self.extract_number(text)
-                    if number:
-                        features.bedrooms = int(number)
-                        
-                # Extract bathrooms
-                elif 'baño' in text:
-                    number = self.extract_number(text)
-                    if number:
-                        features.bathrooms = int(number)
-                        
-                # Extract parking
-                elif any(word in text for word in ['cochera', 'garage', 'estacionamiento']):
-                    number = self.extract_number(text)
+                # Whitespace doesn't affect the match or the number, so skip clean_text
+                text = item.text_content().lower()
+                match = _FEATURE_KIND_RE.match(text)
+                if not match:
+                    continue
+                    
+                field = match.lastgroup
+                number = self.extract_number(text)
+                if field in ('total_area', 'covered_area'):
                     if number:
-                        features.parking_spaces = int(number)
-                    else:
-                        features.parking_spaces = 1
-                        
-                # Extract area
-                elif 'm²' in text or 'metros' in text:
-                    if any(word in text for word in ['total', 'superficie']):
-                        number = self.extract_number(text)
-                        if number:
-                            features.total_area = number
-                    elif 'cubierto' in text:
-                        number = self.extract_number(text)
-                        if number:
-                            features.covered_area = number
-                            
+                        setattr(features, field, number)
+                elif number:
+                    setattr(features, field, int(number))
+                elif field == 'parking_spaces':
+                    # A bare "cochera" means one space
+                    features.parking_spaces = 1
+                    
         # Also try to extract from structured data
-        self._extract_features_from_structured_data(soup, features)
+        self._extract_features_from_structured_data(tree, features)
         
         return features
         
-    def _extract_features_from_structured_data(self, soup, features: PropertyFeatures):
+    def _extract_features_from_structured_data(self, tree, features: PropertyFeatures):
         """Extract features from structured data elements."""
         # Look for data attributes or structured elements
-        bedrooms_elem = soup.find(attrs={'data-bedrooms': True})
-        if bedrooms_elem:
+        bedrooms_elem = _first(tree, *_DATA_BEDROOMS)
+        if bedrooms_elem is not None:
             try:
                 features.bedrooms = int(bedrooms_elem.get('data-bedrooms'))
             except:
                 pass
                 
-        bathrooms_elem = soup.find(attrs={'data-bathrooms': True})
-        if bathrooms_elem:
+        bathrooms_elem = _first(tree, *_DATA_BATHROOMS)
+        if bathrooms_elem is not None:
             try:
                 features.bathrooms = int(bathrooms_elem.get('data-bathrooms'))
             except:
                 pass
                 
-        area_elem = soup.find(attrs={'data-area': True})
-        if area_elem:
+        area_elem = _first(tree, *_DATA_AREA)
+        if area_elem is not None:
             try:
                 features.total_area = float(area_elem.get('data-area'))
             except:
                 pass
                 
-    def _extract_price(self, soup) -> PropertyPrice:
+    def _extract_price(self, tree) -> PropertyPrice:
         """Extract price information."""
         price = PropertyPrice()
         
         # Try different price selectors
-        price_elem = soup.find('div', class_='property-price')
-        if not price_elem:
-            price_elem = soup.find('span', class_='price')
-        if not price_elem:
-            price_elem = soup.find('p', class_='price')
+        price_elem = _first(tree, *_PRICE)
             
-        if price_elem:
-            price_text = self.clean_text(price_elem.get_text())
+        if price_elem is not None:
+            price_text = self.clean_text(price_elem.text_content())
             
             # Determine currency
             if any(symbol in price_text for symbol in ['USD', 'U$S', 'US$']):
@@ -438,66 +466,52 @@ class ArgenPropParser(BaseParser):
                 price.amount = amount
                 
         # Extract expenses
-        expenses_elem = soup.find('span', class_='expenses')
-        if not expenses_elem:
-            expenses_elem = soup.find('div', class_='expenses')
-        if expenses_elem:
-            expenses_text = self.clean_text(expenses_elem.get_text())
+        expenses_elem = _first(tree, *_EXPENSES)
+        if expenses_elem is not None:
+            expenses_text = self.clean_text(expenses_elem.text_content())
             expenses_amount = self.extract_number(expenses_text)
             if expenses_amount:
                 price.expenses = expenses_amount
                 
         return price
         
-    def _extract_contact(self, soup) -> PropertyContact:
+    def _extract_contact(self, tree) -> PropertyContact:
         """Extract contact information."""
         contact = PropertyContact()
         
         # Find contact section
-        contact_section = soup.find('div', class_='contact-info')
-        if not contact_section:
-            contact_section = soup.find('section', class_='contact')
+        contact_section = _first(tree, *_CONTACT_SECTION)
             
-        if contact_section:
+        if contact_section is not None:
             # Agency name
-            agency_elem = contact_section.find('h3')
-            if not agency_elem:
-                agency_elem = contact_section.find('span', class_='agency')
-            if agency_elem:
-                contact.agency_name = self.clean_text(agency_elem.get_text())
+            agency_elem = _first(contact_section, *_AGENCY)
+            if agency_elem is not None:
+                contact.agency_name = self.intern_text(self.clean_text(agency_elem.text_content()))
                 
             # Agent name
-            agent_elem = contact_section.find('p', class_='agent')
-            if not agent_elem:
-                agent_elem = contact_section.find('span', class_='agent')
-            if agent_elem:
-                contact.agent_name = self.clean_text(agent_elem.get_text())
+            agent_elem = _first(contact_section, *_AGENT)
+            if agent_elem is not None:
+                contact.agent_name = self.intern_text(self.clean_text(agent_elem.text_content()))
                 
             # Phone
-            phone_elem = contact_section.find('a', href=re.compile(r'tel:'))
-            if not phone_elem:
-                phone_elem = contact_section.find('span', class_='phone')
-            if phone_elem:
+            phone_elem = _first(contact_section, *_PHONE)
+            if phone_elem is not None:
                 if phone_elem.get('href'):
                     contact.phone = phone_elem.get('href').replace('tel:', '')
                 else:
-                    contact.phone = self.clean_text(phone_elem.get_text())
+                    contact.phone = self.clean_text(phone_elem.text_content())
                     
         return contact
         
-    def _extract_images(self, soup) -> PropertyImages:
+    def _extract_images(self, tree) -> PropertyImages:
         """Extract image URLs."""
         images = PropertyImages()
         
         # Find image gallery
-        gallery_section = soup.find('div', class_='property-gallery')
-        if not gallery_section:
-            gallery_section = soup.find('section', class_='gallery')
-        if not gallery_section:
-            gallery_section = soup.find('div', class_='images')
+        gallery_section = _first(tree, *_GALLERY)
             
-        if gallery_section:
-            img_elements = gallery_section.find_all('img')
+        if gallery_section is not None:
+            img_elements = _IMAGES(gallery_section)
             
             image_urls = []
             for img in img_elements:
@@ -516,23 +530,21 @@ class ArgenPropParser(BaseParser):
                 
         return images
         
-    def _extract_external_id(self, url: str, soup) -> Optional[str]:
+    def _extract_external_id(self, url: str, tree) -> Optional[str]:
         """Extract external property ID."""
         # Try to extract from URL
-        id_match = re.search(r'/(\d+)(?:/|$)', url)
+        id_match = _URL_ID_RE.search(url)
         if id_match:
             return id_match.group(1)
             
         # Try to extract from page content
-        id_elem = soup.find('span', class_='property-id')
-        if not id_elem:
-            id_elem = soup.find(attrs={'data-property-id': True})
-        if id_elem:
+        id_elem = _first(tree, *_PROPERTY_ID)
+        if id_elem is not None:
             if id_elem.get('data-property-id'):
                 return id_elem.get('data-property-id')
             else:
-                id_text = self.clean_text(id_elem.get_text())
-                id_match = re.search(r'\d+', id_text)
+                id_text = self.clean_text(id_elem.text_content())
+                id_match = _DIGITS_RE.search(id_text)
                 if id_match:
                     return id_match.group()
                     
@@ -1,26 +1,105 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional, Generator
+from functools import lru_cache
+from itertools import cycle
+from typing import List, Dict, Optional, Generator, Union
+import re
 import time
 import random
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 from fake_useragent import UserAgent
+import lxml.html
+from lxml import etree
 from urllib.parse import urljoin, urlparse
 import asyncio
 import aiohttp
 
-from ..models import Property, PropertySearchFilters
+from ..models import ListingStub, Property, PropertySearchFilters, batch_clock
 from ..utils import app_logger, settings
 
 
+class _NumericChars(dict):
+    """str.translate table keeping digits and decimal separators; filled in per character on first sight."""
+    
+    def __missing__(self, code: int) -> Optional[int]:
+        char = chr(code)
+        # isdecimal() is the digit set regex \d matches in str patterns
+        value = code if char.isdecimal() or char in '.,' else None
+        self[code] = value
+        return value
+
+
+# Everything but digits and decimal separators, stripped by extract_number
+_NUMERIC_CHARS = _NumericChars()
+
+# Keep-alive pool per parser session, with retries and backoff for throttled or flaky hosts
+_POOL_CONNECTIONS = 32
+_POOL_MAXSIZE = 64
+_RETRY = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 502, 503, 504))
+
+# Async fan-out: concurrent fetches per search, and the connector pool behind them
+_ASYNC_CONCURRENCY = 64
+_ASYNC_CONNECTION_LIMIT = 256
+_ASYNC_DNS_CACHE_TTL = 300
+_ASYNC_TIMEOUT = aiohttp.ClientTimeout(total=30)
+
+# User agents sampled once per process and rotated through by every parser
+_USER_AGENT_POOL_SIZE = 256
+
+# Canonical copies of place and agency names, which repeat across thousands of listings;
+# bounded so a scrape of unusual values can't grow it without limit
+_INTERNED: Dict[str, str] = {}
+_INTERN_LIMIT = 10000
+
+# Parser for pages re-encoded to bytes by parse_tree
+_UTF8_HTML_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+
+# Charset declared in a Content-Type header
+_CHARSET_RE = re.compile(r'charset=["\']?([\w.:-]+)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=16)
+def _html_parser(encoding: str) -> Optional[lxml.html.HTMLParser]:
+    """lxml HTML parser for raw bytes in a given encoding; None when lxml doesn't know it."""
+    try:
+        return lxml.html.HTMLParser(encoding=encoding)
+    except LookupError:
+        return None
+
+
+@lru_cache(maxsize=1)
+def _user_agent_pool() -> tuple:
+    """Random user agents shared by all parsers; UserAgent() loads its whole browser DB."""
+    ua = UserAgent()
+    return tuple(ua.random for _ in range(_USER_AGENT_POOL_SIZE))
+
+
+def class_strainer(name: str, class_name: str) -> SoupStrainer:
+    """SoupStrainer for name tags carrying a CSS class, for parse_html's parse_only."""
+    def has_class(value) -> bool:
+        # While parsing, the class attribute is still one unsplit string
+        if not value:
+            return False
+        return class_name in (value.split() if isinstance(value, str) else value)
+    
+    return SoupStrainer(name, class_=has_class)
+
+
 class BaseParser(ABC):
     """Base class for all property website parsers."""
     
+    # Parsers that set this implement parse_listing_html and parse_property_html,
+    # so async_search_properties can fetch their pages concurrently
+    supports_async = False
+    
     def __init__(self, base_url: str, name: str):
         self.base_url = base_url
         self.name = name
         self.session = requests.Session()
-        self.ua = UserAgent() if settings.user_agent_rotation else None
+        # Each parser walks the shared pool in its own shuffled order
+        self.ua = cycle(random.sample(_user_agent_pool(), _USER_AGENT_POOL_SIZE)) if settings.user_agent_rotation else None
         self.setup_session()
         
     def setup_session(self):
@@ -34,12 +113,17 @@ class BaseParser(ABC):
         }
         
         if self.ua:
-            headers['User-Agent'] = self.ua.random
+            headers['User-Agent'] = next(self.ua)
         else:
             headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             
         self.session.headers.update(headers)
         
+        # Reuse connections across pages instead of paying a TCP/TLS handshake each time
+        adapter = HTTPAdapter(pool_connections=_POOL_CONNECTIONS, pool_maxsize=_POOL_MAXSIZE, max_retries=_RETRY)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
     def get_page(self, url: str, **kwargs) -> Optional[requests.Response]:
         """Get a page with error handling and rate limiting."""
         try:
@@ -48,7 +132,7 @@ class BaseParser(ABC):
             
             # Rotate user agent if enabled
             if self.ua and settings.user_agent_rotation:
-                self.session.headers['User-Agent'] = self.ua.random
+                self.session.headers['User-Agent'] = next(self.ua)
                 
             response = self.session.get(url, timeout=30, **kwargs)
             response.raise_for_status()
@@ -60,9 +144,32 @@ class BaseParser(ABC):
             app_logger.error(f"Error fetching {url}: {str(e)}")
             return None
             
-    def parse_html(self, html: str) -> BeautifulSoup:
-        """Parse HTML content with BeautifulSoup."""
-        return BeautifulSoup(html, 'lxml')
+    def parse_html(
+        self, html: Union[str, bytes], parse_only: Optional[SoupStrainer] = None, encoding: Optional[str] = None
+    ) -> BeautifulSoup:
+        """Parse HTML content with BeautifulSoup, building only the parse_only subtrees when given."""
+        from_encoding = encoding if isinstance(html, bytes) else None
+        return BeautifulSoup(html, 'lxml', parse_only=parse_only, from_encoding=from_encoding)
+        
+    def parse_tree(self, html: Union[str, bytes], encoding: Optional[str] = None) -> lxml.html.HtmlElement:
+        """Parse HTML content into a bare lxml tree, for parsers that query it with XPath."""
+        try:
+            if isinstance(html, bytes):
+                # Raw bytes are decoded inside libxml2; without a known encoding it reads <meta charset>
+                parser = _html_parser(encoding) if encoding else None
+                return lxml.html.document_fromstring(html, parser=parser)
+            return lxml.html.document_fromstring(html)
+        except ValueError:
+            # lxml refuses str input that carries an XML encoding declaration
+            return lxml.html.document_fromstring(html.encode('utf-8'), parser=_UTF8_HTML_PARSER)
+        except etree.ParserError:
+            # Empty page; an empty tree makes every lookup come back empty
+            return lxml.html.document_fromstring("<html></html>")
+        
+    def declared_encoding(self, response: requests.Response) -> Optional[str]:
+        """Charset from the response's Content-Type header, if it names one."""
+        match = _CHARSET_RE.search(response.headers.get('Content-Type', ''))
+        return match.group(1) if match else None
         
     def clean_text(self, text: str) -> str:
         """Clean and normalize text content."""
@@ -70,14 +177,24 @@ class BaseParser(ABC):
             return ""
         return ' '.join(text.strip().split())
         
+    def intern_text(self, text: str) -> str:
+        """Shared instance of a repeated string, so accumulated results hold one copy of it."""
+        if not text:
+            return text
+        interned = _INTERNED.get(text)
+        if interned is None:
+            if len(_INTERNED) >= _INTERN_LIMIT:
+                return text
+            interned = _INTERNED.setdefault(text, text)
+        return interned
+        
     def extract_number(self, text: str) -> Optional[float]:
         """Extract numeric value from text."""
         if not text:
             return None
             
-        import re
         # Remove currency symbols and common separators
-        cleaned = re.sub(r'[^\d.,]', '', text)
+        cleaned = text.translate(_NUMERIC_CHARS)
         cleaned = cleaned.replace(',', '.')
         
         try:
@@ -95,7 +212,7 @@ class BaseParser(ABC):
         pass
         
     @abstractmethod
-    def parse_listing_page(self, url: str) -> List[Dict[str, Any]]:
+    def parse_listing_page(self, url: str) -> List[ListingStub]:
         """Parse a listing page and return property data."""
         pass
         
@@ -125,48 +242,70 @@ class BaseParser(ABC):
             page_url = f"{search_url}&page={page}" if '?' in search_url else f"{search_url}?page={page}"
             property_links = self.parse_listing_page(page_url)
             
-            for link_data in property_links:
-                property_url = link_data.get('url')
-                if property_url:
-                    property_data = self.parse_property_detail(property_url)
-                    if property_data:
-                        yield property_data
+            # One timestamp per page; yield only after the clock is released
+            page_properties = []
+            with batch_clock():
+                for link_data in property_links:
+                    if link_data.url:
+                        property_data = self.parse_property_detail(link_data.url)
+                        if property_data:
+                            page_properties.append(property_data)
+                            
+            yield from page_properties
                         
     async def async_get_page(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
-        """Async version of get_page."""
+        """Async version of get_page, retrying throttled and unavailable responses with backoff."""
         try:
             await asyncio.sleep(settings.scraping_delay + random.uniform(0, 0.5))
             
             headers = {}
             if self.ua and settings.user_agent_rotation:
-                headers['User-Agent'] = self.ua.random
+                headers['User-Agent'] = next(self.ua)
                 
-            async with session.get(url, headers=headers, timeout=30) as response:
-                response.raise_for_status()
-                content = await response.text()
-                app_logger.debug(f"Successfully fetched (async): {url}")
-                return content
+            for attempt in range(_RETRY.total + 1):
+                async with session.get(url, headers=headers, timeout=_ASYNC_TIMEOUT) as response:
+                    if response.status in _RETRY.status_forcelist and attempt < _RETRY.total:
+                        delay = _RETRY.backoff_factor * (2 ** attempt)
+                        app_logger.debug(f"Got {response.status} for {url}, retrying in {delay}s")
+                    else:
+                        response.raise_for_status()
+                        content = await response.text()
+                        app_logger.debug(f"Successfully fetched (async): {url}")
+                        return content
+                        
+                await asyncio.sleep(delay)
                 
         except Exception as e:
             app_logger.error(f"Error fetching (async) {url}: {str(e)}")
             return None
             
     async def async_search_properties(self, filters: PropertySearchFilters, max_pages: Optional[int] = None) -> List[Property]:
-        """Async version of search_properties."""
+        """Async version of search_properties: listing and detail pages are fetched concurrently."""
+        if not self.supports_async:
+            # Parsers that fetch inside their parse methods run the blocking pipeline off the loop
+            return await asyncio.to_thread(lambda: list(self.search_properties(filters, max_pages)))
+            
         search_url = self.get_search_url(filters)
-        total_pages = self.get_total_pages(search_url)
+        total_pages = await asyncio.to_thread(self.get_total_pages, search_url)
         
         if max_pages:
             total_pages = min(total_pages, max_pages)
             
         app_logger.info(f"Starting async search on {self.name}, total pages: {total_pages}")
         
-        async with aiohttp.ClientSession() as session:
+        connector = aiohttp.TCPConnector(
+            limit=_ASYNC_CONNECTION_LIMIT,
+            limit_per_host=_ASYNC_CONCURRENCY,
+            ttl_dns_cache=_ASYNC_DNS_CACHE_TTL
+        )
+        semaphore = asyncio.Semaphore(_ASYNC_CONCURRENCY)
+        
+        async with aiohttp.ClientSession(connector=connector, headers=dict(self.session.headers)) as session:
             tasks = []
             
             for page in range(1, total_pages + 1):
                 page_url = f"{search_url}&page={page}" if '?' in search_url else f"{search_url}?page={page}"
-                task = self.async_process_page(session, page_url)
+                task = self.async_process_page(session, semaphore, page_url)
                 tasks.append(task)
                 
             results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -180,12 +319,28 @@ class BaseParser(ABC):
                     
             return properties
             
-    async def async_process_page(self, session: aiohttp.ClientSession, page_url: str) -> List[Property]:
-        """Process a single page asynchronously."""
-        content = await self.async_get_page(session, page_url)
+    async def async_process_page(
+        self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, page_url: str
+    ) -> List[Property]:
+        """Fetch a listing page, then all of its detail pages concurrently, and parse them."""
+        async def fetch(url: str) -> Optional[str]:
+            async with semaphore:
+                return await self.async_get_page(session, url)
+                
+        content = await fetch(page_url)
         if not content:
             return []
             
-        # This would need to be implemented in each specific parser
-        # For now, return empty list
-        return []
\ No newline at end of file
+        detail_urls = [link.url for link in self.parse_listing_html(page_url, content) if link.url]
+        detail_pages = await asyncio.gather(*(fetch(url) for url in detail_urls))
+        
+        # Parse once every detail page is in, so the page shares one timestamp like the sync path
+        page_properties = []
+        with batch_clock():
+            for url, html in zip(detail_urls, detail_pages):
+                if html:
+                    property_data = self.parse_property_html(url, html)
+                    if property_data:
+                        page_properties.append(property_data)
+                        
+        return page_properties
@@ -295,7 +295,6 @@ class MercadoLibreParser(BaseParser):
         
         # Build URL
         if params:
-            from urllib.parse import urlencode
             return f"{base_url}/_NoIndex_True?{urlencode(params)}"
         else:
             return f"{base_url}/_NoIndex_True"
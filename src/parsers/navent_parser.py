@@ -1,9 +1,9 @@
 import re
-import json
 from typing import List, Dict, Any, Optional
 from urllib.parse import urlencode, urlparse, parse_qs
 from datetime import datetime
 
+import orjson
 from bs4 import BeautifulSoup
 from .base_parser import BaseParser
 from ..models import (
@@ -303,13 +303,16 @@ class NaventParser(BaseParser):
             # Alternative: look for JSON data with pagination info
             script_tags = soup.find_all('script', type='application/json')
             for script in script_tags:
+                # orjson only takes an exact str, not bs4's NavigableString subclass
+                if script.string is None:
+                    continue
                 try:
-                    data = json.loads(script.string)
+                    data = orjson.loads(str(script.string))
                     if 'pagination' in data:
                         return data['pagination'].get('totalPages', 1)
                     if 'totalPages' in data:
                         return data['totalPages']
-                except (json.JSONDecodeError, AttributeError):
+                except (orjson.JSONDecodeError, AttributeError):
                     continue
             
             # Look for results count
@@ -359,8 +362,11 @@ class NaventParser(BaseParser):
             # Look for coordinates in JSON data
             scripts = soup.find_all('script', type='application/json')
             for script in scripts:
+                # orjson only takes an exact str, not bs4's NavigableString subclass
+                if script.string is None:
+                    continue
                 try:
-                    data = json.loads(script.string)
+                    data = orjson.loads(str(script.string))
                     if 'latitude' in data and 'longitude' in data:
                         location.latitude = float(data['latitude'])
                         location.longitude = float(data['longitude'])
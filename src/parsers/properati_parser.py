@@ -1,9 +1,9 @@
 import re
-import json
 from typing import List, Dict, Any, Optional
 from urllib.parse import urlencode, urlparse, parse_qs
 from datetime import datetime
 
+import orjson
 from bs4 import BeautifulSoup
 from .base_parser import BaseParser
 from ..models import (
@@ -337,8 +337,11 @@ class ProperatiParser(BaseParser):
             # Look for coordinates in JSON-LD or script tags
             scripts = soup.find_all('script', type='application/ld+json')
             for script in scripts:
+                # orjson only takes an exact str, not bs4's NavigableString subclass
+                if script.string is None:
+                    continue
                 try:
-                    data = json.loads(script.string)
+                    data = orjson.loads(str(script.string))
                     if 'geo' in data:
                         location.latitude = float(data['geo']['latitude'])
                         location.longitude = float(data['geo']['longitude'])
@@ -1,20 +1,36 @@
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Optional, Union
 from urllib.parse import urlencode, urlparse, parse_qs
 from datetime import datetime
 
-from .base_parser import BaseParser
+from .base_parser import BaseParser, class_strainer
 from ..models import (
     Property, PropertyType, OperationType, Currency, PropertyStatus,
     Location, PropertyFeatures, PropertyPrice, PropertyContact, 
-    PropertyImages, PropertySearchFilters
+    PropertyImages, PropertySearchFilters, ListingStub
 )
 from ..utils import app_logger
 
+# Search URL slug per property type
+_PROPERTY_TYPE_SLUGS = {
+    PropertyType.APARTMENT: 'departamento',
+    PropertyType.HOUSE: 'casa',
+    PropertyType.COMMERCIAL: 'local',
+    PropertyType.LAND: 'terreno',
+    PropertyType.OFFICE: 'oficina'
+}
+
+# Listing and pagination lookups only read these subtrees; the rest of the page is
+# never turned into tags
+_LISTING_CARDS = class_strainer('div', 'posting-card')
+_PAGINATION = class_strainer('div', 'pagination')
+
 
 class ZonaPropParser(BaseParser):
     """Parser for ZonaProp.com.ar"""
     
+    supports_async = True
+    
     def __init__(self):
         super().__init__("https://www.zonaprop.com.ar", "ZonaProp")
         
@@ -31,15 +47,8 @@ class ZonaPropParser(BaseParser):
                 
         # Property type mapping
         if filters.property_type:
-            type_mapping = {
-                PropertyType.APARTMENT: 'departamento',
-                PropertyType.HOUSE: 'casa',
-                PropertyType.COMMERCIAL: 'local',
-                PropertyType.LAND: 'terreno',
-                PropertyType.OFFICE: 'oficina'
-            }
-            if filters.property_type in type_mapping:
-                params['tipo_propiedad'] = type_mapping[filters.property_type]
+            if filters.property_type in _PROPERTY_TYPE_SLUGS:
+                params['tipo_propiedad'] = _PROPERTY_TYPE_SLUGS[filters.property_type]
                 
         # Price range
         if filters.min_price:
@@ -82,13 +91,17 @@ class ZonaPropParser(BaseParser):
             return f"{base_url}?{urlencode(params)}"
         return base_url
         
-    def parse_listing_page(self, url: str) -> List[Dict[str, Any]]:
+    def parse_listing_page(self, url: str) -> List[ListingStub]:
         """Parse ZonaProp listing page and extract property links."""
         response = self.get_page(url)
         if not response:
             return []
             
-        soup = self.parse_html(response.text)
+        return self.parse_listing_html(url, response.text)
+        
+    def parse_listing_html(self, url: str, html: Union[str, bytes], encoding: Optional[str] = None) -> List[ListingStub]:
+        """Extract property links from a fetched ZonaProp listing page."""
+        soup = self.parse_html(html, _LISTING_CARDS, encoding)
         properties = []
         
         # Find property cards
@@ -114,12 +127,12 @@ class ZonaPropParser(BaseParser):
                 location_elem = card.find('span', class_='posting-card-location')
                 location_text = location_elem.get_text() if location_elem else ""
                 
-                properties.append({
-                    'url': property_url,
-                    'title': title,
-                    'price_text': price_text,
-                    'location_text': location_text
-                })
+                properties.append(ListingStub(
+                    url=property_url,
+                    title=title,
+                    price_text=price_text,
+                    location_text=location_text
+                ))
                 
             except Exception as e:
                 app_logger.warning(f"Error parsing property card: {e}")
@@ -134,7 +147,11 @@ class ZonaPropParser(BaseParser):
         if not response:
             return None
             
-        soup = self.parse_html(response.text)
+        return self.parse_property_html(url, response.text)
+        
+    def parse_property_html(self, url: str, html: Union[str, bytes], encoding: Optional[str] = None) -> Optional[Property]:
+        """Parse a fetched ZonaProp property detail page."""
+        soup = self.parse_html(html, encoding=encoding)
         
         try:
             # Extract basic information
@@ -199,7 +216,7 @@ class ZonaPropParser(BaseParser):
         if not response:
             return 1
             
-        soup = self.parse_html(response.text)
+        soup = self.parse_html(response.text, _PAGINATION)
         
         # Look for pagination
         pagination = soup.find('div', class_='pagination')
@@ -257,7 +274,7 @@ class ZonaPropParser(BaseParser):
         location_elem = soup.find('div', class_='posting-location')
         if location_elem:
             location_text = self.clean_text(location_elem.get_text())
-            location_parts = [part.strip() for part in location_text.split(',')]
+            location_parts = [self.intern_text(part.strip()) for part in location_text.split(',')]
             
             if len(location_parts) >= 1:
                 location.neighborhood = location_parts[0]
@@ -357,12 +374,12 @@ class ZonaPropParser(BaseParser):
             # Agency name
             agency_elem = contact_section.find('span', class_='agency-name')
             if agency_elem:
-                contact.agency_name = self.clean_text(agency_elem.get_text())
+                contact.agency_name = self.intern_text(self.clean_text(agency_elem.get_text()))
                 
             # Agent name
             agent_elem = contact_section.find('span', class_='agent-name')
             if agent_elem:
-                contact.agent_name = self.clean_text(agent_elem.get_text())
+                contact.agent_name = self.intern_text(self.clean_text(agent_elem.get_text()))
                 
             # Phone
             phone_elem = contact_section.find('a', href=re.compile(r'tel:'))
@@ -1,7 +1,10 @@
 from .property_service import PropertyService
 from .scraping_service import ScrapingService
+from .view_recorder import PropertyViewRecorder, view_recorder
 
 __all__ = [
     "PropertyService",
-    "ScrapingService"
+    "ScrapingService",
+    "PropertyViewRecorder",
+    "view_recorder"
 ]
\ No newline at end of file
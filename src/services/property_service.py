@@ -1,16 +1,94 @@
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, asc
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+from sqlalchemy.orm import Session, defer
+from sqlalchemy import and_, or_, desc, asc, cast, func, insert, literal_column, select, Text
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from datetime import datetime, timedelta
+from enum import Enum
 
-from ..database.models import PropertyDB, PropertyHistory, PropertyView
+from ..database import db_manager, queries
+from ..database.models import PropertyDB, PropertyHistory
 from ..models import Property, PropertySearchFilters, PropertyUpdate
-from ..utils import app_logger
+from ..utils import app_logger, stats_cache
+from .view_recorder import view_recorder
+
+
+def property_to_row(property_data: Property) -> Dict[str, Any]:
+    """Flatten a Property model into PropertyDB column values."""
+    return {
+        "external_id": property_data.external_id,
+        "source_url": property_data.source_url,
+        "source_website": property_data.source_website,
+        "title": property_data.title,
+        "description": property_data.description,
+        "property_type": property_data.property_type,
+        "operation_type": property_data.operation_type,
+        "status": property_data.status,
+
+        # Location
+        "country": property_data.location.country,
+        "province": property_data.location.province,
+        "city": property_data.location.city,
+        "neighborhood": property_data.location.neighborhood,
+        "address": property_data.location.address,
+        "latitude": property_data.location.latitude,
+        "longitude": property_data.location.longitude,
+        "postal_code": property_data.location.postal_code,
+
+        # Features
+        "bedrooms": property_data.features.bedrooms,
+        "bathrooms": property_data.features.bathrooms,
+        "parking_spaces": property_data.features.parking_spaces,
+        "total_area": property_data.features.total_area,
+        "covered_area": property_data.features.covered_area,
+        "floor": property_data.features.floor,
+        "total_floors": property_data.features.total_floors,
+        "age": property_data.features.age,
+        "amenities": property_data.features.amenities,
+        "condition": property_data.features.condition,
+
+        # Pricing
+        "price_amount": property_data.price.amount,
+        "price_currency": property_data.price.currency,
+        "price_per_sqm": property_data.price.price_per_sqm,
+        "expenses": property_data.price.expenses,
+        "expenses_currency": property_data.price.expenses_currency,
+
+        # Contact
+        "agent_name": property_data.contact.agent_name,
+        "agency_name": property_data.contact.agency_name,
+        "phone": property_data.contact.phone,
+        "email": property_data.contact.email,
+        "website": property_data.contact.website,
+
+        # Media
+        "main_image": property_data.images.main_image,
+        "gallery": property_data.images.gallery,
+        "floor_plan": property_data.images.floor_plan,
+        "virtual_tour": property_data.images.virtual_tour,
+
+        # Metadata
+        "first_seen": property_data.first_seen,
+        "last_updated": property_data.last_updated,
+        "last_checked": property_data.last_checked,
+        "is_featured": property_data.is_featured,
+        "is_verified": property_data.is_verified,
+        "raw_data": property_data.raw_data
+    }
+
+
+def history_text(value: Any) -> Optional[str]:
+    """Text stored for a history value; enums by value, so ORM members and scraped strings match."""
+    if value is None:
+        return None
+    return str(value.value if isinstance(value, Enum) else value)
 
 
 class PropertyService:
     """Service for property-related operations."""
     
+    # Scraped changes of these fields are kept in the property history
+    HISTORY_FIELDS = ("price_amount", "price_currency", "status")
+    
     def __init__(self, db: Session):
         self.db = db
         
@@ -24,70 +102,12 @@ class PropertyService:
                 return existing
                 
             # Convert Pydantic model to SQLAlchemy model
-            db_property = PropertyDB(
-                external_id=property_data.external_id,
-                source_url=property_data.source_url,
-                source_website=property_data.source_website,
-                title=property_data.title,
-                description=property_data.description,
-                property_type=property_data.property_type,
-                operation_type=property_data.operation_type,
-                status=property_data.status,
-                
-                # Location
-                country=property_data.location.country,
-                province=property_data.location.province,
-                city=property_data.location.city,
-                neighborhood=property_data.location.neighborhood,
-                address=property_data.location.address,
-                latitude=property_data.location.latitude,
-                longitude=property_data.location.longitude,
-                postal_code=property_data.location.postal_code,
-                
-                # Features
-                bedrooms=property_data.features.bedrooms,
-                bathrooms=property_data.features.bathrooms,
-                parking_spaces=property_data.features.parking_spaces,
-                total_area=property_data.features.total_area,
-                covered_area=property_data.features.covered_area,
-                floor=property_data.features.floor,
-                total_floors=property_data.features.total_floors,
-                age=property_data.features.age,
-                amenities=property_data.features.amenities,
-                condition=property_data.features.condition,
-                
-                # Pricing
-                price_amount=property_data.price.amount,
-                price_currency=property_data.price.currency,
-                price_per_sqm=property_data.price.price_per_sqm,
-                expenses=property_data.price.expenses,
-                expenses_currency=property_data.price.expenses_currency,
-                
-                # Contact
-                agent_name=property_data.contact.agent_name,
-                agency_name=property_data.contact.agency_name,
-                phone=property_data.contact.phone,
-                email=property_data.contact.email,
-                website=property_data.contact.website,
-                
-                # Media
-                main_image=property_data.images.main_image,
-                gallery=property_data.images.gallery,
-                floor_plan=property_data.images.floor_plan,
-                virtual_tour=property_data.images.virtual_tour,
-                
-                # Metadata
-                first_seen=property_data.first_seen,
-                last_updated=property_data.last_updated,
-                last_checked=property_data.last_checked,
-                is_featured=property_data.is_featured,
-                is_verified=property_data.is_verified,
-                raw_data=property_data.raw_data
-            )
+            db_property = PropertyDB(**property_to_row(property_data))
             
             self.db.add(db_property)
             self.db.commit()
             self.db.refresh(db_property)
+            stats_cache.invalidate()
             
             app_logger.info(f"Created new property: {db_property.id} - {db_property.title}")
             return db_property
@@ -97,10 +117,106 @@ class PropertyService:
             app_logger.error(f"Error creating property: {e}")
             raise
             
+    def save_scraped_properties(self, properties: List[Property]) -> Tuple[int, int, int]:
+        """Save a batch of scraped properties and return (new, updated, failed) counts."""
+        if not properties:
+            return 0, 0, 0
+            
+        # Later duplicates within a batch win, as they would with one upsert per row
+        rows = list({prop.source_url: property_to_row(prop) for prop in properties}.values())
+        
+        try:
+            created, updated, changes = self._save_property_rows(rows)
+            self.db.commit()
+            stats_cache.invalidate()
+            self.record_property_changes(changes)
+            return created, updated, 0
+            
+        except Exception as e:
+            self.db.rollback()
+            app_logger.warning(f"Saving {len(rows)} scraped properties failed, retrying one by one: {e}")
+            
+        # Only the rows that fail on their own are lost
+        created = updated = failed = 0
+        changes = []
+        for row in rows:
+            try:
+                row_created, row_updated, row_changes = self._save_property_rows([row])
+                self.db.commit()
+            except Exception as e:
+                self.db.rollback()
+                failed += 1
+                app_logger.error(f"Error saving scraped property {row['source_url']}: {e}")
+                continue
+            created += row_created
+            updated += row_updated
+            changes.extend(row_changes)
+            
+        stats_cache.invalidate()
+        self.record_property_changes(changes)
+        return created, updated, failed
+        
+    def _save_property_rows(self, rows: List[Dict[str, Any]]) -> Tuple[int, int, List[Tuple[int, str, Any, Any]]]:
+        """Insert new scraped rows and refresh the stored ones that changed; the caller commits."""
+        stored_ids = self._stored_property_ids(rows)
+        
+        new_rows = []
+        known_rows = {}
+        seen_listings = {}
+        for row, property_id in zip(rows, stored_ids):
+            listing_key = (row["source_website"], row["external_id"]) if row["external_id"] else None
+            if property_id is None and listing_key in seen_listings:
+                # Same listing as an earlier new row of this batch under another URL; the later one wins
+                new_rows[seen_listings[listing_key]] = row
+            elif property_id is None:
+                if listing_key:
+                    seen_listings[listing_key] = len(new_rows)
+                new_rows.append(row)
+            else:
+                known_rows[property_id] = row
+                
+        # Unchanged listings are left alone, so last_updated only moves on a real change
+        changed = db_manager.changed_listings(known_rows, session=self.db)
+        changes = [
+            (property_id, field_name, stored[field_name], row[field_name])
+            for property_id, (stored, row) in changed.items()
+            for field_name in self.HISTORY_FIELDS
+            if stored[field_name] != row[field_name]
+        ]
+        
+        db_manager.bulk_upsert_properties(new_rows, session=self.db)
+        db_manager.bulk_refresh_properties({property_id: row for property_id, (_, row) in changed.items()}, session=self.db)
+        return len(new_rows), len(changed), changes
+        
+    def _stored_property_ids(self, rows: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """Stored property id for each row, matched by external ID on its website first and then by URL."""
+        listing_keys = {(row["source_website"], row["external_id"]) for row in rows if row["external_id"]}
+        condition = PropertyDB.source_url.in_([row["source_url"] for row in rows])
+        if listing_keys:
+            condition = or_(condition, and_(
+                PropertyDB.external_id.in_({external_id for _, external_id in listing_keys}),
+                PropertyDB.source_website.in_({website for website, _ in listing_keys})
+            ))
+            
+        by_url = {}
+        by_listing = {}
+        for property_id, source_url, source_website, external_id in self.db.execute(
+            select(PropertyDB.id, PropertyDB.source_url, PropertyDB.source_website, PropertyDB.external_id)
+            .where(condition)
+        ):
+            by_url[source_url] = property_id
+            if external_id:
+                by_listing[(source_website, external_id)] = property_id
+                
+        return [
+            by_listing.get((row["source_website"], row["external_id"])) or by_url.get(row["source_url"])
+            for row in rows
+        ]
+        
     def update_property(self, property_id: int, update_data: PropertyUpdate) -> Optional[PropertyDB]:
         """Update an existing property."""
         try:
-            db_property = self.db.query(PropertyDB).filter(PropertyDB.id == property_id).first()
+            db_property = self.db.get(PropertyDB, property_id)
             if not db_property:
                 return None
                 
@@ -134,10 +250,10 @@ class PropertyService:
             db_property.last_checked = datetime.utcnow()
             
             self.db.commit()
+            stats_cache.invalidate()
             
             # Record changes in history
-            for field_name, old_value, new_value in changes:
-                self.record_property_change(db_property.id, field_name, old_value, new_value)
+            self.record_property_changes([(db_property.id, *change) for change in changes])
                 
             app_logger.info(f"Updated property: {property_id} - {len(changes)} changes")
             return db_property
@@ -149,11 +265,29 @@ class PropertyService:
             
     def get_property_by_id(self, property_id: int) -> Optional[PropertyDB]:
         """Get property by ID."""
-        return self.db.query(PropertyDB).filter(PropertyDB.id == property_id).first()
+        return self.db.get(PropertyDB, property_id)
+        
+    def get_properties_by_ids(self, property_ids: List[int]) -> List[PropertyDB]:
+        """Get several properties by ID with a single query."""
+        if not property_ids:
+            return []
+        return self.db.query(PropertyDB).filter(PropertyDB.id.in_(property_ids)).all()
+        
+    def get_market_insight_rows(self, limit: int) -> List[Any]:
+        """Latest properties as plain rows holding only the columns market insights need."""
+        return PropertyDB.select_for_insights(self.db, limit)
+        
+    def get_properties(self, skip: int = 0, limit: int = 100) -> List[PropertyDB]:
+        """Get properties ordered by last update."""
+        return queries.list_properties(self.db, skip, limit)
+        
+    def get_active_properties(self, limit: int = 100) -> List[PropertyDB]:
+        """Get active properties ordered by last update."""
+        return queries.list_active_properties(self.db, limit)
         
     def get_property_by_url(self, source_url: str) -> Optional[PropertyDB]:
         """Get property by source URL."""
-        return self.db.query(PropertyDB).filter(PropertyDB.source_url == source_url).first()
+        return queries.find_property_by_url(self.db, source_url)
         
     def get_property_by_external_id(self, external_id: str, source_website: str) -> Optional[PropertyDB]:
         """Get property by external ID and source website."""
@@ -164,10 +298,8 @@ class PropertyService:
             )
         ).first()
         
-    def search_properties(self, filters: PropertySearchFilters, skip: int = 0, limit: int = 100) -> List[PropertyDB]:
-        """Search properties with filters."""
-        query = self.db.query(PropertyDB)
-        
+    def _apply_search_filters(self, query, filters: PropertySearchFilters):
+        """Apply search filters to an ORM query or a select() statement."""
         # Apply filters
         if filters.property_type:
             query = query.filter(PropertyDB.property_type == filters.property_type)
@@ -211,60 +343,182 @@ class PropertyService:
         if filters.neighborhood:
             query = query.filter(PropertyDB.neighborhood.ilike(f"%{filters.neighborhood}%"))
             
+        return query
+        
+    def search_properties(self, filters: PropertySearchFilters, skip: int = 0, limit: int = 100) -> List[PropertyDB]:
+        """Search properties with filters."""
+        # Search results never include raw_data, the widest column
+        query = self._apply_search_filters(
+            self.db.query(PropertyDB).options(defer(PropertyDB.raw_data)), filters
+        )
+        
         # Order by last updated
         query = query.order_by(desc(PropertyDB.last_updated))
         
         return query.offset(skip).limit(limit).all()
         
+    def iter_search_properties(self, filters: PropertySearchFilters, skip: int = 0, limit: int = 1000,
+                               batch_size: int = 200) -> Iterator[PropertyDB]:
+        """Search properties with filters, fetching rows from the cursor in batches."""
+        stmt = self._apply_search_filters(
+            select(PropertyDB).options(defer(PropertyDB.raw_data)), filters
+        ).order_by(
+            desc(PropertyDB.last_updated)
+        ).offset(skip).limit(limit)
+        
+        yield from db_manager.stream(stmt, self.db, batch_size)
+        
+    @property
+    def is_postgresql(self) -> bool:
+        """Whether the session is bound to a PostgreSQL database."""
+        return self.db.get_bind().dialect.name == "postgresql"
+        
+    def search_properties_json(self, filters: PropertySearchFilters, skip: int = 0,
+                               limit: int = 100) -> Tuple[str, int]:
+        """Search properties and let PostgreSQL build the JSON array (PostgreSQL only)."""
+        page = self._apply_search_filters(select(PropertyDB), filters).order_by(
+            desc(PropertyDB.last_updated)
+        ).offset(skip).limit(limit).subquery()
+        c = page.c
+        
+        # Enum columns store small integer codes; the API exposes the Enum values
+        def enum_value(column):
+            return column.type.value_expression(column)
+            
+        row = func.jsonb_build_object(
+            'id', c.id,
+            'external_id', c.external_id,
+            'source_url', c.source_url,
+            'source_website', c.source_website,
+            'title', c.title,
+            'description', c.description,
+            'property_type', enum_value(c.property_type),
+            'operation_type', enum_value(c.operation_type),
+            'status', enum_value(c.status),
+            'location', func.jsonb_build_object(
+                'country', c.country,
+                'province', c.province,
+                'city', c.city,
+                'neighborhood', c.neighborhood,
+                'address', c.address,
+                'latitude', c.latitude,
+                'longitude', c.longitude,
+                'postal_code', c.postal_code
+            ),
+            'features', func.jsonb_build_object(
+                'bedrooms', c.bedrooms,
+                'bathrooms', c.bathrooms,
+                'parking_spaces', c.parking_spaces,
+                'total_area', c.total_area,
+                'covered_area', c.covered_area,
+                'floor', c.floor,
+                'total_floors', c.total_floors,
+                'age', c.age,
+                'amenities', c.amenities,
+                'condition', c.condition
+            ),
+            'price', func.jsonb_build_object(
+                'amount', c.price_amount,
+                'currency', enum_value(c.price_currency),
+                'price_per_sqm', c.price_per_sqm,
+                'expenses', c.expenses,
+                'expenses_currency', enum_value(c.expenses_currency)
+            ),
+            'contact', func.jsonb_build_object(
+                'agent_name', c.agent_name,
+                'agency_name', c.agency_name,
+                'phone', c.phone,
+                'email', c.email,
+                'website', c.website
+            ),
+            'images', func.jsonb_build_object(
+                'main_image', c.main_image,
+                'gallery', c.gallery,
+                'floor_plan', c.floor_plan,
+                'virtual_tour', c.virtual_tour
+            ),
+            'metadata', func.jsonb_build_object(
+                'first_seen', c.first_seen,
+                'last_updated', c.last_updated,
+                'last_checked', c.last_checked,
+                'is_featured', c.is_featured,
+                'is_verified', c.is_verified
+            )
+        )
+        
+        stmt = select(
+            cast(func.coalesce(
+                func.jsonb_agg(aggregate_order_by(row, c.last_updated.desc())),
+                literal_column("'[]'::jsonb")
+            ), Text),
+            func.count()
+        ).select_from(page)
+        
+        properties_json, count = self.db.execute(stmt).one()
+        return properties_json, count
+        
     def get_recent_properties(self, hours: int = 24, limit: int = 50) -> List[PropertyDB]:
-        """Get recently added properties."""
+        """Get recently added properties, loading only the summary columns."""
         since = datetime.utcnow() - timedelta(hours=hours)
-        return self.db.query(PropertyDB).filter(
-            PropertyDB.first_seen >= since
-        ).order_by(desc(PropertyDB.first_seen)).limit(limit).all()
+        return queries.list_recent_properties(self.db, since, limit)
         
     def get_updated_properties(self, hours: int = 24, limit: int = 50) -> List[PropertyDB]:
-        """Get recently updated properties."""
+        """Get recently updated properties, loading only the summary columns."""
         since = datetime.utcnow() - timedelta(hours=hours)
-        return self.db.query(PropertyDB).filter(
-            PropertyDB.last_updated >= since
-        ).order_by(desc(PropertyDB.last_updated)).limit(limit).all()
+        return queries.list_updated_properties(self.db, since, limit)
+        
+    def iter_property_history(self, property_id: int, since: Optional[datetime] = None) -> Iterator[PropertyHistory]:
+        """Stream a property's change history in order, without loading the whole trail."""
+        stmt = select(PropertyHistory).where(PropertyHistory.property_id == property_id)
+        if since is not None:
+            stmt = stmt.where(PropertyHistory.changed_at >= since)
+            
+        yield from db_manager.stream(stmt.order_by(PropertyHistory.changed_at), self.db)
         
     def record_property_change(self, property_id: int, field_name: str, old_value: Any, new_value: Any):
         """Record a property change in history."""
-        try:
-            history_entry = PropertyHistory(
-                property_id=property_id,
-                field_name=field_name,
-                old_value=str(old_value) if old_value is not None else None,
-                new_value=str(new_value) if new_value is not None else None,
-                changed_at=datetime.utcnow()
-            )
+        self.record_property_changes([(property_id, field_name, old_value, new_value)])
+        
+    def record_property_changes(self, changes: List[Tuple[int, str, Any, Any]]):
+        """Record several (property_id, field_name, old_value, new_value) changes in history with one executemany."""
+        if not changes:
+            return
             
-            self.db.add(history_entry)
+        try:
+            changed_at = datetime.utcnow()
+            self.db.execute(insert(PropertyHistory), [
+                {
+                    "property_id": property_id,
+                    "field_name": field_name,
+                    "old_value": history_text(old_value),
+                    "new_value": history_text(new_value),
+                    "changed_at": changed_at
+                }
+                for property_id, field_name, old_value, new_value in changes
+            ])
             self.db.commit()
             
         except Exception as e:
-            app_logger.error(f"Error recording property change: {e}")
+            self.db.rollback()
+            app_logger.error(f"Error recording property changes: {e}")
             
-    def record_property_view(self, property_id: int, ip_address: str = None, user_agent: str = None):
-        """Record a property view."""
+    def record_property_view(self, property_id: int, ip_address: str = None, user_agent: str = None,
+                             property_obj: PropertyDB = None):
+        """Queue a property view for batched insert; pass property_obj if already loaded to skip the lookup."""
         try:
-            property_obj = self.get_property_by_id(property_id)
+            if property_obj is None:
+                property_obj = self.get_property_by_id(property_id)
             if not property_obj:
                 return
                 
-            view_entry = PropertyView(
-                property_id=property_id,
-                external_id=property_obj.external_id,
-                source_website=property_obj.source_website,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                viewed_at=datetime.utcnow()
-            )
-            
-            self.db.add(view_entry)
-            self.db.commit()
+            view_recorder.record({
+                "property_id": property_id,
+                "external_id": property_obj.external_id,
+                "source_website": property_obj.source_website,
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "viewed_at": datetime.utcnow()
+            })
             
         except Exception as e:
             app_logger.error(f"Error recording property view: {e}")
@@ -3,24 +3,34 @@ from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 
-from ..parsers import (
-    ZonaPropParser, ArgenPropParser, MercadoLibreParser, 
-    RemaxParser, ProperatiParser, Inmuebles24Parser, NaventParser
-)
 from ..database.models import ScrapingSession
 from ..models import PropertySearchFilters
 from .property_service import PropertyService
-from ..utils import app_logger, settings
+from ..utils import app_logger, settings, stats_cache
 
 
 class ScrapingService:
     """Service for managing scraping operations."""
     
+    # Scraped properties are written with one upsert per batch
+    SAVE_BATCH_SIZE = 100
+    
     def __init__(self, db: Session):
         self.db = db
         self.property_service = PropertyService(db)
-        self.parsers = {
+        
+    @cached_property
+    def parsers(self) -> Dict[str, Any]:
+        """Website parsers, built on first use since read-only endpoints never need them."""
+        # Imported here so the scraping stack only loads when a parser is needed
+        from ..parsers import (
+            ZonaPropParser, ArgenPropParser, MercadoLibreParser,
+            RemaxParser, ProperatiParser, Inmuebles24Parser, NaventParser
+        )
+        
+        return {
             'zonaprop.com.ar': ZonaPropParser(),
             'argenprop.com': ArgenPropParser(),
             'mercadolibre.com.ar': MercadoLibreParser(),
@@ -37,12 +47,13 @@ class ScrapingService:
                 website=website,
                 started_at=datetime.utcnow(),
                 status='running',
-                filters=filters.dict() if filters else {}
+                filters=filters.as_dict if filters else {}
             )
             
             self.db.add(session)
             self.db.commit()
             self.db.refresh(session)
+            stats_cache.invalidate()
             
             app_logger.info(f"Started scraping session {session.id} for {website}")
             return session
@@ -54,7 +65,7 @@ class ScrapingService:
     def finish_scraping_session(self, session_id: int, status: str = 'completed', error_log: str = None):
         """Finish a scraping session."""
         try:
-            session = self.db.query(ScrapingSession).filter(ScrapingSession.id == session_id).first()
+            session = self.db.get(ScrapingSession, session_id)
             if session:
                 session.finished_at = datetime.utcnow()
                 session.status = status
@@ -62,6 +73,7 @@ class ScrapingService:
                     session.error_log = error_log
                     
                 self.db.commit()
+                stats_cache.invalidate()
                 app_logger.info(f"Finished scraping session {session_id} with status: {status}")
                 
         except Exception as e:
@@ -72,7 +84,7 @@ class ScrapingService:
                                 updated_properties: int = None, errors: int = None):
         """Update scraping session progress."""
         try:
-            session = self.db.query(ScrapingSession).filter(ScrapingSession.id == session_id).first()
+            session = self.db.get(ScrapingSession, session_id)
             if session:
                 if processed_pages is not None:
                     session.processed_pages = processed_pages
@@ -106,7 +118,7 @@ class ScrapingService:
             if not filters:
                 filters = PropertySearchFilters()
                 
-            app_logger.info(f"Starting scraping for {website} with filters: {filters.dict()}")
+            app_logger.info(f"Starting scraping for {website} with filters: {filters.as_dict}")
             
             # Get total pages
             search_url = parser.get_search_url(filters)
@@ -124,43 +136,44 @@ class ScrapingService:
             error_count = 0
             processed_pages = 0
             
-            for property_data in parser.search_properties(filters, max_pages):
+            batch = []
+            
+            def save_batch():
+                """Upsert the pending properties and report progress."""
+                nonlocal new_count, updated_count, error_count
                 try:
-                    # Check if property already exists
-                    existing = None
-                    if property_data.external_id:
-                        existing = self.property_service.get_property_by_external_id(
-                            property_data.external_id, website
-                        )
-                    
-                    if not existing:
-                        existing = self.property_service.get_property_by_url(property_data.source_url)
-                    
-                    if existing:
-                        # Update existing property
-                        # Here you would implement update logic
-                        updated_count += 1
-                        app_logger.debug(f"Updated existing property: {existing.id}")
-                    else:
-                        # Create new property
-                        self.property_service.create_property(property_data)
-                        new_count += 1
-                        app_logger.debug(f"Created new property: {property_data.title}")
-                        
+                    created, updated, failed = self.property_service.save_scraped_properties(batch)
+                    new_count += created
+                    updated_count += updated
+                    error_count += failed
+                    app_logger.debug(f"Saved {len(batch)} properties: {created} new, {updated} updated, {failed} failed")
                 except Exception as e:
-                    error_count += 1
-                    app_logger.error(f"Error processing property: {e}")
-                    
-                # Update progress periodically
-                if (new_count + updated_count + error_count) % 10 == 0:
-                    self.update_scraping_progress(
-                        session.id,
-                        total_properties=new_count + updated_count,
-                        new_properties=new_count,
-                        updated_properties=updated_count,
-                        errors=error_count
-                    )
+                    error_count += len(batch)
+                    app_logger.error(f"Error processing properties: {e}")
+                batch.clear()
+                
+                self.update_scraping_progress(
+                    session.id,
+                    total_properties=new_count + updated_count,
+                    new_properties=new_count,
+                    updated_properties=updated_count,
+                    errors=error_count
+                )
+                
+            if parser.supports_async:
+                # Listing and detail pages are fetched concurrently; properties arrive once every page is in
+                scraped = asyncio.run(parser.async_search_properties(filters, max_pages))
+            else:
+                scraped = parser.search_properties(filters, max_pages)
+                
+            for property_data in scraped:
+                batch.append(property_data)
+                if len(batch) >= self.SAVE_BATCH_SIZE:
+                    save_batch()
                     
+            if batch:
+                save_batch()
+                
             # Final update
             self.update_scraping_progress(
                 session.id,
@@ -253,6 +266,10 @@ class ScrapingService:
                     
             return processed_results
             
+    def get_scraping_session(self, session_id: int) -> Optional[ScrapingSession]:
+        """Get a scraping session by ID."""
+        return self.db.get(ScrapingSession, session_id)
+        
     def get_scraping_sessions(self, website: str = None, limit: int = 50) -> List[ScrapingSession]:
         """Get scraping sessions."""
         query = self.db.query(ScrapingSession)
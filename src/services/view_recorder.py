@@ -0,0 +1,73 @@
+import asyncio
+import queue
+from typing import Any, Dict, List, Optional
+
+from ..database import db_manager
+from ..database.models import PropertyView
+from ..utils import app_logger, settings
+
+
+class PropertyViewRecorder:
+    """Buffers property views in memory and writes them to the database in batches."""
+    
+    def __init__(self, maxsize: int = 10000, batch_size: int = 500):
+        # queue.Queue rather than asyncio.Queue: views are recorded from threadpool handlers
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=maxsize)
+        self.batch_size = batch_size
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._batch_ready: Optional[asyncio.Event] = None
+    
+    def record(self, view: Dict[str, Any]):
+        """Queue a property_views row; written immediately when no flusher is running."""
+        if self._loop is None:
+            self._write([view])
+            return
+        
+        try:
+            self._queue.put_nowait(view)
+        except queue.Full:
+            app_logger.warning("Property view buffer is full, dropping view")
+            return
+        
+        if self._queue.qsize() >= self.batch_size:
+            self._loop.call_soon_threadsafe(self._batch_ready.set)
+    
+    def flush(self) -> int:
+        """Write every queued view in one batch and return how many were written."""
+        views = []
+        while True:
+            try:
+                views.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        if views:
+            self._write(views)
+        return len(views)
+    
+    def _write(self, views: List[Dict[str, Any]]):
+        """Insert view rows with a single executemany."""
+        try:
+            with db_manager.get_session() as session:
+                session.bulk_insert_mappings(PropertyView, views)
+        except Exception as e:
+            app_logger.error(f"Error recording {len(views)} property views: {e}")
+    
+    async def run(self, interval: float):
+        """Flush every interval seconds, or sooner once a full batch is queued."""
+        self._loop = asyncio.get_running_loop()
+        self._batch_ready = asyncio.Event()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), timeout=interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._batch_ready.clear()
+                await asyncio.to_thread(self.flush)
+        finally:
+            self._loop = None
+
+
+# Global recorder shared by all requests in this process
+view_recorder = PropertyViewRecorder(settings.view_buffer_size, settings.view_batch_size)
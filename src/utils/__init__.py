@@ -1,4 +1,5 @@
 from .config import settings
 from .logger import app_logger
+from .cache import LRUCache, SQLiteCache, TTLCache, stats_cache
 
-__all__ = ["settings", "app_logger"]
\ No newline at end of file
+__all__ = ["settings", "app_logger", "LRUCache", "SQLiteCache", "TTLCache", "stats_cache"]
\ No newline at end of file
@@ -0,0 +1,159 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class TTLCache:
+    """Small in-process cache whose entries expire after a fixed number of seconds."""
+    
+    def __init__(self):
+        self._entries: Dict[str, Tuple[int, float, Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._version = 0
+        
+    def _get_fresh(self, key: str) -> Tuple[bool, Any]:
+        """Return (hit, value) for a non-expired entry of the current version."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        version, expires_at, value = entry
+        if version != self._version or expires_at <= time.monotonic():
+            return False, None
+        return True, value
+        
+    def _lock_for(self, key: str) -> threading.Lock:
+        """Get the lock serializing recomputation of a single key."""
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+            
+    def get_or_set(self, key: str, ttl: float, factory: Callable[[], Any]) -> Any:
+        """Return the cached value for key, calling factory once to refresh it when stale."""
+        hit, value = self._get_fresh(key)
+        if hit:
+            return value
+            
+        # Only one caller recomputes a key; the others wait and reuse its result
+        with self._lock_for(key):
+            hit, value = self._get_fresh(key)
+            if hit:
+                return value
+                
+            version = self._version
+            value = factory()
+            self._entries[key] = (version, time.monotonic() + ttl, value)
+            return value
+            
+    def invalidate(self):
+        """Expire every entry by bumping the cache version."""
+        self._version += 1
+
+
+class LRUCache:
+    """Thread-safe in-process cache that evicts the least recently used entry when full."""
+    
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+            
+    def set(self, key: str, value: Any):
+        """Store value under key, evicting the oldest entry if the cache is full."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """Persistent string cache in a SQLite file, shared by processes and kept across restarts."""
+    
+    # Writes between two pruning passes of a long-running process
+    PRUNE_EVERY = 1000
+    
+    def __init__(self, path: str, table: str = "cache", ttl: int = 0, max_rows: int = 0):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection; WAL lets readers and a writer from other processes overlap."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} (key TEXT PRIMARY KEY, response TEXT, ts INTEGER)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{self.table}_ts ON {self.table} (ts)")
+            self._local.conn = conn
+            self.prune()
+        return conn
+        
+    def prune(self):
+        """Delete entries older than ttl seconds, then the oldest ones beyond max_rows."""
+        conn = self._connection()
+        if self.ttl > 0:
+            conn.execute(f"DELETE FROM {self.table} WHERE ts < ?", (int(time.time()) - self.ttl,))
+        if self.max_rows > 0:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY ts DESC LIMIT -1 OFFSET ?)",
+                (self.max_rows,)
+            )
+            
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored value for key, or None on a miss or an expired entry."""
+        row = self._connection().execute(
+            f"SELECT response, ts FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (self.ttl > 0 and row[1] < time.time() - self.ttl):
+            return None
+        return row[0]
+        
+    def set(self, key: str, value: str):
+        """Store value under key, replacing any previous value; prunes every PRUNE_EVERY writes."""
+        self._connection().execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, response, ts) VALUES (?, ?, ?)",
+            (key, value, int(time.time()))
+        )
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes >= self.PRUNE_EVERY
+            if due:
+                self._writes = 0
+        if due:
+            self.prune()
+
+
+# Global cache for dashboard/statistics aggregates
+stats_cache = TTLCache()
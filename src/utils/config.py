@@ -1,12 +1,17 @@
 import os
 from typing import List, Optional
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 
 
 class Settings(BaseSettings):
     # Database Configuration
     database_url: str = Field(default="sqlite:///./argentina_real_estate.db", env="DATABASE_URL")
+    db_pool_size: int = Field(default=20, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, env="DB_MAX_OVERFLOW")
+    db_pool_timeout: int = Field(default=30, env="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(default=1800, env="DB_POOL_RECYCLE")
+    db_insert_page_size: int = Field(default=1000, env="DB_INSERT_PAGE_SIZE")
     mongodb_url: str = Field(default="mongodb://localhost:27017/argentina_real_estate", env="MONGODB_URL")
     
     # Redis Configuration
@@ -16,6 +21,16 @@ class Settings(BaseSettings):
     api_host: str = Field(default="0.0.0.0", env="API_HOST")
     api_port: int = Field(default=12000, env="API_PORT")
     api_debug: bool = Field(default=True, env="API_DEBUG")
+    ensure_dirs: bool = Field(default=False, env="ENSURE_DIRS")
+    stats_cache_ttl: int = Field(default=30, env="STATS_CACHE_TTL")
+    pg_json_pushdown: bool = Field(default=False, env="PG_JSON_PUSHDOWN")
+    view_flush_interval: float = Field(default=1.0, env="VIEW_FLUSH_INTERVAL")
+    view_batch_size: int = Field(default=500, env="VIEW_BATCH_SIZE")
+    view_buffer_size: int = Field(default=10000, env="VIEW_BUFFER_SIZE")
+    cors_origins: List[str] = Field(
+        default=["http://localhost:12000", "http://127.0.0.1:12000"],
+        env="CORS_ORIGINS"
+    )
     
     # Scraping Configuration
     scraping_delay: float = Field(default=1.0, env="SCRAPING_DELAY")
@@ -31,13 +46,27 @@ class Settings(BaseSettings):
     # Celery Configuration
     celery_broker_url: str = Field(default="redis://localhost:6379/0", env="CELERY_BROKER_URL")
     celery_result_backend: str = Field(default="redis://localhost:6379/0", env="CELERY_RESULT_BACKEND")
+    scraping_task_queue: bool = Field(default=False, env="SCRAPING_TASK_QUEUE")
     
     # LLM Configuration
     deepseek_base_url: str = Field(default="http://localhost:11434", env="DEEPSEEK_BASE_URL")
     deepseek_api_key: Optional[str] = Field(default=None, env="DEEPSEEK_API_KEY")
     deepseek_model: str = Field(default="deepseek-r1:latest", env="DEEPSEEK_MODEL")
+    deepseek_fast_model: str = Field(default="", env="DEEPSEEK_FAST_MODEL")
     deepseek_timeout: int = Field(default=30, env="DEEPSEEK_TIMEOUT")
+    deepseek_http2: bool = Field(default=False, env="DEEPSEEK_HTTP2")
+    deepseek_context_tokens: int = Field(default=4096, env="DEEPSEEK_CONTEXT_TOKENS")
+    deepseek_keep_alive: str = Field(default="30m", env="DEEPSEEK_KEEP_ALIVE")
     llm_enabled: bool = Field(default=True, env="LLM_ENABLED")
+    llm_max_concurrency: int = Field(default=8, env="LLM_MAX_CONCURRENCY")
+    llm_cache_size: int = Field(default=4096, env="LLM_CACHE_SIZE")
+    llm_cache_path: str = Field(default="", env="LLM_CACHE_PATH")
+    llm_cache_ttl: int = Field(default=604800, env="LLM_CACHE_TTL")
+    llm_cache_max_rows: int = Field(default=100000, env="LLM_CACHE_MAX_ROWS")
+    llm_max_retries: int = Field(default=3, env="LLM_MAX_RETRIES")
+    llm_retry_backoff: float = Field(default=0.5, env="LLM_RETRY_BACKOFF")
+    llm_breaker_fail_max: int = Field(default=5, env="LLM_BREAKER_FAIL_MAX")
+    llm_breaker_reset_timeout: float = Field(default=30, env="LLM_BREAKER_RESET_TIMEOUT")
     
     # Notification Configuration
     telegram_bot_token: Optional[str] = Field(default=None, env="TELEGRAM_BOT_TOKEN")
@@ -58,9 +87,7 @@ class Settings(BaseSettings):
         "navent.com"
     ]
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
 
 
 # Global settings instance
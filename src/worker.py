@@ -0,0 +1,43 @@
+"""
+Celery worker for scraping jobs.
+
+Start with: celery -A src.worker worker --loglevel=info
+"""
+from typing import Any, Dict, List, Optional
+
+from celery import Celery
+
+from .database import db_manager
+from .models import PropertySearchFilters
+from .services import ScrapingService
+from .utils import app_logger, settings
+
+celery_app = Celery(
+    "argentina_real_estate",
+    broker=settings.celery_broker_url,
+    backend=settings.celery_result_backend
+)
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    # Scrapes run for minutes; hand out one at a time and only ack when done
+    worker_prefetch_multiplier=1,
+    task_acks_late=True
+)
+
+
+@celery_app.task(name="scrape_website")
+def scrape_website_task(website: str, filters: Dict[str, Any], max_pages: Optional[int] = None) -> Dict[str, Any]:
+    """Scrape one website in a worker process."""
+    app_logger.info(f"Worker scraping {website}")
+    with db_manager.get_session() as db:
+        return ScrapingService(db).scrape_website(website, PropertySearchFilters(**filters), max_pages)
+
+
+@celery_app.task(name="scrape_all_websites")
+def scrape_all_websites_task(filters: Dict[str, Any], max_pages: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Scrape every supported website in a worker process."""
+    app_logger.info("Worker scraping all websites")
+    with db_manager.get_session() as db:
+        return ScrapingService(db).scrape_all_websites(PropertySearchFilters(**filters), max_pages)
@@ -0,0 +1,23 @@
+import pytest
+
+from src.llm.property_analyzer import PropertyAnalyzer
+
+
+@pytest.fixture
+def analyzer():
+    # _determine_operation_type needs no LLM client
+    return PropertyAnalyzer.__new__(PropertyAnalyzer)
+
+
+@pytest.mark.parametrize("text", [
+    "Amplias ventanas, en alquiler",
+    "ventajas: alquila",
+    "Salen gastos; alquiler mensual",
+])
+def test_sale_keywords_match_whole_words_only(analyzer, text):
+    assert analyzer._determine_operation_type("", text) == "rent"
+
+
+def test_url_keyword_decides_first(analyzer):
+    url = "https://www.zonaprop.com.ar/departamentos-venta-palermo.html"
+    assert analyzer._determine_operation_type(url, "Ideal para alquiler") == "sale"